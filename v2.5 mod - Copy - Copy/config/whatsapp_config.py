@@ -32,6 +32,15 @@ MI_NOMBRE_WHATSAPP = "Paul Huerta"
 
 INTERVALO_MONITOREO = 15  # Revisar cada 15 segundos
 
+# Modo de captura de mensajes:
+#   'sondeo'  = abrir cada chat y leer sus mensajes cada INTERVALO_MONITOREO
+#   'eventos' = un observador en la página avisa de los mensajes nuevos al
+#               momento (sin esperas fijas por chat)
+MODO_CAPTURA = 'sondeo'
+
+# En modo 'eventos': cada cuánto se recogen los mensajes capturados (segundos)
+INTERVALO_CAPTURA = 1.0
+
 # ============================================
 # CONFIGURACIÓN DE BASE DE DATOS
 # ============================================
@@ -39,6 +48,13 @@ INTERVALO_MONITOREO = 15  # Revisar cada 15 segundos
 
 RUTA_BASE_DATOS = "data/autopartes_inventario.db"
 
+# Registro de mensajes ya procesados (base aparte; evita alertas repetidas
+# después de reiniciar el monitor)
+RUTA_MENSAJES_PROCESADOS = "data/mensajes_procesados.db"
+
+# Días que se recuerda un mensaje procesado antes de borrarlo del registro
+DIAS_RECORDAR_MENSAJES = 7
+
 # ============================================
 # MARCAS ADICIONALES DE AUTOS
 # ============================================
@@ -148,6 +164,22 @@ MAX_PARTES_NOTIFICACION = 10
 # Enviar notificación incluso si no hay partes disponibles
 NOTIFICAR_SIN_PARTES = False
 
+# Relevancia mínima de una pieza para notificarla. Puntos por coincidencia:
+# marca 1 (obligatoria), modelo 3, año 1, parte o sinónimo 3 (máximo 8).
+# 4 = además de la marca debe coincidir el modelo o la parte
+PUNTAJE_MINIMO_ALERTA = 4
+
+# Las alertas se agrupan en un solo mensaje por ciclo. En modo 'eventos',
+# tiempo máximo (segundos) que una alerta espera antes de enviarse
+VENTANA_NOTIFICACIONES = 60
+
+# Hilos que analizan los mensajes y consultan el inventario mientras el
+# navegador sigue capturando (0 = todo en el mismo hilo)
+TRABAJADORES_ANALISIS = 2
+
+# Mensajes capturados en espera de análisis; si se llena, la captura espera
+TAMANO_COLA_ANALISIS = 200
+
 # ============================================
 # CONFIGURACIÓN DE SELENIUM
 # ============================================
@@ -0,0 +1,113 @@
+"""
+Análisis de mensajes de WhatsApp: marcas, partes, palabras clave y años
+
+Todas las marcas, nombres de partes (incluidas las de varias palabras como
+'bomba de agua') y palabras clave se compilan una sola vez en una única
+expresión regular con alternativas, de la más larga a la más corta. Cada
+mensaje se recorre en una sola pasada y se obtienen todas las coincidencias
+con su posición, no solo la primera.
+
+No depende de Selenium: se puede usar y probar sin navegador.
+"""
+
+import re
+from collections import namedtuple
+
+# Tipos de término, en orden de prioridad si un término aparece en varias listas
+MARCA = 'marca'
+PARTE = 'parte'
+CLAVE = 'clave'
+ANIO = 'anio'
+
+# Años de modelo que se reconocen en el texto (1980-2039)
+REGEX_ANIO = r'(?:19[89]\d|20[0-3]\d)'
+
+# Palabras que no pueden formar parte del modelo
+PALABRAS_VACIAS = {'de', 'del', 'la', 'el', 'y', 'o'}
+
+# Signos que se quitan de los extremos de las palabras del modelo
+PUNTUACION = '¿?¡!.,;:()"\''
+
+# Quita acentos sin cambiar la longitud del texto (las posiciones siguen valiendo)
+SIN_ACENTOS = str.maketrans('áéíóúüàèìòù', 'aeiouuaeiou')
+
+Coincidencia = namedtuple('Coincidencia', ['tipo', 'termino', 'inicio', 'fin'])
+
+
+def normalizar(texto):
+    """Minúsculas y vocales sin acento, misma longitud que el original"""
+    return texto.lower().translate(SIN_ACENTOS)
+
+
+class AnalizadorMensajes:
+    """
+    Clasifica mensajes con una sola expresión regular compilada.
+
+    Un término coincide al inicio de una palabra y admite sufijos
+    ('faro' encuentra 'faros', 'toyota' encuentra 'toyotas'). Si un mismo
+    término está en varias listas cuenta como marca, luego parte y luego
+    palabra clave.
+    """
+
+    def __init__(self, marcas, partes, palabras_clave):
+        self.terminos = {}
+        for tipo, lista in ((MARCA, marcas), (PARTE, partes), (CLAVE, palabras_clave)):
+            for termino in lista:
+                clave = normalizar(termino.strip())
+                if clave and clave not in self.terminos:
+                    self.terminos[clave] = (tipo, termino.strip())
+        alternativas = '|'.join(re.escape(t) for t in sorted(self.terminos, key=len, reverse=True))
+        self.patron = re.compile(
+            rf'\b(?P<termino>{alternativas})\w*|\b(?P<anio>{REGEX_ANIO})\b')
+
+    def coincidencias(self, mensaje):
+        """Todas las coincidencias del mensaje en orden de aparición"""
+        resultado = []
+        for m in self.patron.finditer(normalizar(mensaje)):
+            if m.group('anio'):
+                resultado.append(Coincidencia(ANIO, m.group('anio'), m.start(), m.end()))
+            else:
+                tipo, termino = self.terminos[m.group('termino')]
+                resultado.append(Coincidencia(tipo, termino, m.start(), m.end()))
+        return resultado
+
+    def analizar(self, mensaje):
+        """
+        Información del auto mencionado, o None si el mensaje no menciona
+        ninguna marca. Incluye todas las coincidencias encontradas.
+        """
+        encontradas = self.coincidencias(mensaje)
+        por_tipo = {MARCA: [], PARTE: [], CLAVE: [], ANIO: []}
+        for c in encontradas:
+            por_tipo[c.tipo].append(c)
+        if not por_tipo[MARCA]:
+            return None
+
+        marca = por_tipo[MARCA][0]
+        info = {
+            'marca': marca.termino,
+            'modelo': None,
+            'año': por_tipo[ANIO][0].termino if por_tipo[ANIO] else None,
+            'nombre_parte': por_tipo[PARTE][0].termino if por_tipo[PARTE] else None,
+            'texto_original': mensaje,
+            'marcas': list(dict.fromkeys(c.termino for c in por_tipo[MARCA])),
+            'partes': list(dict.fromkeys(c.termino for c in por_tipo[PARTE])),
+            'es_busqueda': bool(por_tipo[CLAVE]),
+            'coincidencias': encontradas,
+        }
+
+        # Posible modelo: hasta 2 de las 3 palabras que siguen a la marca
+        modelo_palabras = []
+        for palabra in mensaje[marca.fin:].split()[:3]:
+            palabra = palabra.strip(PUNTUACION)
+            if re.fullmatch(r'\d{4}', palabra):
+                if not info['año']:
+                    info['año'] = palabra
+                continue
+            if len(palabra) < 2 or palabra.lower() in PALABRAS_VACIAS:
+                continue
+            modelo_palabras.append(palabra)
+        if modelo_palabras:
+            info['modelo'] = ' '.join(modelo_palabras[:2])
+
+        return info
@@ -0,0 +1,165 @@
+"""
+Captura de mensajes por eventos con un MutationObserver de JavaScript
+
+En lugar de abrir cada chat, hacer scroll y leer los mensajes en cada ciclo,
+se inyecta una vez un MutationObserver en WhatsApp Web que encola en el
+navegador:
+  - cada mensaje nuevo que aparece en la conversación abierta, y
+  - cada chat de la lista lateral cuya vista previa cambia (hay actividad).
+El monitor vacía la cola con un solo execute_script cada segundo, así que la
+latencia de detección baja a ~1 s con una sola llamada a WebDriver por vuelta.
+
+leer_mensajes() sirve al modo por sondeo: devuelve los mensajes visibles de
+la conversación abierta (id, autor, hora y texto) también en una sola llamada,
+en vez de leer .text elemento por elemento.
+
+No importa Selenium: solo usa driver.execute_script().
+"""
+
+# Cada cuánto se vacía la cola del navegador (segundos)
+INTERVALO_CAPTURA = 1.0
+
+# Selectores de WhatsApp Web
+SELECTOR_MENSAJE = 'div._akbu span'
+SELECTOR_MENSAJE_ALTERNATIVO = 'span[dir="ltr"]'
+SELECTOR_TITULO_CHAT = '#main header span[dir="auto"], #main header span[title]'
+SELECTOR_LISTA_CHATS = '#pane-side'
+
+# Datos de un mensaje a partir de su elemento de texto. WhatsApp marca cada
+# mensaje con data-id (estable) y data-pre-plain-text="[hora, fecha] Autor: "
+JS_DATOS_MENSAJE = """
+function datosMensaje(el) {
+    var fila = el.closest('[data-id]');
+    var copia = el.closest('[data-pre-plain-text]') ||
+        (fila && fila.querySelector('[data-pre-plain-text]'));
+    var cabecera = copia ? copia.getAttribute('data-pre-plain-text') : '';
+    var partes = /^\\[([^\\]]*)\\]\\s*(.*?):\\s*$/.exec(cabecera || '');
+    return {
+        id: fila ? fila.getAttribute('data-id') : null,
+        autor: partes ? partes[2] : null,
+        hora: partes ? partes[1] : null,
+        texto: el.innerText || el.textContent || ''
+    };
+}
+"""
+
+# Instala el observador una sola vez por página; devuelve true si lo instaló
+JS_INSTALAR = JS_DATOS_MENSAJE + """
+var selMensaje = arguments[0], selTitulo = arguments[1], selLista = arguments[2];
+if (window.__capturaMensajes) { return false; }
+var captura = {cola: [], vistos: new WeakSet()};
+function chatAbierto() {
+    var t = document.querySelector(selTitulo);
+    return t ? (t.getAttribute('title') || t.textContent) : null;
+}
+function encolarMensaje(el) {
+    if (captura.vistos.has(el)) { return; }
+    captura.vistos.add(el);
+    var mensaje = datosMensaje(el);
+    if (mensaje.texto) {
+        mensaje.tipo = 'mensaje';
+        mensaje.chat = chatAbierto();
+        captura.cola.push(mensaje);
+    }
+}
+function revisar(nodo) {
+    if (nodo.nodeType !== 1) { nodo = nodo.parentElement; if (!nodo) { return; } }
+    var lista = document.querySelector(selLista);
+    if (lista && lista.contains(nodo)) {
+        var fila = nodo.closest('[role="listitem"], [role="row"]');
+        var titulo = fila && fila.querySelector('span[title]');
+        if (titulo) {
+            captura.cola.push({tipo: 'chat', chat: titulo.getAttribute('title'), texto: null});
+        }
+        return;
+    }
+    if (nodo.matches(selMensaje)) { encolarMensaje(nodo); }
+    nodo.querySelectorAll(selMensaje).forEach(encolarMensaje);
+}
+captura.observer = new MutationObserver(function (cambios) {
+    cambios.forEach(function (cambio) {
+        if (cambio.type === 'characterData') { revisar(cambio.target); return; }
+        cambio.addedNodes.forEach(revisar);
+    });
+});
+captura.observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+window.__capturaMensajes = captura;
+return true;
+"""
+
+# Devuelve y vacía la cola; null si el observador ya no existe (página recargada)
+JS_VACIAR = """
+var captura = window.__capturaMensajes;
+if (!captura) { return null; }
+var cola = captura.cola;
+captura.cola = [];
+return cola;
+"""
+
+# Últimos mensajes visibles de la conversación abierta (uno por data-id)
+JS_LEER_MENSAJES = JS_DATOS_MENSAJE + """
+var selectores = arguments[0], limite = arguments[1];
+var elementos = [];
+for (var i = 0; i < selectores.length && !elementos.length; i++) {
+    elementos = Array.prototype.slice.call(document.querySelectorAll(selectores[i]));
+}
+var mensajes = [], ids = {};
+elementos.forEach(function (el) {
+    var mensaje = datosMensaje(el);
+    if (!mensaje.texto) { return; }
+    if (mensaje.id) {
+        if (ids[mensaje.id]) { return; }
+        ids[mensaje.id] = true;
+    }
+    mensajes.push(mensaje);
+});
+return mensajes.slice(-limite);
+"""
+
+# Título del chat abierto
+JS_CHAT_ABIERTO = """
+var t = document.querySelector(arguments[0]);
+return t ? (t.getAttribute('title') || t.textContent) : null;
+"""
+
+
+def leer_mensajes(driver, limite=30,
+                  selectores=(SELECTOR_MENSAJE, SELECTOR_MENSAJE_ALTERNATIVO)):
+    """
+    Los últimos limite mensajes visibles como dicts {id, autor, hora, texto}
+    con una sola llamada a WebDriver. Se usa el primer selector que encuentre
+    elementos; id es None si el mensaje no tiene data-id.
+    """
+    return driver.execute_script(JS_LEER_MENSAJES, list(selectores), limite) or []
+
+
+class CapturaMensajes:
+    """Observador de mensajes nuevos instalado en la página de WhatsApp Web"""
+
+    def __init__(self, driver, selector_mensaje=SELECTOR_MENSAJE,
+                 selector_titulo=SELECTOR_TITULO_CHAT, selector_lista=SELECTOR_LISTA_CHATS):
+        self.driver = driver
+        self.selectores = (selector_mensaje, selector_titulo, selector_lista)
+        self.instalaciones = 0
+
+    def instalar(self):
+        """Inyecta el MutationObserver (no hace nada si ya está instalado)"""
+        if self.driver.execute_script(JS_INSTALAR, *self.selectores):
+            self.instalaciones += 1
+            print("✓ Observador de mensajes instalado")
+
+    def vaciar(self):
+        """
+        Eventos encolados desde la última llamada, en orden: dicts con tipo
+        ('mensaje' o 'chat'), chat y texto. Reinstala el observador si la
+        página se recargó.
+        """
+        eventos = self.driver.execute_script(JS_VACIAR)
+        if eventos is None:
+            self.instalar()
+            return []
+        return eventos
+
+    def chat_abierto(self):
+        """Nombre del chat abierto en WhatsApp Web (o None)"""
+        return self.driver.execute_script(JS_CHAT_ABIERTO, self.selectores[1])
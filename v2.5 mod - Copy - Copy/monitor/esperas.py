@@ -0,0 +1,87 @@
+"""
+Esperas explícitas para WhatsApp Web con métricas por paso
+
+Sustituye las pausas fijas (time.sleep) entre clics y teclas: cada paso
+espera con WebDriverWait solo hasta que la página está lista (un elemento
+clicable, el chat abierto, la caja de texto vacía...). El tiempo de cada
+paso se acumula en MetricasPasos (metricas.py) para ver dónde se va el ciclo.
+
+Instalación:
+pip install selenium
+"""
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from captura import JS_CHAT_ABIERTO, SELECTOR_TITULO_CHAT
+from metricas import MetricasPasos
+
+# Espera máxima de cada paso y cada cuánto se revisa la condición (segundos)
+TIMEOUT_PASO = 10
+INTERVALO_SONDEO = 0.1
+
+# Elementos de WhatsApp Web
+BUSCADOR = (By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]')
+CAJA_MENSAJE = (By.XPATH, '//div[@contenteditable="true"][@data-tab="10"]')
+
+
+def resultado_chat(nombre):
+    """Localizador del chat con ese nombre en la lista o en los resultados"""
+    return (By.XPATH, f'//span[@title="{nombre}"]')
+
+
+# ============================================
+# CONDICIONES PROPIAS (además de expected_conditions)
+# ============================================
+
+def chat_abierto(nombre):
+    """El encabezado de la conversación muestra el chat nombre"""
+    def condicion(driver):
+        return driver.execute_script(JS_CHAT_ABIERTO, SELECTOR_TITULO_CHAT) == nombre
+    return condicion
+
+
+def sin_texto(localizador):
+    """El elemento existe y está vacío; lo devuelve (ej. caja limpia o mensaje enviado)"""
+    def condicion(driver):
+        try:
+            elemento = driver.find_element(*localizador)
+            return elemento if not elemento.text.strip() else False
+        except StaleElementReferenceException:
+            return False
+    return condicion
+
+
+class Esperas:
+    """
+    WebDriverWait con nombre de paso. hasta() devuelve lo que devuelva la
+    condición (normalmente el elemento) o lanza TimeoutException.
+    """
+
+    def __init__(self, driver, timeout=TIMEOUT_PASO, intervalo=INTERVALO_SONDEO, metricas=None):
+        self.driver = driver
+        self.timeout = timeout
+        self.intervalo = intervalo
+        self.metricas = metricas if metricas is not None else MetricasPasos()
+
+    def hasta(self, paso, condicion, timeout=None):
+        espera = WebDriverWait(self.driver, self.timeout if timeout is None else timeout,
+                               poll_frequency=self.intervalo,
+                               ignored_exceptions=(StaleElementReferenceException,))
+        with self.metricas.medir(paso):
+            return espera.until(condicion)
+
+    def clicable(self, paso, localizador, timeout=None):
+        return self.hasta(paso, EC.element_to_be_clickable(localizador), timeout)
+
+    def presente(self, paso, localizador, timeout=None):
+        return self.hasta(paso, EC.presence_of_element_located(localizador), timeout)
+
+    def intentar(self, paso, condicion, timeout=None):
+        """Como hasta() pero devuelve None en lugar de lanzar TimeoutException"""
+        try:
+            return self.hasta(paso, condicion, timeout)
+        except TimeoutException:
+            return None
@@ -0,0 +1,58 @@
+"""
+Métricas de tiempo por paso del monitor
+
+Acumula cuántas veces se ejecutó cada paso, el tiempo total, el máximo y los
+fallos (timeouts o excepciones). Es seguro usarlo desde varios hilos: lo
+comparten las esperas del navegador y los trabajadores del pipeline.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class MetricasPasos:
+    """Tiempo acumulado, máximo y timeouts por nombre de paso"""
+
+    def __init__(self):
+        self.pasos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def registrar(self, paso, segundos, ok=True):
+        with self._lock:
+            datos = self.pasos.setdefault(paso, {'veces': 0, 'total': 0.0, 'maximo': 0.0, 'timeouts': 0})
+            datos['veces'] += 1
+            datos['total'] += segundos
+            datos['maximo'] = max(datos['maximo'], segundos)
+            if not ok:
+                datos['timeouts'] += 1
+
+    @contextmanager
+    def medir(self, paso):
+        """Mide un bloque; si lanza excepción cuenta como fallo"""
+        inicio = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.registrar(paso, time.perf_counter() - inicio, ok)
+
+    def resumen(self):
+        """Líneas de texto con promedio, máximo y timeouts de cada paso"""
+        with self._lock:
+            pasos = [(paso, dict(datos)) for paso, datos in self.pasos.items()]
+        lineas = []
+        for paso, datos in pasos:
+            promedio = datos['total'] / datos['veces']
+            linea = (f"{paso}: {datos['veces']}x, prom {promedio * 1000:.0f} ms, "
+                     f"máx {datos['maximo'] * 1000:.0f} ms")
+            if datos['timeouts']:
+                linea += f", {datos['timeouts']} timeout(s)"
+            lineas.append(linea)
+        return lineas
+
+    def reiniciar(self):
+        with self._lock:
+            self.pasos.clear()
@@ -0,0 +1,148 @@
+"""
+Cola de notificaciones: agrupa las alertas en un solo mensaje
+
+Cada alerta enviada obliga a cambiar al chat propio y volver, lo que cuesta
+segundos de automatización. En lugar de enviar una por mensaje detectado,
+las alertas se encolan y se envían juntas (una vez por ciclo o cuando pasa
+la ventana de tiempo) en un solo cambio de chat. Las alertas que apuntan al
+mismo conjunto de piezas se combinan, y un conjunto ya notificado para un
+chat no se repite mientras siga siendo reciente (otro chat que pide las
+mismas piezas sí genera alerta).
+"""
+
+import time
+from collections import OrderedDict
+
+# En modo por eventos: tiempo máximo que una alerta espera en la cola (segundos)
+VENTANA_SEGUNDOS = 60
+
+# Un mismo conjunto de piezas no se vuelve a notificar para el mismo chat antes de este tiempo
+RECORDAR_SEGUNDOS = 3600
+
+# Conjuntos recientes que se recuerdan (los más viejos se olvidan)
+MAX_RECIENTES = 1000
+
+# Piezas que se listan por alerta dentro del resumen
+MAX_PARTES_RESUMEN = 5
+
+
+class Alerta:
+    """Búsqueda detectada (o varias iguales) con las piezas encontradas"""
+
+    def __init__(self, chat, info_auto, partes):
+        self.chats = [chat]
+        self.info_auto = info_auto
+        self.partes = partes
+        self.repeticiones = 1
+
+
+def clave_partes(partes):
+    """Identifica el conjunto de piezas (por stock number) sin importar el orden"""
+    return frozenset(parte[0] for parte in partes)
+
+
+def formatear_resumen(alertas, max_partes=MAX_PARTES_RESUMEN):
+    """Un solo mensaje con todas las alertas de la cola"""
+    mensaje = f"🚨 RESUMEN DE INVENTARIO: {len(alertas)} ALERTA(S) 🚨\n"
+    for i, alerta in enumerate(alertas, 1):
+        info = alerta.info_auto
+        auto = ' '.join(str(v) for v in (info['marca'].upper(), info['modelo'], info['año']) if v)
+        mensaje += "\n━━━━━━━━━━━━━━━━━━━━\n"
+        mensaje += f"{i}. 🚗 {auto}"
+        if info['nombre_parte']:
+            mensaje += f" - 🔧 {info['nombre_parte']}"
+        mensaje += f"\n💬 {', '.join(alerta.chats)}"
+        if alerta.repeticiones > 1:
+            mensaje += f" ({alerta.repeticiones} mensajes)"
+        mensaje += f"\n💭 {info['texto_original'].replace(chr(10), ' ')[:80]}\n"
+        for parte in alerta.partes[:max_partes]:
+            stock, nombre, marca, modelo, año, cat, ubic, precio, cond, *_ = parte
+            linea = f"   • {stock} {nombre} ({ubic})"
+            if precio:
+                linea += f" ${precio:.2f}"
+            mensaje += linea + "\n"
+        if len(alerta.partes) > max_partes:
+            mensaje += f"   ➕ ...y {len(alerta.partes) - max_partes} parte(s) mas\n"
+    mensaje += "━━━━━━━━━━━━━━━━━━━━"
+    return mensaje
+
+
+class ColaNotificaciones:
+    """
+    Acumula alertas y las entrega con enviar(alertas) -> bool.
+
+    agregar() combina las alertas con el mismo conjunto de piezas y descarta
+    las que ese chat ya recibió hace menos de recordar segundos. enviar_pendientes()
+    manda todo lo encolado en una sola llamada a enviar.
+    """
+
+    def __init__(self, enviar, ventana=VENTANA_SEGUNDOS, recordar=RECORDAR_SEGUNDOS,
+                 reloj=time.monotonic):
+        self.enviar = enviar
+        self.ventana = ventana
+        self.recordar = recordar
+        self.reloj = reloj
+        self._pendientes = OrderedDict()  # clave de piezas -> Alerta
+        self._recientes = OrderedDict()   # (chat, clave de piezas) -> hora del último envío
+        self._primera = None
+        self.contadores = {'recibidas': 0, 'combinadas': 0, 'repetidas': 0,
+                           'alertas_enviadas': 0, 'envios': 0, 'envios_fallidos': 0}
+
+    def __len__(self):
+        return len(self._pendientes)
+
+    def agregar(self, chat, info_auto, partes):
+        """Encola una alerta; devuelve False si se combinó o ya se había notificado a ese chat"""
+        self.contadores['recibidas'] += 1
+        clave = clave_partes(partes)
+        ahora = self.reloj()
+
+        enviada = self._recientes.get((chat, clave))
+        if enviada is not None and ahora - enviada < self.recordar:
+            self.contadores['repetidas'] += 1
+            return False
+
+        alerta = self._pendientes.get(clave)
+        if alerta is not None:
+            alerta.repeticiones += 1
+            if chat not in alerta.chats:
+                alerta.chats.append(chat)
+            self.contadores['combinadas'] += 1
+            return False
+
+        self._pendientes[clave] = Alerta(chat, info_auto, partes)
+        if self._primera is None:
+            self._primera = ahora
+        return True
+
+    def debe_enviar(self):
+        """True si la alerta más antigua ya esperó la ventana completa"""
+        return self._primera is not None and self.reloj() - self._primera >= self.ventana
+
+    def enviar_pendientes(self):
+        """Envía todas las alertas encoladas juntas; devuelve cuántas se enviaron"""
+        if not self._pendientes:
+            return 0
+        alertas = list(self._pendientes.values())
+        if not self.enviar(alertas):
+            self.contadores['envios_fallidos'] += 1
+            return 0  # Se quedan en la cola para el siguiente intento
+
+        ahora = self.reloj()
+        for clave, alerta in self._pendientes.items():
+            for chat in alerta.chats:
+                self._recientes[(chat, clave)] = ahora
+                self._recientes.move_to_end((chat, clave))
+        while len(self._recientes) > MAX_RECIENTES:
+            self._recientes.popitem(last=False)
+        self._pendientes.clear()
+        self._primera = None
+        self.contadores['envios'] += 1
+        self.contadores['alertas_enviadas'] += len(alertas)
+        return len(alertas)
+
+    def resumen_contadores(self):
+        c = self.contadores
+        return (f"alertas: {c['recibidas']} recibidas, {c['alertas_enviadas']} enviadas en "
+                f"{c['envios']} mensaje(s), {c['combinadas']} combinadas, {c['repetidas']} repetidas"
+                + (f", {c['envios_fallidos']} envío(s) fallidos" if c['envios_fallidos'] else ""))
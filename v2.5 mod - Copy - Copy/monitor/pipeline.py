@@ -0,0 +1,178 @@
+"""
+Pipeline captura → análisis → notificación con colas entre etapas
+
+Antes, el mismo bucle leía los mensajes con Selenium, los analizaba, buscaba
+en el inventario y enviaba la alerta; una consulta lenta detenía la captura.
+Ahora cada etapa corre por separado:
+
+  captura (hilo del navegador) --cola acotada--> trabajadores de análisis
+  (analizador + consulta al inventario, cada uno con su conexión del pool)
+  --cola de resultados--> hilo del navegador, que los pasa a la cola de
+  notificaciones y los envía.
+
+Selenium no es seguro entre hilos, así que la captura y el envío se quedan en
+el hilo del navegador; lo que se solapa es el trabajo de CPU y base de datos.
+Si los trabajadores no dan abasto, la cola de entrada se llena y encolar()
+bloquea la captura (contrapresión) en lugar de acumular mensajes sin límite.
+"""
+
+import queue
+import threading
+import time
+
+from metricas import MetricasPasos
+
+# Hilos que analizan mensajes y consultan el inventario
+TRABAJADORES = 2
+
+# Mensajes capturados que pueden esperar análisis antes de frenar la captura
+TAMANO_COLA = 200
+
+# Cada cuánto revisa encolar() si el pipeline se detuvo mientras la cola está llena (segundos)
+INTERVALO_REINTENTO = 0.5
+
+
+class MensajeCapturado:
+    """Mensaje leído del navegador, con la hora de captura"""
+
+    def __init__(self, chat, texto, id_whatsapp=None):
+        self.chat = chat
+        self.texto = texto
+        self.id_whatsapp = id_whatsapp
+        self.capturado = time.monotonic()
+
+
+class ResultadoAnalisis:
+    """Mensaje que menciona un auto, con las piezas encontradas"""
+
+    def __init__(self, mensaje, info_auto, partes):
+        self.mensaje = mensaje
+        self.info_auto = info_auto
+        self.partes = partes
+
+
+class PipelineMensajes:
+    """
+    Cola acotada de mensajes y trabajadores que los analizan con
+    analizar(chat, texto) -> (info_auto, partes) o None. Los resultados se
+    recogen con resultados() desde el hilo del navegador.
+
+    Métricas por etapa (en metricas): espera en cola, análisis, tiempo
+    bloqueado por cola llena y captura → resultado recogido.
+    """
+
+    def __init__(self, analizar, trabajadores=TRABAJADORES, tamano_cola=TAMANO_COLA, metricas=None):
+        self.analizar = analizar
+        self.trabajadores = trabajadores
+        self.entrada = queue.Queue(maxsize=tamano_cola)
+        self.salida = queue.Queue()
+        self.metricas = metricas if metricas is not None else MetricasPasos()
+        self.contadores = {'encolados': 0, 'analizados': 0, 'con_auto': 0, 'errores': 0,
+                           'cola_llena': 0, 'descartados': 0}
+        self._lock = threading.Lock()
+        self._hilos = []
+        self._detenido = threading.Event()
+
+    def __len__(self):
+        """Mensajes esperando análisis"""
+        return self.entrada.qsize()
+
+    def _contar(self, contador, cantidad=1):
+        with self._lock:
+            self.contadores[contador] += cantidad
+
+    def iniciar(self):
+        """Arranca los trabajadores (no hace nada si ya están corriendo)"""
+        if self._hilos:
+            return
+        self._detenido.clear()
+        for i in range(self.trabajadores):
+            hilo = threading.Thread(target=self._trabajar, name=f"analisis-{i + 1}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def encolar(self, chat, texto, id_whatsapp=None):
+        """
+        Pasa un mensaje a los trabajadores. Si la cola está llena espera a que
+        haya lugar (frena la captura); devuelve False solo si el pipeline se
+        detuvo mientras esperaba.
+        """
+        self.iniciar()
+        mensaje = MensajeCapturado(chat, texto, id_whatsapp)
+        try:
+            self.entrada.put_nowait(mensaje)
+        except queue.Full:
+            self._contar('cola_llena')
+            with self.metricas.medir('cola_llena'):
+                while True:
+                    if self._detenido.is_set():
+                        self._contar('descartados')
+                        return False
+                    try:
+                        self.entrada.put(mensaje, timeout=INTERVALO_REINTENTO)
+                        break
+                    except queue.Full:
+                        continue
+        self._contar('encolados')
+        return True
+
+    def _trabajar(self):
+        while True:
+            mensaje = self.entrada.get()
+            try:
+                if mensaje is None:
+                    return
+                self.metricas.registrar('espera_analisis', time.monotonic() - mensaje.capturado)
+                with self.metricas.medir('analisis'):
+                    resultado = self.analizar(mensaje.chat, mensaje.texto)
+                self._contar('analizados')
+                if resultado is not None:
+                    self._contar('con_auto')
+                    self.salida.put(ResultadoAnalisis(mensaje, *resultado))
+            except Exception as e:
+                self._contar('errores')
+                print(f"   ⚠ Error analizando mensaje: {str(e)[:60]}...")
+            finally:
+                self.entrada.task_done()
+
+    def resultados(self):
+        """Resultados listos (sin bloquear), en el orden en que terminaron"""
+        listos = []
+        ahora = time.monotonic()
+        while True:
+            try:
+                resultado = self.salida.get_nowait()
+            except queue.Empty:
+                break
+            self.metricas.registrar('captura_a_resultado', ahora - resultado.mensaje.capturado)
+            listos.append(resultado)
+        return listos
+
+    def esperar(self, timeout):
+        """Espera a que se analice todo lo encolado; True si la cola quedó vacía"""
+        limite = time.monotonic() + timeout
+        with self.entrada.all_tasks_done:
+            while self.entrada.unfinished_tasks:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return False
+                self.entrada.all_tasks_done.wait(restante)
+        return True
+
+    def detener(self, timeout=5):
+        """Termina los trabajadores después de lo que ya está en la cola"""
+        self._detenido.set()
+        for _ in self._hilos:
+            self.entrada.put(None)
+        for hilo in self._hilos:
+            hilo.join(timeout)
+        self._hilos = []
+
+    def resumen_contadores(self):
+        with self._lock:
+            c = dict(self.contadores)
+        return (f"pipeline: {c['encolados']} encolados, {c['analizados']} analizados, "
+                f"{c['con_auto']} con auto, {len(self)} en cola"
+                + (f", cola llena {c['cola_llena']}x" if c['cola_llena'] else "")
+                + (f", {c['errores']} error(es)" if c['errores'] else "")
+                + (f", {c['descartados']} descartado(s)" if c['descartados'] else ""))
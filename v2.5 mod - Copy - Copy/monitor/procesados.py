@@ -0,0 +1,121 @@
+"""
+Registro persistente de mensajes de WhatsApp ya procesados
+
+Evita notificar dos veces el mismo mensaje, incluso después de reiniciar el
+monitor. Las claves (chat:hash del texto) se guardan en una base SQLite
+propia (no en la del inventario) con la última hora en que se vieron (un
+mensaje que sigue en pantalla se renueva); las que superan el TTL se borran
+periódicamente. Delante de SQLite hay una caché LRU
+de tamaño fijo, así que la memoria del monitor no crece con el tiempo.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Tiempo que se recuerda un mensaje (WhatsApp Web solo muestra los recientes)
+TTL_SEGUNDOS = 7 * 24 * 3600
+
+# Claves que se mantienen en memoria
+TAMANO_CACHE = 5000
+
+# Cada cuántos registros nuevos se borran las claves vencidas
+PURGAR_CADA = 500
+
+# Un avistamiento renueva "visto" si el valor guardado tiene más de estos
+# segundos: el TTL cuenta desde la última vez que se vio el mensaje sin
+# escribir en SQLite en cada ciclo de lectura
+RENOVAR_CADA = 3600
+
+
+class RegistroProcesados:
+    """
+    Conjunto persistente de claves con vencimiento.
+
+    registrar(clave) devuelve True la primera vez que ve la clave (dentro
+    del TTL) y False en las siguientes, aunque el monitor se haya reiniciado.
+    Cada avistamiento renueva la clave, así que solo vence cuando deja de verse.
+    """
+
+    def __init__(self, db_path, ttl=TTL_SEGUNDOS, tamano_cache=TAMANO_CACHE, reloj=time.time,
+                 renovar=RENOVAR_CADA):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.renovar = min(renovar, ttl / 2)
+        self.tamano_cache = tamano_cache
+        self.reloj = reloj
+        self._cache = OrderedDict()  # clave -> hora en que se vio
+        self._lock = threading.Lock()
+        self._nuevos = 0
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS procesados (
+                    clave TEXT PRIMARY KEY,
+                    visto REAL NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_procesados_visto ON procesados(visto)')
+        self.purgar()
+
+    def __len__(self):
+        return self.conn.execute('SELECT COUNT(*) FROM procesados').fetchone()[0]
+
+    def _recordar(self, clave, visto):
+        self._cache[clave] = visto
+        self._cache.move_to_end(clave)
+        if len(self._cache) > self.tamano_cache:
+            self._cache.popitem(last=False)
+
+    def registrar(self, clave):
+        """Marca la clave como procesada; True si no se había visto"""
+        ahora = self.reloj()
+        limite = ahora - self.ttl
+        with self._lock:
+            visto = self._cache.get(clave)
+            if visto is not None and visto >= limite:
+                self._renovar(clave, visto, ahora)
+                return False
+            with self.conn:
+                fila = self.conn.execute(
+                    'SELECT visto FROM procesados WHERE clave = ?', (clave,)).fetchone()
+                if fila is not None and fila[0] >= limite:
+                    self._renovar(clave, fila[0], ahora)
+                    return False
+                self.conn.execute('INSERT OR REPLACE INTO procesados (clave, visto) VALUES (?, ?)',
+                                  (clave, ahora))
+            self._recordar(clave, ahora)
+            self._nuevos += 1
+            if self._nuevos >= PURGAR_CADA:
+                self._purgar(limite)
+            return True
+
+    def _renovar(self, clave, visto, ahora):
+        """Clave vista de nuevo: mueve su vencimiento (en SQLite como mucho cada self.renovar s)"""
+        if ahora - visto >= self.renovar:
+            with self.conn:
+                self.conn.execute('UPDATE procesados SET visto = ? WHERE clave = ?', (ahora, clave))
+            visto = ahora
+        self._recordar(clave, visto)
+
+    def purgar(self):
+        """Borra las claves vencidas; devuelve cuántas se borraron"""
+        with self._lock:
+            return self._purgar(self.reloj() - self.ttl)
+
+    def _purgar(self, limite):
+        self._nuevos = 0
+        with self.conn:
+            borradas = self.conn.execute('DELETE FROM procesados WHERE visto < ?', (limite,)).rowcount
+        for clave in [c for c, visto in self._cache.items() if visto < limite]:
+            del self._cache[clave]
+        return borradas
+
+    def cerrar(self):
+        self.conn.close()
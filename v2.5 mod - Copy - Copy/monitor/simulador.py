@@ -0,0 +1,379 @@
+"""
+Simulador local de WhatsApp Web para medir el monitor sin conexión
+
+Sirve en localhost una página con los mismos elementos que usa el monitor
+(buscador data-tab="3", caja de mensaje data-tab="10", mensajes
+div._akbu span con data-id y data-pre-plain-text, chats span[@title]) y
+reproduce tráfico sintético a la tasa indicada. Cada mensaje guarda la hora
+en que apareció, así que se puede medir mensajes por segundo y latencia de
+detección en Chrome headless, sin escanear un QR.
+
+Ejecuta: python monitor/simulador.py [--modo eventos] [--tasa 10] [--segundos 30]
+Solo el servidor (para abrirlo en el navegador): python monitor/simulador.py --servir
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Chats del simulador; MI_CHAT recibe las notificaciones del monitor
+CHATS = ['Grupo Yonkeros', 'Grupo Refacciones', 'Cliente Juan']
+MI_CHAT = 'Yo (simulador)'
+AUTORES = ['Juan', 'Pedro', 'Luis', 'Ana', 'Marta', 'Jorge']
+
+# Vocabulario de los mensajes sintéticos
+MARCAS = {'Nissan': ['Tsuru', 'Sentra', 'Versa'], 'Chevrolet': ['Aveo', 'Spark', 'Cruze'],
+          'Volkswagen': ['Jetta', 'Golf', 'Vento'], 'Ford': ['Focus', 'Fiesta', 'Ranger'],
+          'Toyota': ['Corolla', 'Hilux', 'Yaris'], 'Honda': ['Civic', 'CR-V', 'Fit']}
+PARTES = ['radiador', 'alternador', 'faro', 'calavera', 'puerta', 'cofre', 'defensa',
+          'motor de arranque', 'bomba de agua', 'compresor', 'espejo', 'amortiguador']
+PLANTILLAS_AUTO = [
+    'Busco {parte} para {marca} {modelo} {anio}',
+    '¿Alguien tiene {parte} de {marca} {modelo} {anio}?',
+    'Necesito {parte} {marca} {modelo} {anio}, urge',
+    'Precio de {parte} para {marca} {modelo}',
+    'Vendo {parte} de {marca} {modelo} {anio} en buen estado',
+]
+MENSAJES_SIN_AUTO = ['Buenos días a todos', 'Gracias!', 'Ya quedó', '¿A qué hora abren?',
+                     'Mando ubicación', 'Ok 👍', 'Alguien para flete mañana?']
+
+
+def generar_mensajes(cantidad, proporcion_autos=0.3, chats=CHATS, semilla=None):
+    """
+    Tráfico sintético: lista de {chat, autor, texto}. proporcion_autos es la
+    fracción de mensajes que piden o venden una pieza de algún auto.
+    """
+    rnd = random.Random(semilla)
+    mensajes = []
+    for _ in range(cantidad):
+        if rnd.random() < proporcion_autos:
+            marca = rnd.choice(list(MARCAS))
+            texto = rnd.choice(PLANTILLAS_AUTO).format(
+                parte=rnd.choice(PARTES), marca=marca, modelo=rnd.choice(MARCAS[marca]),
+                anio=rnd.randint(1995, 2022))
+        else:
+            texto = rnd.choice(MENSAJES_SIN_AUTO)
+        mensajes.append({'chat': rnd.choice(chats), 'autor': rnd.choice(AUTORES), 'texto': texto})
+    return mensajes
+
+
+# ============================================
+# PÁGINA SIMULADA
+# ============================================
+
+PAGINA = """<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>WhatsApp (simulador)</title>
+<style>
+body { margin: 0; font-family: sans-serif; display: flex; height: 100vh; }
+#side { width: 320px; border-right: 1px solid #ccc; display: flex; flex-direction: column; }
+#main { flex: 1; display: flex; flex-direction: column; }
+[contenteditable] { border: 1px solid #aaa; min-height: 24px; margin: 6px; padding: 4px; }
+#pane-side, [data-testid="conversation-panel-body"] { flex: 1; overflow-y: auto; }
+[role="listitem"] { padding: 8px; border-bottom: 1px solid #eee; cursor: pointer; }
+.vista { display: block; color: #666; font-size: 12px; white-space: nowrap; overflow: hidden; }
+.mensaje { margin: 4px 8px; }
+</style></head>
+<body>
+<div id="side">
+  <div contenteditable="true" data-tab="3"></div>
+  <div id="pane-side"></div>
+</div>
+<div id="main">
+  <header><span dir="auto" title=""></span></header>
+  <div data-testid="conversation-panel-body"></div>
+  <div contenteditable="true" data-tab="10"></div>
+</div>
+<script>
+var CONFIG = __CONFIG__;
+var sim = window.__simulador = {creados: {}, enviados: [], generados: 0, terminado: false};
+var chats = {}, abierto = null, contador = 0;
+var buscador = document.querySelector('[data-tab="3"]');
+var caja = document.querySelector('[data-tab="10"]');
+var lista = document.getElementById('pane-side');
+var panel = document.querySelector('[data-testid="conversation-panel-body"]');
+var titulo = document.querySelector('#main header span');
+
+function hora() {
+    var d = new Date(), dos = function (n) { return (n < 10 ? '0' : '') + n; };
+    return dos(d.getHours()) + ':' + dos(d.getMinutes()) + ', ' + dos(d.getDate()) + '/' +
+        dos(d.getMonth() + 1) + '/' + d.getFullYear();
+}
+function crearChat(nombre) {
+    var fila = document.createElement('div');
+    fila.setAttribute('role', 'listitem');
+    var t = document.createElement('span');
+    t.setAttribute('title', nombre);
+    t.textContent = nombre;
+    var vista = document.createElement('span');
+    vista.className = 'vista';
+    fila.appendChild(t);
+    fila.appendChild(vista);
+    fila.addEventListener('click', function () { abrir(nombre); });
+    lista.appendChild(fila);
+    chats[nombre] = {fila: fila, vista: vista, mensajes: []};
+}
+function nodoMensaje(m) {
+    var fila = document.createElement('div');
+    fila.className = 'mensaje';
+    fila.setAttribute('data-id', m.id);
+    var copia = document.createElement('div');
+    copia.className = 'copyable-text';
+    copia.setAttribute('data-pre-plain-text', '[' + m.hora + '] ' + m.autor + ': ');
+    var cuerpo = document.createElement('div');
+    cuerpo.className = '_akbu';
+    var texto = document.createElement('span');
+    texto.setAttribute('dir', 'ltr');
+    texto.textContent = m.texto;
+    cuerpo.appendChild(texto);
+    copia.appendChild(cuerpo);
+    fila.appendChild(copia);
+    return fila;
+}
+function abrir(nombre) {
+    abierto = nombre;
+    titulo.setAttribute('title', nombre);
+    titulo.textContent = nombre;
+    panel.innerHTML = '';
+    chats[nombre].mensajes.slice(-CONFIG.visibles).forEach(function (m) {
+        panel.appendChild(nodoMensaje(m));
+    });
+    panel.scrollTop = panel.scrollHeight;
+}
+function agregar(chat, autor, texto) {
+    var m = {id: 'false_' + chat.replace(/\\W/g, '') + '@g.us_' + (++contador),
+             autor: autor, texto: texto, hora: hora()};
+    chats[chat].mensajes.push(m);
+    chats[chat].vista.textContent = autor + ': ' + texto;
+    if (abierto === chat) {
+        panel.appendChild(nodoMensaje(m));
+        while (panel.children.length > CONFIG.visibles) { panel.removeChild(panel.firstChild); }
+    }
+    return m;
+}
+function filtrar() {
+    var texto = buscador.textContent.trim().toLowerCase();
+    Object.keys(chats).forEach(function (nombre) {
+        chats[nombre].fila.style.display =
+            !texto || nombre.toLowerCase().indexOf(texto) >= 0 ? '' : 'none';
+    });
+}
+buscador.addEventListener('input', filtrar);
+buscador.addEventListener('keyup', filtrar);
+buscador.addEventListener('keydown', function (e) {
+    if (e.key === 'Escape') { buscador.textContent = ''; filtrar(); }
+});
+caja.addEventListener('keydown', function (e) {
+    if (e.key !== 'Enter') { return; }
+    e.preventDefault();
+    var texto = caja.textContent;
+    caja.textContent = '';
+    if (abierto && texto.trim()) {
+        sim.enviados.push({chat: abierto, texto: texto, t: Date.now()});
+        agregar(abierto, 'Yo', texto);
+    }
+});
+
+CONFIG.chats.concat([CONFIG.mi_chat]).forEach(crearChat);
+var pendientes = CONFIG.mensajes.slice();
+var inicio = Date.now() + CONFIG.retraso_ms;
+function reproducir() {
+    // Emite los mensajes que ya "deberían" haber llegado según la tasa
+    var debidos = Math.floor((Date.now() - inicio) * CONFIG.tasa / 1000);
+    while (sim.generados < debidos && pendientes.length) {
+        var s = pendientes.shift();
+        var m = agregar(s.chat, s.autor, s.texto);
+        sim.creados[m.id] = Date.now();
+        sim.generados++;
+    }
+    if (pendientes.length) { setTimeout(reproducir, 20); } else { sim.terminado = true; }
+}
+setTimeout(reproducir, CONFIG.retraso_ms);
+</script>
+</body></html>
+"""
+
+
+def render_pagina(mensajes, tasa, chats=CHATS, mi_chat=MI_CHAT, visibles=50, retraso_ms=2000):
+    """HTML del simulador con el tráfico y la tasa (mensajes/segundo) incrustados"""
+    config = {'mensajes': mensajes, 'tasa': tasa, 'chats': list(chats), 'mi_chat': mi_chat,
+              'visibles': visibles, 'retraso_ms': retraso_ms}
+    # </ dentro de un string JSON cerraría el <script>
+    return PAGINA.replace('__CONFIG__', json.dumps(config, ensure_ascii=False).replace('</', '<\\/'))
+
+
+class ServidorSimulador:
+    """Servidor HTTP local (puerto libre) que entrega la página simulada"""
+
+    def __init__(self, pagina, puerto=0):
+        contenido = pagina.encode('utf-8')
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(contenido)))
+                self.end_headers()
+                self.wfile.write(contenido)
+
+            def log_message(self, *args):
+                pass  # Sin una línea por petición en la consola
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', puerto), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/'
+        self._hilo = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._hilo.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ============================================
+# BENCHMARK DEL MONITOR
+# ============================================
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def medir(modo='eventos', tasa=10.0, segundos=30, proporcion_autos=0.3, intervalo=5,
+          semilla=1, headless=True, trabajadores=2):
+    """
+    Corre el monitor contra el simulador durante segundos y devuelve un dict
+    con mensajes generados/procesados, mensajes por segundo, latencias (ms)
+    desde que el mensaje aparece hasta que el monitor lo procesa, alertas y
+    tiempos por paso de espera y del pipeline de análisis (trabajadores=0
+    analiza en el hilo del navegador). Requiere selenium y Chrome.
+    """
+    from whatsapp_monitor import WhatsAppInventoryMonitor
+    from base_datos import InventoryRepository
+
+    mensajes = generar_mensajes(int(tasa * segundos), proporcion_autos, semilla=semilla)
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        # Inventario de prueba: una pieza por marca y parte del vocabulario
+        db_path = os.path.join(tmp_dir, 'inventario.db')
+        repo = InventoryRepository(db_path)
+        repo.init_schema()
+        for marca, modelos in MARCAS.items():
+            for parte in PARTES[:4]:
+                stock = repo.next_stock_number()
+                repo.insert_part({'id': stock, 'stock_number': stock, 'nombre': parte.title(),
+                                  'marca': marca, 'modelo': modelos[0], 'anio': '2012',
+                                  'categoria': 'Otro', 'condicion': 'Usada - Buena', 'precio': 500.0,
+                                  'estante': 'A', 'nivel': 1, 'ubicacion': 'A-1',
+                                  'fecha_ingreso': '2025-01-01T00:00:00'})
+        repo.close()
+
+        monitor = WhatsAppInventoryMonitor(db_path=db_path,
+                                           procesados_path=os.path.join(tmp_dir, 'procesados.db'),
+                                           ventana_notificaciones=intervalo,
+                                           trabajadores=trabajadores)
+        monitor.chats_monitoreados = list(CHATS)
+        monitor.mi_nombre = MI_CHAT
+
+        # Hora en que el monitor procesa cada data-id
+        procesados = {}
+        procesar_original = monitor.procesar_mensaje
+
+        def procesar_mensaje(nombre_chat, texto, id_whatsapp=None):
+            if id_whatsapp and id_whatsapp not in procesados:
+                procesados[id_whatsapp] = time.time() * 1000
+            return procesar_original(nombre_chat, texto, id_whatsapp)
+        monitor.procesar_mensaje = procesar_mensaje
+
+        with ServidorSimulador(render_pagina(mensajes, tasa)) as servidor:
+            monitor.preparar_analizador()
+            monitor.conectar_whatsapp(url=servidor.url, headless=headless)
+            threading.Timer(segundos + 2, monitor.detener.set).start()
+            inicio = time.perf_counter()
+            try:
+                if modo == 'eventos':
+                    monitor.monitorear_eventos()
+                else:
+                    monitor.monitorear_sondeo(intervalo)
+            finally:
+                duracion = time.perf_counter() - inicio
+                monitor.recoger_resultados(esperar=10)
+                monitor.enviar_notificaciones_pendientes()
+                estado = monitor.driver.execute_script('return window.__simulador;')
+                pasos = monitor.metricas.resumen()
+                if monitor.pipeline is not None:
+                    pasos += monitor.pipeline.metricas.resumen()
+                contadores = dict(monitor.notificaciones.contadores)
+                monitor.cerrar()
+
+        latencias = [procesados[i] - t for i, t in estado['creados'].items() if i in procesados]
+        return {
+            'modo': modo,
+            'generados': estado['generados'],
+            'procesados': len(latencias),
+            'mensajes_por_segundo': len(latencias) / duracion,
+            'latencia_p50_ms': percentil(latencias, 50) if latencias else None,
+            'latencia_p95_ms': percentil(latencias, 95) if latencias else None,
+            'latencia_max_ms': max(latencias) if latencias else None,
+            'latencia_media_ms': statistics.mean(latencias) if latencias else None,
+            'notificaciones_enviadas': len(estado['enviados']),
+            'alertas': contadores,
+            'pasos': pasos,
+        }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulador de WhatsApp Web para medir el monitor")
+    parser.add_argument('--modo', choices=['eventos', 'sondeo'], default='eventos')
+    parser.add_argument('--tasa', type=float, default=10.0, help="Mensajes por segundo")
+    parser.add_argument('--segundos', type=int, default=30, help="Duración del tráfico")
+    parser.add_argument('--autos', type=float, default=0.3, help="Fracción de mensajes que mencionan un auto")
+    parser.add_argument('--intervalo', type=float, default=5,
+                        help="Sondeo: segundos entre ciclos; también ventana de notificaciones")
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--trabajadores', type=int, default=2,
+                        help="Hilos de análisis (0 = todo en el hilo del navegador)")
+    parser.add_argument('--ver', action='store_true', help="Mostrar el navegador (no headless)")
+    parser.add_argument('--servir', action='store_true', help="Solo servir la página y esperar Ctrl+C")
+    args = parser.parse_args(argv)
+
+    if args.servir:
+        mensajes = generar_mensajes(int(args.tasa * args.segundos), args.autos, semilla=args.semilla)
+        with ServidorSimulador(render_pagina(mensajes, args.tasa)) as servidor:
+            print(f"Simulador en {servidor.url} (Ctrl+C para terminar)")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    resultado = medir(args.modo, args.tasa, args.segundos, args.autos, args.intervalo,
+                      args.semilla, headless=not args.ver, trabajadores=args.trabajadores)
+    pasos = resultado.pop('pasos')
+    print("\n" + "=" * 60)
+    print("RESULTADO DEL BENCHMARK")
+    print("=" * 60)
+    for clave, valor in resultado.items():
+        print(f"{clave}: {round(valor, 1) if isinstance(valor, float) else valor}")
+    for linea in pasos:
+        print(f"   · {linea}")
+    return 0
+
+
+if __name__ == "__main__":
+    # La capa de datos está en src/ y el monitor en esta carpeta
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(main())
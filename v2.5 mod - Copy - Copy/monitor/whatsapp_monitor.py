@@ -6,23 +6,49 @@ Instalación:
 pip install selenium webdriver-manager
 """
 
-import sqlite3
-import re
+import sys
 import time
 import hashlib
+import threading
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.keys import Keys
 from webdriver_manager.chrome import ChromeDriverManager
 import os
 
+# La capa de datos es compartida con la aplicación de escritorio (src/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+from base_datos import InventoryRepository, ALERT_MAX_SCORE
+from analizador import AnalizadorMensajes
+from procesados import RegistroProcesados, TTL_SEGUNDOS
+from captura import CapturaMensajes, INTERVALO_CAPTURA, leer_mensajes, SELECTOR_MENSAJE, SELECTOR_LISTA_CHATS
+from notificaciones import ColaNotificaciones, formatear_resumen, VENTANA_SEGUNDOS
+from metricas import MetricasPasos
+from pipeline import PipelineMensajes, TRABAJADORES, TAMANO_COLA
+from esperas import Esperas, BUSCADOR, CAJA_MENSAJE, resultado_chat, chat_abierto, sin_texto
+
+# Espera máxima a que aparezca un chat en los resultados de búsqueda (segundos)
+TIMEOUT_RESULTADO = 5
+
+# Puntos mínimos de una pieza para alertar (ver ALERT_SCORE_WEIGHTS en base_datos):
+# además de la marca debe coincidir el modelo o la parte
+PUNTAJE_MINIMO = 4
+
+# Al final de cada ciclo, espera máxima a que los trabajadores terminen el análisis (segundos)
+TIMEOUT_ANALISIS = 10
+
+WHATSAPP_URL = 'https://web.whatsapp.com'
+
 class WhatsAppInventoryMonitor:
-    def __init__(self, db_path='data/autopartes_inventario.db'):
+    def __init__(self, db_path='data/autopartes_inventario.db',
+                 procesados_path='data/mensajes_procesados.db', ttl_procesados=TTL_SEGUNDOS,
+                 ventana_notificaciones=VENTANA_SEGUNDOS, trabajadores=TRABAJADORES,
+                 tamano_cola=TAMANO_COLA):
         """Inicializar monitor"""
         # Ruta absoluta a la base de datos
         self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -49,6 +75,23 @@ class WhatsAppInventoryMonitor:
             'compro', 'interesa', 'cotiza', 'cotizar'
         ]
         
+        # Nombres comunes de partes (run_monitor.py agrega PARTES_COMUNES de la configuración)
+        self.partes_comunes = [
+            'radiador', 'alternador', 'motor', 'transmision', 'transmisión',
+            'faro', 'foco', 'bomba', 'filtro', 'bateria', 'batería',
+            'parabrisas', 'espejo', 'puerta', 'cofre', 'capo', 'capó',
+            'defensa', 'parachoques', 'llanta', 'rin', 'suspension', 'suspensión',
+            'amortiguador', 'muelle', 'clutch', 'embrague', 'freno',
+            'disco', 'pastilla', 'tambor', 'caliper', 'volante',
+            'cremallera', 'direccion', 'dirección', 'escape', 'catalizador',
+            'silenciador', 'asiento', 'tablero', 'consola', 'compresor',
+            'condensador', 'evaporador', 'termostato', 'electroventilador',
+            'sensor', 'switch', 'relay', 'fusible', 'control', 'modulo', 'módulo'
+        ]
+        
+        # Expresión compilada con marcas, partes y palabras clave (ver preparar_analizador)
+        self.analizador = None
+        
         # Chats a monitorear (configurar con nombres reales)
         self.chats_monitoreados = [
             "Grupo Ventas 1",
@@ -59,24 +102,49 @@ class WhatsAppInventoryMonitor:
         # Tu nombre para notificaciones (como aparece en WhatsApp)
         self.mi_nombre = "Yo"
         
-        # Control de mensajes procesados
-        self.mensajes_procesados = set()
+        # Relevancia mínima de las piezas que se notifican
+        self.puntaje_minimo = PUNTAJE_MINIMO
+        
+        # Control de mensajes procesados (persistente: sobrevive a reinicios)
+        self.mensajes_procesados = RegistroProcesados(os.path.join(self.base_dir, procesados_path),
+                                                      ttl=ttl_procesados)
+        
+        # Alertas pendientes: se envían juntas en un solo cambio de chat
+        self.notificaciones = ColaNotificaciones(self.enviar_alertas, ventana=ventana_notificaciones)
+        
+        # Análisis e inventario en hilos aparte para no frenar la captura
+        # (trabajadores=0: todo en el hilo del navegador, como antes)
+        self.pipeline = PipelineMensajes(self.analizar_mensaje, trabajadores, tamano_cola) if trabajadores else None
         
         # Configurar Selenium
         self.driver = None
+        self.esperas = None
+        self.metricas = MetricasPasos()
+        
+        # detener.set() termina el bucle de monitoreo al final de la vuelta actual
+        self.detener = threading.Event()
         
         print(f"Base de datos configurada en: {self.db_path}")
         if os.path.exists(self.db_path):
             print("✓ Base de datos encontrada")
         else:
             print("⚠ ADVERTENCIA: Base de datos no encontrada en esa ruta")
+        
+        # Pool de conexiones compartido (WAL: las lecturas no bloquean a la interfaz)
+        # (una conexión por trabajador del pipeline más la del hilo del navegador)
+        self.repo = InventoryRepository(self.db_path, pool_size=max(2, trabajadores + 1))
+        applied, _ = self.repo.init_schema()
+        if applied:
+            print(f"✓ Esquema actualizado (migraciones: {', '.join(map(str, applied))})")
     
-    def conectar_whatsapp(self):
-        """Conectar a WhatsApp Web"""
+    def conectar_whatsapp(self, url=WHATSAPP_URL, headless=False):
+        """Conectar a WhatsApp Web (url permite usar el simulador local)"""
         print("\n🚀 Iniciando WhatsApp Web...")
         
         try:
             chrome_options = Options()
+            if headless:
+                chrome_options.add_argument('--headless=new')
             chrome_options.add_argument('--disable-blink-features=AutomationControlled')
             chrome_options.add_argument('--no-sandbox')
             chrome_options.add_argument('--disable-dev-shm-usage')
@@ -91,148 +159,48 @@ class WhatsAppInventoryMonitor:
                 options=chrome_options
             )
             
-            self.driver.get('https://web.whatsapp.com')
+            self.driver.get(url)
             self.driver.maximize_window()
+            self.esperas = Esperas(self.driver, metricas=self.metricas)
             
             print("📷 Por favor, escanea el código QR de WhatsApp Web")
             print("⏳ Esperando a que cargue WhatsApp...")
             
-            # Esperar a que cargue la interfaz
-            WebDriverWait(self.driver, 60).until(
-                EC.presence_of_element_located((By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]'))
-            )
+            # Esperar a que cargue la interfaz (incluye escanear el QR)
+            self.esperas.presente('cargar_whatsapp', BUSCADOR, timeout=60)
+            self.esperas.intentar('lista_chats', EC.presence_of_element_located(
+                (By.CSS_SELECTOR, SELECTOR_LISTA_CHATS)))
             print("✓ WhatsApp Web conectado!")
-            time.sleep(3)
             
         except Exception as e:
             print(f"❌ Error al conectar: {e}")
             print("💡 Asegúrate de escanear el código QR")
             raise
     
+    def preparar_analizador(self):
+        """Compila marcas, partes y palabras clave (después de cargar la configuración)"""
+        self.analizador = AnalizadorMensajes(self.marcas_autos, self.partes_comunes, self.palabras_clave)
+        print(f"✓ Analizador listo: {len(self.analizador.terminos)} términos")
+    
     def extraer_info_auto(self, mensaje):
-        """Extrae información del auto del mensaje - VERSIÓN MÁS FLEXIBLE"""
-        mensaje_lower = mensaje.lower()
-        
-        info = {
-            'marca': None,
-            'modelo': None,
-            'año': None,
-            'nombre_parte': None,
-            'texto_original': mensaje
-        }
-        
-        # Buscar marca (más flexible)
-        for marca in self.marcas_autos:
-            # Buscar la marca como palabra completa o parte de palabra
-            pattern = r'\b' + re.escape(marca) + r'\w*'
-            if re.search(pattern, mensaje_lower):
-                info['marca'] = marca
-                break
-        
-        if not info['marca']:
-            return None
-        
-        # Buscar año (1980-2030) - MÁS FLEXIBLE
-        regex_año = r'\b(19[8-9]\d|20[0-3]\d)\b'
-        años = re.findall(regex_año, mensaje)
-        if años:
-            info['año'] = años[0]
-        
-        # Buscar nombres comunes de partes
-        partes_comunes = [
-            'radiador', 'alternador', 'motor', 'transmision', 'transmisión',
-            'faro', 'foco', 'bomba', 'filtro', 'bateria', 'batería',
-            'parabrisas', 'espejo', 'puerta', 'cofre', 'capo', 'capó',
-            'defensa', 'parachoques', 'llanta', 'rin', 'suspension', 'suspensión',
-            'amortiguador', 'muelle', 'clutch', 'embrague', 'freno',
-            'disco', 'pastilla', 'tambor', 'caliper', 'volante',
-            'cremallera', 'direccion', 'dirección', 'escape', 'catalizador',
-            'silenciador', 'asiento', 'tablero', 'consola', 'compresor',
-            'condensador', 'evaporador', 'termostato', 'electroventilador',
-            'sensor', 'switch', 'relay', 'fusible', 'control', 'modulo', 'módulo'
-        ]
-        
-        for parte in partes_comunes:
-            if parte in mensaje_lower:
-                info['nombre_parte'] = parte
-                break
-        
-        # Extraer posible modelo (palabras después de la marca) - MÁS FLEXIBLE
-        palabras = mensaje.split()
-        for i, palabra in enumerate(palabras):
-            palabra_lower = palabra.lower()
-            # Si encontramos la marca
-            if info['marca'] in palabra_lower or palabra_lower in info['marca']:
-                # Tomar las siguientes 1-3 palabras como modelo
-                if i + 1 < len(palabras):
-                    modelo_palabras = []
-                    for j in range(i + 1, min(i + 4, len(palabras))):
-                        palabra_modelo = palabras[j]
-                        # Saltar si es un año
-                        if re.match(r'^\d{4}$', palabra_modelo):
-                            if not info['año']:
-                                info['año'] = palabra_modelo
-                            continue
-                        # Saltar palabras muy cortas o comunes
-                        if len(palabra_modelo) < 2 or palabra_modelo.lower() in ['de', 'del', 'la', 'el', 'y', 'o']:
-                            continue
-                        modelo_palabras.append(palabra_modelo)
-                    
-                    if modelo_palabras:
-                        info['modelo'] = ' '.join(modelo_palabras[:2])  # Máximo 2 palabras
-                break
-        
-        return info
+        """
+        Extrae información del auto del mensaje en una sola pasada.
+        Devuelve None si no menciona ninguna marca; además de la primera
+        marca/parte incluye todas las coincidencias con su posición.
+        """
+        if self.analizador is None:
+            self.preparar_analizador()
+        return self.analizador.analizar(mensaje)
     
     def buscar_en_inventario(self, marca, modelo=None, año=None, nombre_parte=None):
-        """Busca partes en el inventario - BÚSQUEDA MÁS FLEXIBLE"""
+        """
+        Piezas de la marca ordenadas por relevancia (modelo, año y parte o
+        sinónimo que coinciden); cada fila termina con sus puntos. Solo las
+        que llegan a puntaje_minimo.
+        """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Búsqueda más flexible usando OR en lugar de AND
-            query = """
-                SELECT stock_number, nombre, marca, modelo, anio, 
-                       categoria, ubicacion, precio, condicion
-                FROM piezas 
-                WHERE (LOWER(marca) LIKE ? OR LOWER(modelo) LIKE ?)
-            """
-            params = [f'%{marca}%', f'%{marca}%']
-            
-            # Si hay modelo, agregarlo como OR adicional
-            if modelo:
-                query += " OR LOWER(modelo) LIKE ?"
-                params.append(f'%{modelo}%')
-            
-            # Si hay año, agregarlo como OR adicional (no AND)
-            if año:
-                query += " OR anio LIKE ?"
-                params.append(f'%{año}%')
-            
-            # Si hay nombre de parte, agregarlo como OR
-            if nombre_parte:
-                query += " OR LOWER(nombre) LIKE ?"
-                params.append(f'%{nombre_parte}%')
-            
-            query += " LIMIT 20"
-            
-            cursor.execute(query, params)
-            resultados = cursor.fetchall()
-            
-            # Si no encuentra nada, buscar solo por marca
-            if not resultados and marca:
-                print(f"   [INFO] Búsqueda flexible: solo por marca")
-                cursor.execute("""
-                    SELECT stock_number, nombre, marca, modelo, anio, 
-                           categoria, ubicacion, precio, condicion
-                    FROM piezas 
-                    WHERE LOWER(marca) LIKE ?
-                    LIMIT 20
-                """, [f'%{marca}%'])
-                resultados = cursor.fetchall()
-            
-            conn.close()
-            return resultados
+            return self.repo.search_parts_for_alert(marca, modelo, año, nombre_parte,
+                                                    min_score=self.puntaje_minimo)
             
         except Exception as e:
             print(f"❌ Error en base de datos: {e}")
@@ -263,8 +231,8 @@ class WhatsAppInventoryMonitor:
             mensaje += "━━━━━━━━━━━━━━━━━━━━\n\n"
             
             for i, parte in enumerate(partes[:10], 1):
-                stock, nombre, marca, modelo, año, cat, ubic, precio, cond = parte
-                mensaje += f"{i}. {nombre}\n"
+                stock, nombre, marca, modelo, año, cat, ubic, precio, cond, puntos = parte
+                mensaje += f"{i}. {nombre} (🎯 {puntos}/{ALERT_MAX_SCORE})\n"
                 mensaje += f"🏷 Stock: {stock}\n"
                 mensaje += f"🚙 Auto: {marca} {modelo} {año}\n"
                 mensaje += f"📍 Ubicacion: {ubic}\n"
@@ -281,8 +249,26 @@ class WhatsAppInventoryMonitor:
         mensaje += "━━━━━━━━━━━━━━━━━━━━"
         return mensaje
     
+    def enviar_alertas(self, alertas):
+        """Envía las alertas de la cola en un solo mensaje; True si se envió"""
+        if len(alertas) == 1:
+            alerta = alertas[0]
+            mensaje = self.crear_mensaje_notificacion(alerta.chats[0], alerta.info_auto, alerta.partes)
+        else:
+            mensaje = formatear_resumen(alertas)
+        return self.enviar_notificacion(mensaje)
+    
+    def enviar_notificaciones_pendientes(self):
+        """Vacía la cola de alertas; devuelve cuántas se enviaron"""
+        if not len(self.notificaciones):
+            return 0
+        print(f"\n📬 Enviando {len(self.notificaciones)} alerta(s) en un solo mensaje...")
+        enviadas = self.notificaciones.enviar_pendientes()
+        print(f"   📊 {self.notificaciones.resumen_contadores()}")
+        return enviadas
+    
     def enviar_notificacion(self, mensaje):
-        """Envía notificación a ti mismo - VERSION ROBUSTA"""
+        """Envía notificación a ti mismo - VERSION ROBUSTA. Devuelve True si se envió"""
         max_intentos = 3
         
         for intento in range(max_intentos):
@@ -294,60 +280,51 @@ class WhatsAppInventoryMonitor:
                     print("📤 Enviando notificación...")
                 
                 # Re-obtener elementos en cada intento (evita stale element)
-                search_box = self.driver.find_element(By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]')
+                search_box = self.esperas.clicable('buscador', BUSCADOR)
                 search_box.click()
-                time.sleep(0.5)
                 
                 # Limpiar búsqueda anterior
                 search_box.clear()
-                time.sleep(0.3)
                 search_box.send_keys(Keys.ESCAPE)
-                time.sleep(0.3)
-                
-                # Re-obtener el search_box después de limpiar
-                search_box = self.driver.find_element(By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]')
-                search_box.clear()
-                time.sleep(0.3)
                 
+                # Re-obtener el search_box cuando ya está vacío
+                search_box = self.esperas.hasta('buscador_vacio', sin_texto(BUSCADOR))
                 search_box.send_keys(self.mi_nombre)
-                time.sleep(2)
                 
                 # Hacer clic en el primer resultado
                 try:
-                    chat = self.driver.find_element(By.XPATH, f'//span[@title="{self.mi_nombre}"]')
+                    chat = self.esperas.clicable('resultado_chat', resultado_chat(self.mi_nombre),
+                                                 timeout=TIMEOUT_RESULTADO)
                     chat.click()
-                    time.sleep(1.5)
-                except:
+                    self.esperas.intentar('abrir_chat', chat_abierto(self.mi_nombre))
+                except TimeoutException:
                     print(f"   ⚠ No se encontró chat con nombre '{self.mi_nombre}'")
                     if intento < max_intentos - 1:
                         continue
                     else:
                         print("   💡 Intenta enviar un mensaje a ti mismo primero en WhatsApp")
-                        return
+                        return False
                 
                 # Limpiar mensaje de caracteres especiales
                 mensaje_limpio = ''.join(c if ord(c) < 128 else ' ' for c in mensaje)
                 
                 # Re-obtener el input box
-                input_box = self.driver.find_element(By.XPATH, '//div[@contenteditable="true"][@data-tab="10"]')
+                input_box = self.esperas.clicable('caja_mensaje', CAJA_MENSAJE)
                 input_box.click()
-                time.sleep(0.5)
                 
                 # Limpiar cualquier texto previo
                 input_box.clear()
-                time.sleep(0.3)
                 
-                # Re-obtener input box después de limpiar
-                input_box = self.driver.find_element(By.XPATH, '//div[@contenteditable="true"][@data-tab="10"]')
+                # Re-obtener input box cuando ya está vacío
+                input_box = self.esperas.hasta('caja_vacia', sin_texto(CAJA_MENSAJE))
                 
-                # Enviar mensaje
+                # Enviar mensaje; la caja se vacía cuando WhatsApp lo aceptó
                 input_box.send_keys(mensaje_limpio)
-                time.sleep(0.5)
                 input_box.send_keys(Keys.ENTER)
-                time.sleep(1)
+                self.esperas.hasta('envio', sin_texto(CAJA_MENSAJE))
                 
                 print("✓ Notificación enviada exitosamente")
-                return  # Éxito, salir de la función
+                return True  # Éxito, salir de la función
                 
             except Exception as e:
                 error_msg = str(e).lower()
@@ -356,50 +333,144 @@ class WhatsAppInventoryMonitor:
                         print(f"   ⚠ Elemento stale detectado, reintentando...")
                         continue
                     else:
-                        print(f"   ⚠ Error stale persistente, la notificación puede haberse enviado")
-                        return
+                        print(f"   ⚠ Error stale persistente, se reintentará en el próximo envío")
+                        return False  # Sin confirmación de envío: las alertas quedan en la cola
                 elif intento < max_intentos - 1:
                     print(f"   ⚠ Error en intento {intento + 1}: {str(e)[:60]}...")
                     continue
                 else:
                     print(f"❌ Error al enviar notificación después de {max_intentos} intentos")
                     print(f"   Error: {str(e)[:80]}...")
+        return False
     
-    def monitorear_chat(self, nombre_chat):
-        """Monitorea un chat específico - VERSIÓN FINAL CORREGIDA"""
+    def abrir_chat(self, nombre_chat):
+        """Busca y abre un chat; devuelve False si no se encontró"""
+        # Buscar el chat
+        search_box = self.esperas.clicable('buscador', BUSCADOR)
+        search_box.click()
+        
+        # Limpiar búsqueda anterior
+        search_box.clear()
+        search_box.send_keys(Keys.ESCAPE)
+        search_box = self.esperas.hasta('buscador_vacio', sin_texto(BUSCADOR))
+        
+        # Nueva búsqueda
+        search_box.send_keys(nombre_chat)
+        
+        # Abrir el chat (esperar solo lo necesario: resultado visible y encabezado actualizado)
         try:
-            # Buscar el chat
-            search_box = self.driver.find_element(By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]')
-            search_box.click()
-            time.sleep(0.5)
-            
-            # Limpiar búsqueda anterior
-            search_box.clear()
-            time.sleep(0.3)
-            search_box.send_keys(Keys.ESCAPE)
-            time.sleep(0.3)
-            search_box.clear()
+            chat = self.esperas.clicable('resultado_chat', resultado_chat(nombre_chat), timeout=TIMEOUT_RESULTADO)
+            chat.click()
+            self.esperas.intentar('abrir_chat', chat_abierto(nombre_chat))
+            return True
+        except TimeoutException:
+            print(f"❌ No se encontró el chat '{nombre_chat}'")
+            print("💡 Verifica que el nombre sea exacto (mayúsculas, espacios, emojis)")
             
-            # Nueva búsqueda
-            search_box.send_keys(nombre_chat)
-            time.sleep(2)
-            
-            # Abrir el chat
+            # Limpiar búsqueda antes de salir
             try:
-                chat = self.driver.find_element(By.XPATH, f'//span[@title="{nombre_chat}"]')
-                chat.click()
-                time.sleep(2)
+                search_box = self.driver.find_element(*BUSCADOR)
+                search_box.clear()
+                search_box.send_keys(Keys.ESCAPE)
             except:
-                print(f"❌ No se encontró el chat '{nombre_chat}'")
-                print("💡 Verifica que el nombre sea exacto (mayúsculas, espacios, emojis)")
-                
-                # Limpiar búsqueda antes de salir
-                try:
-                    search_box = self.driver.find_element(By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]')
-                    search_box.clear()
-                    search_box.send_keys(Keys.ESCAPE)
-                except:
-                    pass
+                pass
+            return False
+    
+    def procesar_mensaje(self, nombre_chat, texto, id_whatsapp=None):
+        """
+        Registra un mensaje capturado y lo analiza si es nuevo. Con el
+        pipeline activo solo lo encola para los trabajadores. id_whatsapp es
+        el data-id del mensaje; sin él se usa un hash del texto. Devuelve
+        (es_nuevo, menciona_auto); menciona_auto es None si quedó en cola.
+        """
+        if not texto or len(texto) < 3:
+            return False, False
+        
+        # ID único: el de WhatsApp si existe (dos mensajes iguales son distintos)
+        if id_whatsapp:
+            mensaje_id = f"{nombre_chat}:{id_whatsapp}"
+        else:
+            mensaje_hash = hashlib.md5(texto.encode()).hexdigest()
+            mensaje_id = f"{nombre_chat}:{mensaje_hash}"
+        
+        # Evitar procesar el mismo mensaje dos veces (también entre reinicios)
+        if not self.mensajes_procesados.registrar(mensaje_id):
+            return False, False
+        
+        if self.pipeline is not None:
+            self.pipeline.encolar(nombre_chat, texto, id_whatsapp)
+            return True, None
+        
+        resultado = self.analizar_mensaje(nombre_chat, texto)
+        if resultado is None:
+            return True, False
+        self.encolar_alerta(nombre_chat, *resultado)
+        return True, True
+    
+    def analizar_mensaje(self, nombre_chat, texto):
+        """
+        Analiza el mensaje y busca piezas en el inventario. Devuelve
+        (info_auto, partes) o None si no menciona un auto. No usa el
+        navegador: corre en los trabajadores del pipeline.
+        """
+        info_auto = self.extraer_info_auto(texto)
+        if not info_auto:
+            return None
+        
+        # Buscar en inventario (siempre, incluso si no parece búsqueda)
+        partes = self.buscar_en_inventario(
+            info_auto['marca'],
+            info_auto['modelo'],
+            info_auto['año'],
+            info_auto['nombre_parte']
+        )
+        
+        # Un solo print para que no se mezcle con la salida de otros hilos
+        lineas = [f"\n   🚗 AUTO DETECTADO en '{nombre_chat}':",
+                  f"      ├─ Marca: {info_auto['marca']}"]
+        if info_auto['modelo']:
+            lineas.append(f"      ├─ Modelo: {info_auto['modelo']}")
+        if info_auto['año']:
+            lineas.append(f"      ├─ Año: {info_auto['año']}")
+        if info_auto['nombre_parte']:
+            lineas.append(f"      ├─ Parte: {info_auto['nombre_parte']}")
+        lineas.append(f"      └─ Texto: {texto[:60]}...")
+        
+        # Verificar si parece una búsqueda (palabras clave del mismo análisis)
+        if not info_auto['es_busqueda']:
+            lineas.append(f"      💡 El mensaje menciona auto pero no parece búsqueda activa")
+        lineas.append(f"      🔍 Partes encontradas: {len(partes)}")
+        print("\n".join(lineas))
+        return info_auto, partes
+    
+    def encolar_alerta(self, nombre_chat, info_auto, partes):
+        """Encola la alerta si hay partes (se envía con las demás del ciclo)"""
+        if partes:
+            if self.notificaciones.agregar(nombre_chat, info_auto, partes):
+                print(f"      📬 Alerta en cola ({len(self.notificaciones)} pendiente(s))")
+            else:
+                print(f"      📬 Mismas piezas que una alerta en cola o enviada hace poco")
+        else:
+            print(f"      ℹ No hay partes disponibles para este auto")
+    
+    def recoger_resultados(self, esperar=0):
+        """
+        Pasa a la cola de notificaciones lo que ya analizaron los trabajadores.
+        esperar > 0 espera hasta esos segundos a que terminen lo encolado.
+        """
+        if self.pipeline is None:
+            return 0
+        if esperar and not self.pipeline.esperar(esperar):
+            print(f"   ⚠ Quedan {len(self.pipeline)} mensaje(s) por analizar; siguen en cola")
+        resultados = self.pipeline.resultados()
+        for resultado in resultados:
+            self.encolar_alerta(resultado.mensaje.chat, resultado.info_auto, resultado.partes)
+        return len(resultados)
+    
+    def monitorear_chat(self, nombre_chat):
+        """Monitorea un chat específico - VERSIÓN FINAL CORREGIDA"""
+        try:
+            if not self.abrir_chat(nombre_chat):
                 return
             
             # ============================================
@@ -413,53 +484,37 @@ class WhatsAppInventoryMonitor:
                         element.scrollTop = element.scrollHeight;
                     }
                 """)
-                time.sleep(1)
             except Exception as e:
                 # Si falla, intentar método alternativo
                 try:
                     self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                    time.sleep(1)
                 except:
                     pass
                 # No es crítico si falla el scroll
             
+            # Esperar a que se muestren los mensajes (un chat vacío no tiene ninguno)
+            self.esperas.intentar('mensajes', EC.presence_of_element_located(
+                (By.CSS_SELECTOR, SELECTOR_MENSAJE)), timeout=3)
+            
             # ============================================
             # OBTENER MENSAJES - SELECTOR CORRECTO
             # ============================================
             mensajes = []
             
-            # Selector encontrado por diagnóstico: div._akbu span
+            # Últimos 30 mensajes (id, autor, hora y texto) en una sola llamada;
+            # selector principal div._akbu span, alternativo span[dir="ltr"]
             try:
-                mensajes = self.driver.find_elements(
-                    By.CSS_SELECTOR,
-                    'div._akbu span'
-                )
-                print(f"   ✓ Selector principal: {len(mensajes)} elementos")
+                mensajes = leer_mensajes(self.driver, limite=30)
             except Exception as e:
-                print(f"   ⚠ Error con selector principal: {e}")
+                print(f"   ⚠ Error al leer mensajes: {e}")
             
-            # Backup: Selector alternativo XPATH genérico
-            if not mensajes:
-                try:
-                    mensajes = self.driver.find_elements(
-                        By.XPATH,
-                        '//span[@dir="ltr"]'
-                    )
-                    print(f"   ✓ Selector alternativo: {len(mensajes)} elementos")
-                except Exception as e:
-                    print(f"   ⚠ Error con selector alternativo: {e}")
-            
-            # DEBUG: Mostrar primeros mensajes
+            # DEBUG: Mostrar últimos mensajes
             if mensajes:
-                print(f"\n   📊 Total mensajes encontrados: {len(mensajes)}")
+                print(f"\n   📊 Total mensajes leídos: {len(mensajes)}")
                 print(f"   📋 Mostrando últimos 5 mensajes:")
                 for i, msg in enumerate(mensajes[-5:], 1):
-                    try:
-                        texto = msg.text
-                        if texto:
-                            print(f"      {i}. {texto[:80]}...")
-                    except:
-                        pass
+                    autor = f"{msg['autor']}: " if msg.get('autor') else ""
+                    print(f"      {i}. {autor}{msg['texto'][:80]}...")
                 print()
             else:
                 print(f"   ⚠ NO se encontraron mensajes en el chat")
@@ -471,87 +526,31 @@ class WhatsAppInventoryMonitor:
             mensajes_nuevos = 0
             mensajes_con_auto = 0
             
-            for elemento_mensaje in mensajes[-30:]:  # Últimos 30 mensajes
+            for mensaje in mensajes:
                 try:
-                    texto = elemento_mensaje.text
-                    
-                    if not texto or len(texto) < 3:
-                        continue
-                    
-                    # Crear ID único usando hash
-                    mensaje_hash = hashlib.md5(texto.encode()).hexdigest()
-                    mensaje_id = f"{nombre_chat}:{mensaje_hash}"
-                    
-                    # Evitar procesar el mismo mensaje dos veces
-                    if mensaje_id in self.mensajes_procesados:
-                        continue
-                    
-                    self.mensajes_procesados.add(mensaje_id)
-                    mensajes_nuevos += 1
-                    
-                    # Analizar el mensaje
-                    info_auto = self.extraer_info_auto(texto)
-                    
-                    if info_auto:
-                        mensajes_con_auto += 1
-                        print(f"\n   🚗 AUTO DETECTADO en '{nombre_chat}':")
-                        print(f"      ├─ Marca: {info_auto['marca']}")
-                        if info_auto['modelo']:
-                            print(f"      ├─ Modelo: {info_auto['modelo']}")
-                        if info_auto['año']:
-                            print(f"      ├─ Año: {info_auto['año']}")
-                        if info_auto['nombre_parte']:
-                            print(f"      ├─ Parte: {info_auto['nombre_parte']}")
-                        print(f"      └─ Texto: {texto[:60]}...")
-                        
-                        # Verificar si parece una búsqueda
-                        es_busqueda = any(palabra in texto.lower() for palabra in self.palabras_clave)
-                        
-                        if not es_busqueda:
-                            print(f"      💡 El mensaje menciona auto pero no parece búsqueda activa")
-                        
-                        # Buscar en inventario (siempre, incluso si no parece búsqueda)
-                        partes = self.buscar_en_inventario(
-                            info_auto['marca'],
-                            info_auto['modelo'],
-                            info_auto['año'],
-                            info_auto['nombre_parte']
-                        )
-                        
-                        print(f"      🔍 Partes encontradas: {len(partes)}")
-                        
-                        # Enviar notificación si hay partes
-                        if partes:
-                            mensaje_notif = self.crear_mensaje_notificacion(
-                                nombre_chat, info_auto, partes
-                            )
-                            self.enviar_notificacion(mensaje_notif)
-                        else:
-                            print(f"      ℹ No hay partes disponibles para este auto")
+                    es_nuevo, con_auto = self.procesar_mensaje(nombre_chat, mensaje['texto'], mensaje.get('id'))
+                    mensajes_nuevos += es_nuevo
+                    mensajes_con_auto += bool(con_auto)
                 
                 except Exception as e:
-                    error_msg = str(e).lower()
-                    if "stale element" in error_msg:
-                        # Elemento stale - el mensaje ya fue procesado o WhatsApp lo actualizó
-                        continue
-                    else:
-                        print(f"   ⚠ Error procesando mensaje: {str(e)[:60]}...")
+                    print(f"   ⚠ Error procesando mensaje: {str(e)[:60]}...")
                     continue
             
             if mensajes_nuevos == 0:
                 print(f"   ℹ Sin mensajes nuevos")
             else:
                 print(f"   ✓ Procesados: {mensajes_nuevos} mensajes nuevos")
-                print(f"   🚗 Autos detectados: {mensajes_con_auto}")
+                if self.pipeline is None:
+                    print(f"   🚗 Autos detectados: {mensajes_con_auto}")
+                else:
+                    print(f"   ⚙ En cola de análisis: {len(self.pipeline)}")
             
             # Limpiar el campo de búsqueda al finalizar
             try:
-                search_box = self.driver.find_element(By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]')
+                search_box = self.driver.find_element(*BUSCADOR)
                 search_box.click()
-                time.sleep(0.2)
                 search_box.clear()
                 search_box.send_keys(Keys.ESCAPE)
-                time.sleep(0.2)
             except:
                 pass
             
@@ -562,41 +561,130 @@ class WhatsAppInventoryMonitor:
             
             # Intentar limpiar búsqueda incluso si hay error
             try:
-                search_box = self.driver.find_element(By.XPATH, '//div[@contenteditable="true"][@data-tab="3"]')
+                search_box = self.driver.find_element(*BUSCADOR)
                 search_box.clear()
                 search_box.send_keys(Keys.ESCAPE)
             except:
                 pass
     
-    def iniciar_monitoreo(self, intervalo=30):
-        """Inicia el monitoreo continuo"""
+    def monitorear_eventos(self, intervalo_captura=INTERVALO_CAPTURA):
+        """
+        Modo por eventos: un MutationObserver encola los mensajes nuevos en
+        el navegador y aquí se vacía la cola con una sola llamada por vuelta.
+        Un chat monitoreado solo se abre cuando la lista lateral muestra
+        actividad en él (el observador solo ve la conversación abierta).
+        Los cambios de la lista causados por el propio monitor (abrir un chat,
+        enviar una notificación) no cuentan como actividad.
+        """
+        captura = CapturaMensajes(self.driver)
+        captura.instalar()
+        monitoreados = set(self.chats_monitoreados)
+        
+        # Abrir el primer chat; los demás se abren cuando tengan actividad
+        chat_actual = self.chats_monitoreados[0] if self.abrir_chat(self.chats_monitoreados[0]) else None
+        
+        eventos = []
+        while not self.detener.is_set():
+            eventos += captura.vaciar()
+            por_abrir = []
+            cambio_de_chat = False
+            for evento in eventos:
+                chat = evento.get('chat')
+                if chat not in monitoreados:
+                    continue
+                if evento['tipo'] == 'chat':
+                    if chat != chat_actual and chat not in por_abrir:
+                        por_abrir.append(chat)
+                    continue
+                try:
+                    self.procesar_mensaje(chat, evento['texto'], evento.get('id'))
+                except Exception as e:
+                    print(f"   ⚠ Error procesando mensaje: {str(e)[:60]}...")
+            
+            # Resultados que ya terminaron los trabajadores
+            self.recoger_resultados()
+            
+            # Enviar las alertas acumuladas en la ventana (deja abierto el chat propio)
+            if self.notificaciones.debe_enviar():
+                self.enviar_notificaciones_pendientes()
+                chat_actual = None
+                cambio_de_chat = True
+            
+            # Al abrir el chat, el observador captura sus mensajes visibles
+            # (los ya procesados se descartan en el registro)
+            for chat in por_abrir:
+                print(f"\n📱 Actividad en '{chat}' ({datetime.now().strftime('%H:%M:%S')})")
+                if self.abrir_chat(chat):
+                    chat_actual = chat
+                cambio_de_chat = True
+            
+            eventos = []
+            if cambio_de_chat:
+                eventos = [e for e in captura.vaciar() if e['tipo'] == 'mensaje']
+            
+            self.detener.wait(intervalo_captura)
+    
+    def monitorear_sondeo(self, intervalo):
+        """Modo por sondeo: revisa todos los chats cada intervalo segundos"""
+        ciclo = 0
+        while not self.detener.is_set():
+            ciclo += 1
+            print(f"\n{'='*60}")
+            print(f"🔄 Ciclo #{ciclo} - {datetime.now().strftime('%H:%M:%S')}")
+            print(f"{'='*60}")
+            
+            inicio_ciclo = time.perf_counter()
+            for chat in self.chats_monitoreados:
+                print(f"\n📱 Revisando '{chat}'...")
+                self.monitorear_chat(chat)
+                self.recoger_resultados()
+            
+            # Un solo mensaje con todas las alertas del ciclo (el análisis de
+            # los últimos mensajes capturados puede seguir en curso)
+            self.recoger_resultados(esperar=TIMEOUT_ANALISIS)
+            self.enviar_notificaciones_pendientes()
+            
+            # Tiempo del ciclo y de cada paso de espera
+            print(f"\n⏱️  Ciclo completado en {time.perf_counter() - inicio_ciclo:.1f} s")
+            for linea in self.metricas.resumen():
+                print(f"   · {linea}")
+            self.metricas.reiniciar()
+            self.imprimir_metricas_pipeline()
+            
+            print(f"\n⏳ Esperando {intervalo} segundos hasta el próximo ciclo...")
+            self.detener.wait(intervalo)
+    
+    def iniciar_monitoreo(self, intervalo=30, modo='sondeo', intervalo_captura=INTERVALO_CAPTURA):
+        """
+        Inicia el monitoreo continuo. modo='sondeo' revisa cada chat cada
+        intervalo segundos; modo='eventos' usa el MutationObserver.
+        """
         print("\n" + "="*60)
         print("🔍 MONITOR DE WHATSAPP - INVENTARIO DE AUTOPARTES")
         print("="*60)
         print(f"📂 Base de datos: {self.db_path}")
         print(f"💬 Chats monitoreados: {', '.join(self.chats_monitoreados)}")
-        print(f"⏱️  Intervalo: {intervalo} segundos")
+        if modo == 'eventos':
+            print(f"⚡ Modo por eventos (cola revisada cada {intervalo_captura} s)")
+        else:
+            print(f"⏱️  Intervalo: {intervalo} segundos")
         print("="*60 + "\n")
         
+        self.preparar_analizador()
+        if self.pipeline is not None:
+            self.pipeline.iniciar()
+            print(f"⚙ Pipeline de análisis: {self.pipeline.trabajadores} trabajador(es)")
         self.conectar_whatsapp()
         
         print("\n✓ Monitoreo iniciado. Presiona Ctrl+C para detener.\n")
         
         try:
-            ciclo = 0
-            while True:
-                ciclo += 1
-                print(f"\n{'='*60}")
-                print(f"🔄 Ciclo #{ciclo} - {datetime.now().strftime('%H:%M:%S')}")
-                print(f"{'='*60}")
-                
-                for chat in self.chats_monitoreados:
-                    print(f"\n📱 Revisando '{chat}'...")
-                    self.monitorear_chat(chat)
-                
-                print(f"\n⏳ Esperando {intervalo} segundos hasta el próximo ciclo...")
-                time.sleep(intervalo)
-                
+            if modo == 'eventos':
+                self.monitorear_eventos(intervalo_captura)
+            else:
+                self.monitorear_sondeo(intervalo)
+            self.cerrar()
+            
         except KeyboardInterrupt:
             print("\n\n🛑 Deteniendo monitor...")
             self.cerrar()
@@ -606,13 +694,33 @@ class WhatsAppInventoryMonitor:
             traceback.print_exc()
             self.cerrar()
     
+    def imprimir_metricas_pipeline(self):
+        """Contadores y tiempos por etapa del pipeline (y los reinicia)"""
+        if self.pipeline is None:
+            return
+        print(f"   ⚙ {self.pipeline.resumen_contadores()}")
+        for linea in self.pipeline.metricas.resumen():
+            print(f"   · {linea}")
+        self.pipeline.metricas.reiniciar()
+    
     def cerrar(self):
-        """Cierra el navegador"""
+        """Termina el análisis en curso, envía las alertas pendientes y cierra el navegador"""
+        if self.pipeline is not None:
+            self.recoger_resultados(esperar=TIMEOUT_ANALISIS)
+            self.pipeline.detener()
+            self.imprimir_metricas_pipeline()
+        if self.driver and self.esperas and len(self.notificaciones):
+            try:
+                self.enviar_notificaciones_pendientes()
+            except Exception as e:
+                print(f"⚠ No se pudieron enviar las alertas pendientes: {e}")
         if self.driver:
             try:
                 self.driver.quit()
             except:
                 pass
+        self.mensajes_procesados.cerrar()
+        self.repo.close()
         print("✓ Monitor cerrado")
 
 
@@ -69,21 +69,37 @@ def main():
         
         # Crear monitor
         print("🔧 Creando monitor...")
-        monitor = WhatsAppInventoryMonitor(db_path=config.RUTA_BASE_DATOS)
+        monitor = WhatsAppInventoryMonitor(
+            db_path=config.RUTA_BASE_DATOS,
+            procesados_path=getattr(config, 'RUTA_MENSAJES_PROCESADOS', 'data/mensajes_procesados.db'),
+            ttl_procesados=getattr(config, 'DIAS_RECORDAR_MENSAJES', 7) * 24 * 3600,
+            ventana_notificaciones=getattr(config, 'VENTANA_NOTIFICACIONES', 60),
+            trabajadores=getattr(config, 'TRABAJADORES_ANALISIS', 2),
+            tamano_cola=getattr(config, 'TAMANO_COLA_ANALISIS', 200)
+        )
         monitor.chats_monitoreados = config.CHATS_MONITOREADOS
         monitor.mi_nombre = config.MI_NOMBRE_WHATSAPP
+        monitor.puntaje_minimo = getattr(config, 'PUNTAJE_MINIMO_ALERTA', monitor.puntaje_minimo)
         
         # Agregar marcas adicionales si existen
         if hasattr(config, 'MARCAS_ADICIONALES'):
             monitor.marcas_autos.extend(config.MARCAS_ADICIONALES)
             print(f"✓ Marcas adicionales agregadas: {len(config.MARCAS_ADICIONALES)}")
+        if hasattr(config, 'PARTES_COMUNES'):
+            monitor.partes_comunes.extend(config.PARTES_COMUNES)
+        if hasattr(config, 'PALABRAS_CLAVE_BUSQUEDA'):
+            monitor.palabras_clave.extend(config.PALABRAS_CLAVE_BUSQUEDA)
         
         print("\n" + "="*60)
         print("✓ Monitor configurado correctamente")
         print("="*60)
         
         # Iniciar monitoreo
-        monitor.iniciar_monitoreo(intervalo=config.INTERVALO_MONITOREO)
+        monitor.iniciar_monitoreo(
+            intervalo=config.INTERVALO_MONITOREO,
+            modo=getattr(config, 'MODO_CAPTURA', 'sondeo'),
+            intervalo_captura=getattr(config, 'INTERVALO_CAPTURA', 1.0)
+        )
         
     except KeyboardInterrupt:
         print("\n\n🛑 Monitor detenido por el usuario")
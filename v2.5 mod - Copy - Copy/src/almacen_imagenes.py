@@ -0,0 +1,81 @@
+"""
+Almacén de imágenes direccionado por contenido
+
+Las fotos originales se guardan como archivos cuyo nombre es su SHA-256,
+repartidos en subcarpetas por los dos primeros caracteres:
+
+    data/imagenes/3f/3f7a...c2
+
+La tabla imagenes solo guarda el hash. La misma foto agregada dos veces
+ocupa espacio una sola vez, la base de datos se mantiene pequeña y los
+respaldos de la base son rápidos.
+"""
+
+import hashlib
+import os
+import threading
+
+# Carpeta del almacén, relativa a la carpeta de la base de datos
+STORE_DIR_NAME = 'imagenes'
+
+# Subcarpeta del almacén con las miniaturas
+THUMBNAILS_DIR_NAME = 'miniaturas'
+
+
+def store_dir_for(db_path):
+    """Carpeta del almacén que corresponde a una base de datos"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), STORE_DIR_NAME)
+
+
+class ImageStore:
+    """Archivos de imagen deduplicados por SHA-256"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def thumbnail_path(self, sha256):
+        """Miniatura precalculada de la imagen (ver miniaturas.py)"""
+        return os.path.join(self.root, THUMBNAILS_DIR_NAME, sha256[:2], f'{sha256}.jpg')
+
+    def exists(self, sha256):
+        return os.path.exists(self.path(sha256))
+
+    def put(self, data):
+        """Guarda los bytes de una imagen y devuelve su SHA-256"""
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self.path(sha256)
+        if not os.path.exists(path):
+            self._write(path, data)
+        return sha256
+
+    def put_thumbnail(self, sha256, data):
+        self._write(self.thumbnail_path(sha256), data)
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escribir en un temporal y renombrar: nunca queda un archivo a medias.
+        # El nombre incluye proceso e hilo para que dos escrituras no choquen.
+        tmp_path = f'{path}.{os.getpid()}-{threading.get_ident()}.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def read(self, sha256):
+        with open(self.path(sha256), 'rb') as f:
+            return f.read()
+
+    def delete(self, sha256):
+        """Borra la imagen y su miniatura"""
+        for path in (self.path(sha256), self.thumbnail_path(sha256)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,127 @@
+"""
+Índices de prefijos para el autocompletado de la ventana Agregar Pieza
+
+Cada campo (nombre, marca, modelo...) guarda sus valores únicos en una
+lista ordenada sin distinguir mayúsculas; las sugerencias para lo que el
+usuario escribió se obtienen con bisect en O(log n), sin recorrer la lista.
+El índice se construye una sola vez al iniciar (en segundo plano) y se
+actualiza con cada pieza guardada, así que abrir el formulario ya no
+consulta la base de datos.
+"""
+
+import threading
+from bisect import bisect_left, insort
+
+# Sugerencias que se muestran en la lista desplegable del Combobox
+MAX_SUGGESTIONS = 200
+
+# Mayor que cualquier carácter: key + PREFIX_END acota todas las claves con ese prefijo
+PREFIX_END = chr(0x10FFFF)
+
+
+def normalize(value):
+    """Texto limpio o None si el valor está vacío"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+class PrefixIndex:
+    """
+    Valores únicos de un campo ordenados sin distinguir mayúsculas.
+
+    Si dos valores solo difieren en mayúsculas se conserva el primero que
+    llegó. Con descending=True las sugerencias salen en orden inverso
+    (ej. años: el más reciente primero).
+    """
+
+    def __init__(self, values=(), descending=False):
+        self.descending = descending
+        unique = {}
+        for value in values:
+            value = normalize(value)
+            if value is not None:
+                unique.setdefault(value.casefold(), value)
+        self._keys = sorted(unique)
+        self._values = {key: unique[key] for key in self._keys}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, value):
+        """Agrega un valor; devuelve False si ya estaba"""
+        value = normalize(value)
+        if value is None:
+            return False
+        key = value.casefold()
+        if key in self._values:
+            return False
+        insort(self._keys, key)
+        self._values[key] = value
+        return True
+
+    def complete(self, prefix='', limit=MAX_SUGGESTIONS):
+        """Hasta limit valores que empiezan con prefix, en orden"""
+        key = (prefix or '').strip().casefold()
+        lo = bisect_left(self._keys, key)
+        hi = bisect_left(self._keys, key + PREFIX_END, lo)
+        if self.descending:
+            keys = self._keys[max(lo, hi - limit):hi][::-1]
+        else:
+            keys = self._keys[lo:min(hi, lo + limit)]
+        return [self._values[k] for k in keys]
+
+
+class AutocompleteIndex:
+    """
+    Un PrefixIndex por columna de piezas, compartido por todas las ventanas.
+
+    fields: {columna: valores_predefinidos}; las columnas en descending se
+    sugieren en orden inverso. build() lee los valores de la base de datos
+    (puede ejecutarse en un hilo de trabajo); add_part() incorpora una pieza
+    recién guardada sin volver a consultar.
+    """
+
+    def __init__(self, repo, fields, descending=()):
+        self.repo = repo
+        self.fields = dict(fields)
+        self.descending = set(descending)
+        self._lock = threading.Lock()
+        self._pending = None
+        self._indexes = {column: PrefixIndex(extra, column in self.descending)
+                         for column, extra in self.fields.items()}
+
+    def build(self):
+        """(Re)construye los índices desde la base de datos"""
+        with self._lock:
+            self._pending = []  # Piezas guardadas mientras se consulta
+        indexes = {}
+        for column, extra in self.fields.items():
+            values = self.repo.distinct_values(column)
+            indexes[column] = PrefixIndex(values + list(extra), column in self.descending)
+        with self._lock:
+            for part in self._pending:
+                self._add_to(indexes, part)
+            self._indexes = indexes
+            self._pending = None
+
+    def add_part(self, part):
+        """Agrega los valores de una pieza recién guardada"""
+        with self._lock:
+            self._add_to(self._indexes, part)
+            if self._pending is not None:
+                self._pending.append(part)
+
+    @staticmethod
+    def _add_to(indexes, part):
+        for column, index in indexes.items():
+            index.add(part.get(column))
+
+    def complete(self, column, prefix='', limit=MAX_SUGGESTIONS):
+        with self._lock:
+            return self._indexes[column].complete(prefix, limit)
+
+    def suggester(self, column):
+        """Función texto -> sugerencias para create_autocomplete_combobox"""
+        return lambda prefix: self.complete(column, prefix)
@@ -0,0 +1,727 @@
+"""
+Capa de acceso a datos del Sistema de Inventario de Autopartes
+
+Compartida por la aplicación de escritorio (inventario_autopartes.py) y el
+monitor de WhatsApp. SQLite corre en modo WAL: los lectores (el monitor) no
+se bloquean mientras la interfaz escribe. Las conexiones se reutilizan desde
+un pool pequeño y cada conexión mantiene su caché de sentencias preparadas.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import busqueda
+import migraciones
+from almacen_imagenes import ImageStore, store_dir_for
+
+# Directorio raíz del proyecto (un nivel arriba de src/)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_DB_PATH = os.path.join(BASE_DIR, 'data', 'autopartes_inventario.db')
+
+# Pragmas aplicados a cada conexión nueva
+PRAGMAS = [
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),     # Seguro con WAL y mucho más rápido que FULL
+    ('cache_size', -20000),        # ~20 MB de caché de páginas por conexión
+    ('mmap_size', 268435456),      # 256 MB mapeados en memoria
+    ('temp_store', 'MEMORY'),
+    ('busy_timeout', 5000),        # Esperar hasta 5 s si otro proceso escribe
+]
+
+# Número de sentencias preparadas que cada conexión mantiene en caché
+STATEMENT_CACHE_SIZE = 256
+
+# Conexiones que mantiene abiertas el pool
+POOL_SIZE = 4
+
+# Filas por página en las tablas que cargan a medida que se hace scroll
+PAGE_SIZE = 100
+
+# Cada cuántas instrucciones de la VM de SQLite se revisa si la consulta fue cancelada
+CANCEL_CHECK_OPCODES = 1000
+
+# Prefijos de los identificadores: AP-20251113-000042, VEH-20251113-000007
+PART_ID_PREFIX = 'AP'
+VEHICLE_ID_PREFIX = 'VEH'
+ID_SEQUENCE_DIGITS = 6
+
+PART_COLUMNS = ('id', 'stock_number', 'nombre', 'marca', 'modelo', 'anio', 'numero_parte',
+                'categoria', 'fabricante', 'condicion', 'precio', 'estante', 'nivel',
+                'ubicacion', 'vehiculo_id', 'notas', 'fecha_ingreso')
+
+VEHICLE_COLUMNS = ('id', 'marca', 'modelo', 'anio', 'vin', 'color', 'motor', 'notas',
+                   'fecha_ingreso')
+
+# Columnas que muestra la tabla de inventario
+INVENTORY_LIST_COLUMNS = ('stock_number', 'nombre', 'marca', 'modelo', 'anio', 'categoria',
+                          'ubicacion', 'precio')
+
+# Orden "más recientes primero" del inventario. Las piezas sin fecha_ingreso
+# quedan al final con '' (NULL no cumpliría la comparación del cursor);
+# índices idx_piezas_fecha_orden e idx_piezas_categoria_fecha_orden
+RECENT_KEY = "COALESCE(p.fecha_ingreso, '')"
+RECENT_ORDER = f' ORDER BY {RECENT_KEY} DESC, p.rowid DESC'
+
+# Columnas del vehículo donador que acompañan a cada pieza en las exportaciones
+EXPORT_VEHICLE_COLUMNS = ('marca', 'modelo', 'anio', 'vin')
+
+# Columnas que usa el monitor para armar las notificaciones
+ALERT_COLUMNS = ('stock_number', 'nombre', 'marca', 'modelo', 'anio',
+                 'categoria', 'ubicacion', 'precio', 'condicion')
+
+# Puntos por cada dato del mensaje que coincide con la pieza (la marca siempre
+# coincide: es requisito). Las alertas se ordenan por la suma
+ALERT_SCORE_WEIGHTS = {'marca': 1, 'modelo': 3, 'anio': 1, 'parte': 3}
+ALERT_MAX_SCORE = sum(ALERT_SCORE_WEIGHTS.values())
+
+# Filtro del buscador por año: la pieza tiene una aplicación cuyo rango lo
+# incluye o cuyo anio no se pudo leer como rango (sirve para cualquier año), o
+# el año aparece como texto en la columna anio (piezas sin aplicación porque
+# no tienen marca). Nunca en el stock number, que lleva la fecha de ingreso.
+# Índice idx_aplicaciones_pieza.
+YEAR_FILTER = (' AND (EXISTS (SELECT 1 FROM aplicaciones a WHERE a.pieza_id = p.id '
+               'AND (a.anio_desde IS NULL OR a.anio_desde <= ? AND a.anio_hasta >= ?)) '
+               'OR p.rowid IN (SELECT rowid FROM piezas_fts WHERE piezas_fts MATCH ?))')
+
+# Límite superior para buscar por prefijo en un índice: 'abc' <= x < 'abc' + PREFIX_END
+PREFIX_END = chr(0x10FFFF)
+
+
+# Triggers AFTER INSERT de piezas y la sentencia (o sentencias, en orden) que
+# hace su trabajo para todas las filas con rowid > ? (usado por insert_parts_bulk)
+BULK_INSERT_CATCHUP = {
+    'piezas_fts_insert': f'''
+        INSERT INTO piezas_fts (rowid, {', '.join(busqueda.FTS_COLUMNS)})
+        SELECT rowid, {', '.join(busqueda.FTS_COLUMNS)} FROM piezas WHERE rowid > ?
+    ''',
+    'estadisticas_piezas_insert': '''
+        INSERT INTO estadisticas_categoria (categoria, piezas, valor)
+        SELECT categoria, COUNT(*), COALESCE(SUM(precio), 0) FROM piezas WHERE rowid > ? GROUP BY categoria
+        ON CONFLICT (categoria) DO UPDATE SET piezas = piezas + excluded.piezas, valor = valor + excluded.valor
+    ''',
+    'aplicaciones_piezas_insert': migraciones.FITMENT_CATCHUP,
+}
+
+# Stock numbers con el formato de reserve_ids() que llegan escritos (importador)
+# suben el contador de su día, para que reserve_ids() no los repita
+ADVANCE_PART_SEQUENCE = migraciones.advance_sequence_sql(PART_ID_PREFIX, ID_SEQUENCE_DIGITS)
+
+
+def select_list(columns, alias='p'):
+    """'p.col1, p.col2, ...' para consultas que unen piezas con piezas_fts"""
+    return ', '.join(f'{alias}.{col}' for col in columns)
+
+
+class ConnectionPool:
+    """Pool de conexiones SQLite configuradas con los pragmas de rendimiento"""
+
+    def __init__(self, db_path, size=POOL_SIZE, pragmas=None):
+        self.db_path = db_path
+        self.size = size
+        self.pragmas = PRAGMAS if pragmas is None else pragmas
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _connect(self):
+        """Abre una conexión nueva y aplica los pragmas"""
+        # check_same_thread=False: la conexión puede pasar entre hilos,
+        # pero el pool garantiza que solo un hilo la use a la vez
+        conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        for name, value in self.pragmas:
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def acquire(self):
+        """Obtiene una conexión del pool (o crea una si todavía hay cupo)"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("El pool de conexiones está cerrado")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+        return self._idle.get()
+
+    def release(self, conn):
+        """Devuelve una conexión al pool"""
+        if self._closed:
+            conn.close()
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Context manager que presta una conexión y la devuelve al terminar"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Cierra todas las conexiones inactivas del pool"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class InventoryRepository:
+    """Acceso a las tablas de piezas, vehículos e imágenes"""
+
+    def __init__(self, db_path=None, pool_size=POOL_SIZE):
+        self.db_path = db_path or DEFAULT_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        self.pool = ConnectionPool(self.db_path, size=pool_size)
+        self.images = ImageStore(store_dir_for(self.db_path))
+
+    # ============================================
+    # OPERACIONES GENÉRICAS
+    # ============================================
+
+    @contextmanager
+    def transaction(self):
+        """Ejecuta un bloque dentro de una transacción (commit o rollback automático)"""
+        with self.pool.connection() as conn:
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def fetchall(self, query, params=(), cancel=None):
+        """
+        Ejecuta una consulta y devuelve todas las filas. Si se pasa cancel
+        (threading.Event), la consulta se interrumpe en cuanto se activa y
+        sqlite3 lanza OperationalError('interrupted').
+        """
+        with self.pool.connection() as conn:
+            if cancel is None:
+                return conn.execute(query, params).fetchall()
+            conn.set_progress_handler(lambda: 1 if cancel.is_set() else 0, CANCEL_CHECK_OPCODES)
+            try:
+                return conn.execute(query, params).fetchall()
+            finally:
+                conn.set_progress_handler(None, 0)
+
+    def iter_chunks(self, query, params=(), chunk_size=1000):
+        """
+        Genera las filas de una consulta en listas de hasta chunk_size
+        (fetchmany), sin cargar el resultado completo en memoria. La conexión
+        queda prestada hasta que el generador termina o se cierra.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        return
+                    yield rows
+            finally:
+                cursor.close()
+
+    def fetchone(self, query, params=()):
+        with self.pool.connection() as conn:
+            return conn.execute(query, params).fetchone()
+
+    def execute(self, query, params=()):
+        with self.transaction() as conn:
+            return conn.execute(query, params).rowcount
+
+    def close(self):
+        self.pool.close()
+
+    # ============================================
+    # ESQUEMA
+    # ============================================
+
+    def init_schema(self):
+        """
+        Crea o actualiza el esquema aplicando las migraciones pendientes.
+        Devuelve (versiones aplicadas, reporte de cambios en planes de consulta).
+        """
+        with self.pool.connection() as conn:
+            return migraciones.migrate_with_report(conn)
+
+    # ============================================
+    # IDENTIFICADORES
+    # ============================================
+
+    def reserve_ids(self, prefix, count=1, day=None):
+        """
+        Reserva count identificadores consecutivos PREFIJO-AAAAMMDD-NNNNNN.
+
+        El contador por prefijo y día vive en la tabla secuencias y se
+        incrementa bajo BEGIN IMMEDIATE, así que dos ventanas, un importador
+        o el monitor nunca obtienen el mismo número. Los importadores piden
+        bloques grandes en una sola llamada.
+        """
+        if count < 1:
+            return []
+        day = day or datetime.now().strftime('%Y%m%d')
+        with self.pool.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.execute('''
+                    INSERT INTO secuencias (prefijo, fecha, ultimo) VALUES (?, ?, ?)
+                    ON CONFLICT (prefijo, fecha) DO UPDATE SET ultimo = ultimo + excluded.ultimo
+                ''', (prefix, day, count))
+                last = conn.execute('SELECT ultimo FROM secuencias WHERE prefijo = ? AND fecha = ?',
+                                    (prefix, day)).fetchone()[0]
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        return [f'{prefix}-{day}-{n:0{ID_SEQUENCE_DIGITS}d}' for n in range(last - count + 1, last + 1)]
+
+    def next_stock_number(self):
+        return self.reserve_ids(PART_ID_PREFIX)[0]
+
+    def next_vehicle_id(self):
+        return self.reserve_ids(VEHICLE_ID_PREFIX)[0]
+
+    # ============================================
+    # PIEZAS
+    # ============================================
+
+    def insert_part(self, part, images=(), thumbnails=()):
+        """
+        Inserta una pieza (dict con PART_COLUMNS) y sus imágenes (bytes) en
+        una sola transacción. Las imágenes se guardan antes en el almacén;
+        thumbnails, si se pasa, trae la miniatura de cada imagen en el mismo orden.
+        """
+        hashes = [self.images.put(data) for data in images]
+        has_thumbnail = [False] * len(hashes)
+        for i, (sha256, thumb) in enumerate(zip(hashes, thumbnails)):
+            if thumb:
+                self.images.put_thumbnail(sha256, thumb)
+                has_thumbnail[i] = True
+        placeholders = ', '.join('?' * len(PART_COLUMNS))
+        try:
+            with self.transaction() as conn:
+                rowid = conn.execute(f'INSERT INTO piezas ({", ".join(PART_COLUMNS)}) VALUES ({placeholders})',
+                                     [part.get(col) for col in PART_COLUMNS]).lastrowid
+                conn.execute(ADVANCE_PART_SEQUENCE, (rowid - 1,))
+                conn.executemany('INSERT INTO imagenes (pieza_id, sha256, orden, miniatura) VALUES (?, ?, ?, ?)',
+                                 [(part['id'], sha256, i, int(has_thumbnail[i]))
+                                  for i, sha256 in enumerate(hashes)])
+        except Exception:
+            self.remove_unreferenced_images(hashes)
+            raise
+
+    def insert_parts_bulk(self, parts):
+        """
+        Inserta muchas piezas (dicts con PART_COLUMNS) en una sola transacción.
+
+        Los triggers por fila de BULK_INSERT_CATCHUP se suspenden durante el
+        lote y cada uno se reemplaza por una sola sentencia sobre las filas
+        nuevas (unas 3 veces más rápido). Todo ocurre dentro de la
+        transacción: las demás conexiones nunca ven la tabla sin triggers, y
+        si el lote falla el rollback también restaura los triggers.
+        """
+        placeholders = ', '.join('?' * len(PART_COLUMNS))
+        with self.transaction() as conn:
+            # sqlite3 no abre la transacción implícita antes de un DROP: sin
+            # este BEGIN los triggers se borrarían en modo autocommit
+            conn.execute('BEGIN IMMEDIATE')
+            triggers = [conn.execute("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                                     (name,)).fetchone()[0] for name in BULK_INSERT_CATCHUP]
+            last_rowid = conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM piezas').fetchone()[0]
+            for name in BULK_INSERT_CATCHUP:
+                conn.execute(f'DROP TRIGGER {name}')
+            conn.executemany(f'INSERT INTO piezas ({", ".join(PART_COLUMNS)}) VALUES ({placeholders})',
+                             ([part.get(col) for col in PART_COLUMNS] for part in parts))
+            # Sin rowid explícito, las filas nuevas siempre quedan después del máximo anterior
+            for catchup in BULK_INSERT_CATCHUP.values():
+                for statement in ((catchup,) if isinstance(catchup, str) else catchup):
+                    conn.execute(statement, (last_rowid,))
+            conn.execute(ADVANCE_PART_SEQUENCE, (last_rowid,))
+            for trigger_sql in triggers:
+                conn.execute(trigger_sql)
+
+    def existing_stock_numbers(self, stock_numbers):
+        """Cuáles de los stock numbers dados ya están en piezas"""
+        stock_numbers = list(stock_numbers)
+        found = set()
+        # De a 500 para no pasar el límite de parámetros de SQLite
+        for start in range(0, len(stock_numbers), 500):
+            chunk = stock_numbers[start:start + 500]
+            found.update(row[0] for row in self.fetchall(
+                f'SELECT stock_number FROM piezas WHERE stock_number IN ({", ".join("?" * len(chunk))})',
+                chunk))
+        return found
+
+    def delete_part(self, stock_number):
+        """Elimina una pieza, sus registros de imágenes y los archivos que ya nadie usa"""
+        with self.transaction() as conn:
+            hashes = [row[0] for row in conn.execute(
+                'SELECT sha256 FROM imagenes WHERE pieza_id = ?', (stock_number,))]
+            conn.execute('DELETE FROM imagenes WHERE pieza_id = ?', (stock_number,))
+            conn.execute('DELETE FROM piezas WHERE stock_number = ?', (stock_number,))
+        self.remove_unreferenced_images(hashes)
+
+    def remove_unreferenced_images(self, hashes):
+        """Borra del almacén los archivos que ninguna fila de imagenes referencia"""
+        for sha256 in set(hashes):
+            if not self.fetchone('SELECT 1 FROM imagenes WHERE sha256 = ? LIMIT 1', (sha256,)):
+                self.images.delete(sha256)
+
+    def get_part(self, stock_number):
+        return self.fetchone(f'SELECT {select_list(PART_COLUMNS)} FROM piezas p WHERE stock_number = ?',
+                             (stock_number,))
+
+    def get_part_images(self, part_id):
+        """SHA-256 de las imágenes de una pieza, en el orden en que se capturaron"""
+        return [row[0] for row in self.fetchall(
+            'SELECT sha256 FROM imagenes WHERE pieza_id = ? ORDER BY orden', (part_id,))]
+
+    def images_without_thumbnail(self, limit=100):
+        """Hashes de imágenes cuya miniatura todavía no se generó"""
+        return [row[0] for row in self.fetchall(
+            'SELECT DISTINCT sha256 FROM imagenes WHERE miniatura = 0 LIMIT ?', (limit,))]
+
+    def mark_thumbnail(self, sha256, status=1):
+        """Registra la miniatura como generada (1) o imposible de generar (-1)"""
+        self.execute('UPDATE imagenes SET miniatura = ? WHERE sha256 = ? AND miniatura = 0', (status, sha256))
+
+    def _year_filter(self, years):
+        """Condiciones y parámetros para los años escritos en el buscador"""
+        params = []
+        for year in years:
+            params.extend([year, year, f'{{anio}} : {busqueda.build_match_query(str(year))}'])
+        return YEAR_FILTER * len(years), params
+
+    def list_parts(self, search='', category=None, cancel=None):
+        """
+        Piezas para la tabla de inventario. Sin búsqueda: más recientes primero.
+        Con búsqueda: índice FTS5 por prefijo, ordenado por relevancia (BM25).
+        Los años del texto ('ford 2015') se buscan en los rangos de aplicaciones.
+        """
+        text, years = busqueda.split_years(search)
+        match = busqueda.build_match_query(text)
+        params = []
+
+        if match:
+            # CROSS JOIN fija el orden: primero el índice FTS, luego piezas por rowid
+            query = f'''
+                SELECT {select_list(INVENTORY_LIST_COLUMNS)}
+                FROM piezas_fts f CROSS JOIN piezas p ON p.rowid = f.rowid
+                WHERE piezas_fts MATCH ?
+            '''
+            params.append(match)
+        else:
+            query = f'SELECT {select_list(INVENTORY_LIST_COLUMNS)} FROM piezas p WHERE 1=1'
+
+        if category:
+            query += ' AND p.categoria = ?'
+            params.append(category)
+        year_filter, year_params = self._year_filter(years)
+        query += year_filter
+        params.extend(year_params)
+
+        query += ' ORDER BY f.rank, p.fecha_ingreso DESC' if match else RECENT_ORDER
+        return self.fetchall(query, params, cancel=cancel)
+
+    def list_parts_page(self, search='', category=None, after=None, limit=PAGE_SIZE, cancel=None):
+        """
+        Una página del inventario. Devuelve (filas, cursor_siguiente); el
+        cursor es None cuando ya no hay más filas.
+
+        Sin búsqueda se pagina por llave (RECENT_KEY, rowid) sobre el
+        índice de fecha: cada página cuesta lo mismo sin importar cuántas
+        piezas haya. Con búsqueda el orden es por relevancia y el cursor es
+        el desplazamiento dentro de los resultados.
+        """
+        text, years = busqueda.split_years(search)
+        match = busqueda.build_match_query(text)
+        year_filter, year_params = self._year_filter(years)
+        params = []
+
+        if match:
+            offset = after or 0
+            query = f'''
+                SELECT {select_list(INVENTORY_LIST_COLUMNS)}
+                FROM piezas_fts f CROSS JOIN piezas p ON p.rowid = f.rowid
+                WHERE piezas_fts MATCH ?
+            '''
+            params.append(match)
+            if category:
+                query += ' AND p.categoria = ?'
+                params.append(category)
+            query += year_filter
+            params.extend(year_params)
+            query += ' ORDER BY f.rank, p.fecha_ingreso DESC LIMIT ? OFFSET ?'
+            params.extend([limit, offset])
+            rows = self.fetchall(query, params, cancel=cancel)
+            return rows, (offset + len(rows) if len(rows) == limit else None)
+
+        query = f'SELECT {select_list(INVENTORY_LIST_COLUMNS)}, {RECENT_KEY}, p.rowid FROM piezas p WHERE 1=1'
+        if category:
+            query += ' AND p.categoria = ?'
+            params.append(category)
+        query += year_filter
+        params.extend(year_params)
+        if after:
+            # La primera condición deja al índice saltar directo a la posición del cursor
+            query += f' AND {RECENT_KEY} <= ? AND ({RECENT_KEY}, p.rowid) < (?, ?)'
+            params.extend([after[0], *after])
+        query += RECENT_ORDER + ' LIMIT ?'
+        params.append(limit)
+        rows = self.fetchall(query, params, cancel=cancel)
+        next_cursor = tuple(rows[-1][-2:]) if len(rows) == limit else None
+        return [row[:-2] for row in rows], next_cursor
+
+    def export_columns(self, include_images=False):
+        """Nombres de columna de las filas que genera iter_parts_export()"""
+        columns = PART_COLUMNS + tuple(f'vehiculo_{col}' for col in EXPORT_VEHICLE_COLUMNS)
+        return columns + ('imagenes',) if include_images else columns
+
+    def iter_parts_export(self, search='', category=None, include_images=False, chunk_size=1000):
+        """
+        Piezas con los datos de su vehículo donador, en bloques de chunk_size
+        filas. Filtra igual que el buscador del inventario; con
+        include_images la última columna trae los SHA-256 separados por ';'.
+        """
+        text, years = busqueda.split_years(search)
+        match = busqueda.build_match_query(text)
+        columns = [select_list(PART_COLUMNS), select_list(EXPORT_VEHICLE_COLUMNS, 'v')]
+        if include_images:
+            # Subconsulta resuelta con el índice (pieza_id, orden, sha256)
+            columns.append('(SELECT group_concat(sha256, \';\') FROM '
+                           '(SELECT sha256 FROM imagenes WHERE pieza_id = p.id ORDER BY orden))')
+        params = []
+        if match:
+            query = f'''
+                SELECT {', '.join(columns)}
+                FROM piezas_fts f CROSS JOIN piezas p ON p.rowid = f.rowid
+                LEFT JOIN vehiculos v ON v.id = p.vehiculo_id
+                WHERE piezas_fts MATCH ?
+            '''
+            params.append(match)
+        else:
+            query = f'''
+                SELECT {', '.join(columns)}
+                FROM piezas p LEFT JOIN vehiculos v ON v.id = p.vehiculo_id
+                WHERE 1=1
+            '''
+        if category:
+            query += ' AND p.categoria = ?'
+            params.append(category)
+        year_filter, year_params = self._year_filter(years)
+        query += year_filter
+        params.extend(year_params)
+        query += ' ORDER BY f.rank, p.fecha_ingreso DESC' if match else RECENT_ORDER
+        return self.iter_chunks(query, params, chunk_size)
+
+    def list_vehicle_parts(self, vehicle_id):
+        return self.fetchall('''
+            SELECT stock_number, nombre, categoria, ubicacion, precio
+            FROM piezas WHERE vehiculo_id = ?
+        ''', (vehicle_id,))
+
+    def distinct_values(self, column, table='piezas'):
+        """Valores únicos no vacíos de una columna (para autocompletado)"""
+        if column not in PART_COLUMNS + VEHICLE_COLUMNS or table not in ('piezas', 'vehiculos'):
+            raise ValueError(f"Columna no permitida: {table}.{column}")
+        return [row[0] for row in self.fetchall(
+            f'SELECT DISTINCT {column} FROM {table} '
+            f"WHERE {column} IS NOT NULL AND {column} != '' ORDER BY {column}")]
+
+    def _search_fts(self, match, columns, limit):
+        return self.fetchall(f'''
+            SELECT {select_list(columns)}
+            FROM piezas_fts f CROSS JOIN piezas p ON p.rowid = f.rowid
+            WHERE piezas_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+        ''', (match, limit))
+
+    def search_parts_for_alert(self, marca, modelo=None, anio=None, nombre_parte=None, limit=20,
+                               min_score=0):
+        """
+        Piezas para una alerta del monitor, de la más a la menos relevante.
+
+        La marca es obligatoria (incluye sus alias: 'vw' -> Volkswagen). Cada
+        pieza suma puntos (ALERT_SCORE_WEIGHTS) por modelo (prefijo de la
+        primera palabra), año dentro del rango de una de sus aplicaciones y
+        nombre de parte o sinónimo. Marca y modelo se resuelven primero en los
+        diccionarios marcas/modelos; los candidatos salen de los índices de
+        aplicaciones y de piezas_fts, y solo se leen de piezas las limit filas
+        que se devuelven. Devuelve filas ALERT_COLUMNS más la columna de
+        puntos, con puntos >= min_score.
+        """
+        brands = busqueda.brand_keys(marca)
+        model = busqueda.model_key(modelo)
+        part_match = busqueda.build_part_query(nombre_parte)
+        year = int(anio) if str(anio or '').isdigit() else None
+        if not brands:
+            return []
+
+        # marcas guarda solo la clave canónica (los alias se unen al escribir)
+        brand_ids = [row[0] for row in self.fetchall('SELECT id FROM marcas WHERE clave = ?', (brands[0],))]
+        if not brand_ids:
+            return []
+        in_brands = ', '.join('?' * len(brand_ids))
+        model_ids = []
+        if model:
+            model_ids = [row[0] for row in self.fetchall(
+                f'SELECT id FROM modelos WHERE marca_id IN ({in_brands}) AND clave >= ? AND clave < ?',
+                (*brand_ids, model, model + PREFIX_END))]
+
+        weights = ALERT_SCORE_WEIGHTS
+        best = (weights['marca'] + (weights['modelo'] if model_ids else 0)
+                + (weights['anio'] if year else 0) + (weights['parte'] if part_match else 0))
+        if best < min_score:
+            return []
+
+        # Cada candidato es una aplicación: (pieza, coincide modelo, coincide parte, coincide año)
+        in_models = ', '.join('?' * len(model_ids))
+        year_match = 'COALESCE(? BETWEEN a.anio_desde AND a.anio_hasta, 0)'
+        candidates, params = [], []
+        if model_ids:
+            candidates.append(f'SELECT a.pieza_id, 1, 0, {year_match} FROM aplicaciones a '
+                              f'WHERE a.modelo_id IN ({in_models})')
+            params += [year, *model_ids]
+        if part_match:
+            # La marca también se filtra en el índice FTS para leer menos filas
+            brand_phrases = ' OR '.join(f'"{" ".join(busqueda.tokenize(b))}"'
+                                        for b in brands if busqueda.tokenize(b))
+            model_flag = f'a.modelo_id IN ({in_models})' if model_ids else '0'
+            candidates.append(f'SELECT a.pieza_id, {model_flag}, 1, {year_match} '
+                              'FROM piezas_fts f CROSS JOIN piezas p ON p.rowid = f.rowid '
+                              'CROSS JOIN aplicaciones a ON a.pieza_id = p.id '
+                              f'WHERE piezas_fts MATCH ? AND a.marca_id IN ({in_brands})')
+            params += [*model_ids, year, f'{part_match} AND {{marca}} : ({brand_phrases})', *brand_ids]
+        if not candidates:
+            # Solo la marca: las del año (rango en el índice) y las más recientes
+            recent = (f'SELECT * FROM (SELECT a.pieza_id, 0, 0, {year_match} FROM aplicaciones a '
+                      f'WHERE a.marca_id IN ({in_brands}) ORDER BY a.rowid DESC LIMIT ?)')
+            candidates.append(recent)
+            params += [year, *brand_ids, limit]
+            if year:
+                candidates.append(f'SELECT * FROM (SELECT a.pieza_id, 0, 0, 1 FROM aplicaciones a '
+                                  f'WHERE a.marca_id IN ({in_brands}) AND a.anio_desde <= ? '
+                                  'AND a.anio_hasta >= ? LIMIT ?)')
+                params += [*brand_ids, year, year, limit]
+
+        return self.fetchall(f'''
+            WITH candidatos(pieza_id, modelo, parte, anio) AS ({' UNION ALL '.join(candidates)}),
+            puntuados AS (
+                SELECT pieza_id, {weights['marca']} + MAX(modelo * {weights['modelo']} + anio * {weights['anio']})
+                       + MAX(parte) * {weights['parte']} AS puntos
+                FROM candidatos GROUP BY pieza_id
+            ),
+            mejores AS (
+                SELECT pieza_id, puntos FROM puntuados WHERE puntos >= ?
+                ORDER BY puntos DESC, pieza_id DESC LIMIT ?
+            )
+            SELECT {select_list(ALERT_COLUMNS)}, m.puntos
+            FROM mejores m CROSS JOIN piezas p ON p.id = m.pieza_id
+            ORDER BY m.puntos DESC, m.pieza_id DESC
+        ''', (*params, min_score, limit))
+
+    def search_parts_by_brand(self, marca, limit=20):
+        match = busqueda.build_any_query([marca], columns=('marca',))
+        if not match:
+            return []
+        return self._search_fts(match, ALERT_COLUMNS, limit)
+
+    # ============================================
+    # VEHÍCULOS
+    # ============================================
+
+    def insert_vehicle(self, vehicle):
+        placeholders = ', '.join('?' * len(VEHICLE_COLUMNS))
+        with self.transaction() as conn:
+            conn.execute(f'INSERT INTO vehiculos ({", ".join(VEHICLE_COLUMNS)}) VALUES ({placeholders})',
+                         [vehicle.get(col) for col in VEHICLE_COLUMNS])
+
+    def insert_vehicles_bulk(self, vehicles):
+        """Inserta muchos vehículos (dicts con VEHICLE_COLUMNS) en una sola transacción"""
+        placeholders = ', '.join('?' * len(VEHICLE_COLUMNS))
+        with self.transaction() as conn:
+            conn.executemany(f'INSERT INTO vehiculos ({", ".join(VEHICLE_COLUMNS)}) VALUES ({placeholders})',
+                             ([vehicle.get(col) for col in VEHICLE_COLUMNS] for vehicle in vehicles))
+
+    def vehicle_ids(self):
+        return {row[0] for row in self.fetchall('SELECT id FROM vehiculos')}
+
+    def delete_vehicle(self, vehicle_id):
+        """Elimina un vehículo; sus piezas conservan el registro sin referencia"""
+        with self.transaction() as conn:
+            conn.execute('UPDATE piezas SET vehiculo_id = NULL WHERE vehiculo_id = ?', (vehicle_id,))
+            conn.execute('DELETE FROM vehiculos WHERE id = ?', (vehicle_id,))
+
+    def get_vehicle(self, vehicle_id):
+        return self.fetchone('SELECT marca, modelo, anio, vin FROM vehiculos WHERE id = ?', (vehicle_id,))
+
+    def list_vehicles(self):
+        return self.fetchall('SELECT id, marca, modelo, anio, vin, color, motor FROM vehiculos')
+
+    def list_vehicles_page(self, after=None, limit=PAGE_SIZE, cancel=None):
+        """
+        Una página de la pestaña Vehículos con el número de piezas de cada
+        uno, en una sola consulta. Devuelve (filas, cursor_siguiente).
+
+        Primero se toma la página de vehículos (por rowid) y solo esas filas
+        se unen con piezas por el índice de vehiculo_id, así que el costo no
+        depende del tamaño de la flota ni del inventario.
+        """
+        rows = self.fetchall('''
+            SELECT v.id, v.marca, v.modelo, v.anio, v.vin, v.color, v.motor, COUNT(p.vehiculo_id), v.rowid
+            FROM (SELECT rowid, * FROM vehiculos WHERE rowid > ? ORDER BY rowid LIMIT ?) v
+            LEFT JOIN piezas p ON p.vehiculo_id = v.id
+            GROUP BY v.rowid
+            ORDER BY v.rowid
+        ''', (after or 0, limit), cancel=cancel)
+        next_cursor = rows[-1][-1] if len(rows) == limit else None
+        return [row[:-1] for row in rows], next_cursor
+
+    def count_vehicle_parts(self, vehicle_id):
+        return self.fetchone('SELECT COUNT(*) FROM piezas WHERE vehiculo_id = ?', (vehicle_id,))[0]
+
+    # ============================================
+    # ESTADÍSTICAS
+    # ============================================
+
+    def dashboard_stats(self):
+        """
+        Totales del dashboard: piezas, categorías, vehículos y valor. Se leen
+        de las tablas que mantienen los triggers (migración 7), sin recorrer
+        piezas ni vehiculos.
+        """
+        with self.pool.connection() as conn:
+            total_piezas, total_categorias, valor_total = conn.execute('''
+                SELECT COALESCE(SUM(piezas), 0), COALESCE(SUM(piezas > 0), 0), COALESCE(SUM(valor), 0)
+                FROM estadisticas_categoria
+            ''').fetchone()
+            total_vehiculos = conn.execute(
+                "SELECT valor FROM contadores WHERE nombre = 'vehiculos'").fetchone()[0]
+        # Sumar y restar precios deja residuos de punto flotante
+        valor_total = round(valor_total, 2)
+        return {
+            'total_piezas': total_piezas,
+            'total_categorias': total_categorias,
+            'total_vehiculos': total_vehiculos,
+            'valor_total': valor_total,
+        }
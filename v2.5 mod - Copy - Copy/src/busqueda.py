@@ -0,0 +1,182 @@
+"""
+Búsqueda de texto completo (FTS5) sobre el inventario de piezas
+
+La tabla virtual piezas_fts (ver migraciones.py) indexa nombre, marca,
+modelo, año, stock y ubicación. Se mantiene sincronizada con piezas por
+triggers y usa el tokenizador unicode61 con remove_diacritics, así que
+'bateria' encuentra 'Batería' y viceversa.
+"""
+
+import re
+import unicodedata
+
+# Columnas indexadas en piezas_fts (mismo orden que en la migración)
+FTS_COLUMNS = ('nombre', 'marca', 'modelo', 'anio', 'stock_number', 'ubicacion')
+
+# Separa en los mismos tokens que unicode61 (letras y dígitos)
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Palabra del buscador que se interpreta como año de modelo
+YEAR_RE = re.compile(r'(?:19|20)\d\d')
+
+
+def normalize_text(text):
+    """Minúsculas y sin acentos: 'Batería' -> 'bateria'"""
+    decomposed = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """Tokens normalizados de un texto libre"""
+    return [token for token in TOKEN_RE.findall(normalize_text(text).replace('_', ' '))]
+
+
+def prefix_terms(text):
+    """Cada token como término de prefijo FTS5 entre comillas: "bat"*"""
+    return [f'"{token}"*' for token in tokenize(text)]
+
+
+def split_years(text):
+    """
+    Separa los años de modelo ('2015') del resto del texto del buscador:
+    los años se filtran por rango en aplicaciones, no como texto.
+    Devuelve (texto_sin_años, [años]).
+    """
+    tokens = tokenize(text)
+    years = [int(token) for token in tokens if YEAR_RE.fullmatch(token)]
+    rest = ' '.join(token for token in tokens if not YEAR_RE.fullmatch(token))
+    return rest, years
+
+
+def build_match_query(text):
+    """
+    Consulta MATCH para el buscador del inventario: todas las palabras deben
+    aparecer (AND implícito) y la última puede estar a medio escribir.
+    Devuelve None si el texto no tiene palabras buscables.
+    """
+    terms = prefix_terms(text)
+    return ' '.join(terms) if terms else None
+
+
+def build_any_query(values, columns=None):
+    """
+    Consulta MATCH que acepta cualquiera de los valores (OR). Las piezas que
+    coinciden en más valores obtienen mejor puntuación BM25.
+    """
+    terms = []
+    for value in values:
+        if value:
+            terms.extend(prefix_terms(value))
+    if not terms:
+        return None
+    query = ' OR '.join(dict.fromkeys(terms))
+    if columns:
+        query = f"{{{' '.join(columns)}}} : ({query})"
+    return query
+
+
+# ============================================
+# COINCIDENCIAS PARA ALERTAS DEL MONITOR
+# ============================================
+
+# Plegado que SQLite puede calcular sin funciones propias (columnas generadas
+# marca_norm y modelo_norm, ver migraciones.py): minúsculas ASCII y sin los
+# acentos del español (más ë y ç de Citroën). Cada letra es un replace()
+# anidado y el parser de SQLite no admite muchos más. Cambiarlo requiere una
+# migración que recree esas columnas.
+FOLD_FROM = 'ÁÉÍÓÚÜÑËÇáéíóúüñëç'
+FOLD_TO = 'aeiouunecaeiouunec'
+FOLD_TABLE = str.maketrans(FOLD_FROM + 'ABCDEFGHIJKLMNOPQRSTUVWXYZ',
+                           FOLD_TO + 'abcdefghijklmnopqrstuvwxyz')
+
+# Marca canónica -> otras formas en que se escribe (en piezas o en mensajes).
+# Las piezas se guardan en marcas con la canónica (tabla marcas_alias);
+# cambiarlo requiere una migración que la vuelva a llenar.
+BRAND_ALIASES = {
+    'volkswagen': ['vw'],
+    'chevrolet': ['chevy'],
+    'mercedes-benz': ['mercedes benz', 'mercedes', 'benz'],
+    'alfa romeo': ['alfa'],
+}
+BRAND_CANONICAL = {alias: canonical for canonical, aliases in BRAND_ALIASES.items() for alias in aliases}
+
+# Nombres de partes equivalentes (cualquiera encuentra a los demás)
+PART_SYNONYMS = [
+    ['cofre', 'capo'],
+    ['defensa', 'parachoques', 'fascia', 'bumper'],
+    ['clutch', 'embrague'],
+    ['faro', 'farol'],
+    ['calavera', 'stop', 'luz trasera'],
+    ['espejo', 'retrovisor'],
+    ['amortiguador', 'shock'],
+    ['muelle', 'resorte'],
+    ['bateria', 'acumulador'],
+    ['transmision', 'caja de velocidades'],
+    ['flecha', 'semieje'],
+    ['motor de arranque', 'marcha'],
+    ['modulo', 'computadora', 'ecu'],
+    ['switch', 'interruptor'],
+    ['parabrisas', 'medallon'],
+]
+
+
+def sql_fold(column):
+    """Expresión SQL equivalente a fold_key() sobre una columna"""
+    expr = column
+    for src, dst in zip(FOLD_FROM, FOLD_TO):
+        expr = f"replace({expr}, '{src}', '{dst}')"
+    return f'lower(trim({expr}))'
+
+
+def fold_key(text):
+    """Clave de comparación igual a la que calcula SQLite con sql_fold()"""
+    return str(text or '').strip(' ').translate(FOLD_TABLE)
+
+
+def canonical_brand(brand):
+    """Clave de la marca en la tabla marcas ('VW' -> 'volkswagen')"""
+    key = fold_key(brand)
+    return BRAND_CANONICAL.get(key, key)
+
+
+def brand_keys(brand):
+    """
+    Formas plegadas de la marca escrita en un mensaje: primero la canónica
+    y después sus alias ('chevy' -> ['chevrolet', 'chevy']).
+    """
+    canonical = canonical_brand(brand)
+    if not canonical:
+        return []
+    return [canonical] + BRAND_ALIASES.get(canonical, [])
+
+
+def model_key(model):
+    """
+    Prefijo de modelo_norm para el modelo de un mensaje: su primera palabra
+    ('Sentra faro' -> 'sentra', que también encuentra 'Sentra B13').
+    """
+    words = str(model or '').split()
+    return fold_key(words[0].strip('¿?¡!.,;:()"\'')) if words else ''
+
+
+def part_names(name):
+    """El nombre de parte más sus sinónimos, normalizados"""
+    normalized = ' '.join(tokenize(name))
+    if not normalized:
+        return []
+    names = [normalized]
+    for group in PART_SYNONYMS:
+        if normalized in group:
+            names.extend(group)
+    return list(dict.fromkeys(names))
+
+
+def build_part_query(name):
+    """
+    Consulta MATCH sobre la columna nombre con el nombre de parte y sus
+    sinónimos como frases con prefijo ('faro' encuentra 'Faros delanteros').
+    """
+    phrases = [f'"{name}"*' for name in part_names(name)]
+    if not phrases:
+        return None
+    return f"{{nombre}} : ({' OR '.join(phrases)})"
@@ -0,0 +1,123 @@
+"""
+Exportación del inventario a CSV, JSON Lines o Parquet
+
+Las piezas (con los datos de su vehículo donador) se leen en bloques con
+fetchmany y se escriben bloque por bloque, así que la memoria usada no
+depende del tamaño del inventario. Los filtros son los mismos del buscador
+de la pestaña Inventario.
+
+Ejecuta: python src/exportador.py salida.csv [--buscar texto] [--categoria Motor] [--imagenes]
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from base_datos import InventoryRepository
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None  # Solo hace falta para exportar a Parquet
+
+# Filas que se leen y escriben por bloque
+CHUNK_SIZE = 5000
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet'}
+
+
+def format_for(path):
+    """Formato según la extensión del archivo de salida"""
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"Extensión no soportada: {path} (usa .csv, .jsonl o .parquet)")
+    return fmt
+
+
+def write_csv(chunks, columns, path):
+    # utf-8-sig: Excel reconoce los acentos al abrir el archivo
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for rows in chunks:
+            writer.writerows(rows)
+            yield len(rows)
+
+
+def write_jsonl(chunks, columns, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for rows in chunks:
+            for row in rows:
+                record = dict(zip(columns, row))
+                if 'imagenes' in record:
+                    record['imagenes'] = record['imagenes'].split(';') if record['imagenes'] else []
+                f.write(json.dumps(record, ensure_ascii=False))
+                f.write('\n')
+            yield len(rows)
+
+
+def write_parquet(chunks, columns, path):
+    if pa is None:
+        raise ImportError("Para exportar a Parquet instala pyarrow: pip install pyarrow")
+    types = {'precio': pa.float64(), 'nivel': pa.int64()}
+    schema = pa.schema([(col, types.get(col, pa.string())) for col in columns])
+    # Cada bloque se escribe como un row group: no se acumula la tabla completa
+    with pq.ParquetWriter(path, schema) as writer:
+        for rows in chunks:
+            arrays = [[row[i] for row in rows] for i in range(len(columns))]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield len(rows)
+
+
+WRITERS = {'csv': write_csv, 'jsonl': write_jsonl, 'parquet': write_parquet}
+
+
+def export_parts(repo, path, search='', category=None, include_images=False, fmt=None,
+                 chunk_size=CHUNK_SIZE, on_progress=None):
+    """
+    Exporta las piezas que coinciden con search/category a path. El formato
+    se deduce de la extensión si no se indica. Devuelve las filas escritas.
+    """
+    fmt = fmt or format_for(path)
+    columns = repo.export_columns(include_images)
+    chunks = repo.iter_parts_export(search, category, include_images, chunk_size)
+    written = 0
+    try:
+        for count in WRITERS[fmt](chunks, columns, path):
+            written += count
+            if on_progress:
+                on_progress(written)
+    finally:
+        chunks.close()  # Devuelve la conexión al pool aunque la escritura falle
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta el inventario a CSV, JSON Lines o Parquet")
+    parser.add_argument('archivo', help="Archivo de salida (.csv, .jsonl o .parquet)")
+    parser.add_argument('--buscar', default='', help="Mismo texto que en el buscador del inventario")
+    parser.add_argument('--categoria', help="Solo piezas de esta categoría")
+    parser.add_argument('--imagenes', action='store_true', help="Incluir los SHA-256 de las fotos")
+    parser.add_argument('--db', help="Ruta de la base de datos (por defecto data/autopartes_inventario.db)")
+    args = parser.parse_args(argv)
+
+    repo = InventoryRepository(args.db)
+    try:
+        repo.init_schema()
+        start = time.perf_counter()
+        written = export_parts(repo, args.archivo, args.buscar, args.categoria, args.imagenes,
+                               on_progress=lambda rows: print(f"   {rows} filas escritas...", end='\r'))
+        elapsed = time.perf_counter() - start
+    finally:
+        repo.close()
+    print()
+    print(f"Piezas exportadas: {written} -> {args.archivo} ({elapsed:.1f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""
+Importación masiva de piezas y vehículos desde CSV o XLSX
+
+El archivo se lee fila por fila (nunca completo en memoria). Cada fila se
+valida contra las listas de config/config.py; las válidas se insertan en
+lotes de BATCH_SIZE con executemany, un lote por transacción, y los números
+de stock se reservan por bloque. Las filas con errores se reportan con su
+número de línea y no detienen la importación; si un lote choca con la base
+(IntegrityError) se reintenta fila por fila y solo las que fallan se reportan.
+
+Ejecuta: python src/importador.py piezas inventario.xlsx [--db ruta] [--validar]
+"""
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import busqueda
+from base_datos import BASE_DIR, PART_ID_PREFIX, VEHICLE_ID_PREFIX, InventoryRepository
+
+# Listas válidas (categorías, condiciones, estantes) de config/config.py
+if BASE_DIR not in sys.path:
+    sys.path.append(BASE_DIR)
+try:
+    from config import config as app_config
+except ImportError:
+    # Con config/ en sys.path (run_monitor.py) "config" ya es el propio config.py
+    import config as app_config
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None  # Solo hace falta para archivos .xlsx
+
+# Filas por transacción
+BATCH_SIZE = 5000
+
+# Encabezados alternativos aceptados (ya normalizados: minúsculas, sin acentos)
+HEADER_ALIASES = {
+    'ano': 'anio',
+    'stock': 'stock_number',
+    'numero_de_parte': 'numero_parte',
+    'no_parte': 'numero_parte',
+    'vehiculo': 'vehiculo_id',
+}
+
+# Valores por defecto de la ventana "Agregar Pieza"
+PART_DEFAULTS = {'condicion': 'Usada - Buena', 'estante': 'A', 'nivel': '1'}
+
+ImportResult = namedtuple('ImportResult', 'rows inserted errors')
+RowError = namedtuple('RowError', 'line message')
+
+
+def normalize_header(name):
+    key = '_'.join(busqueda.normalize_text(name).split())
+    return HEADER_ALIASES.get(key, key)
+
+
+def cell_text(value):
+    """Texto de una celda CSV/XLSX: 2012.0 -> '2012', None -> ''"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def read_rows(path):
+    """Genera (número de línea, dict) por cada fila con datos del archivo"""
+    if os.path.splitext(path)[1].lower() in ('.xlsx', '.xlsm'):
+        yield from _read_xlsx(path)
+    else:
+        yield from _read_csv(path)
+
+
+def _read_csv(path):
+    # utf-8-sig: Excel agrega BOM al guardar CSV en UTF-8
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        header = [normalize_header(name) for name in next(reader, [])]
+        for values in reader:
+            if any(cell.strip() for cell in values):
+                yield reader.line_num, dict(zip(header, map(cell_text, values)))
+
+
+def _read_xlsx(path):
+    if openpyxl is None:
+        raise ImportError("Para importar archivos .xlsx instala openpyxl: pip install openpyxl")
+    # read_only: recorre la hoja sin cargarla completa
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [normalize_header(cell_text(name)) for name in next(rows, ())]
+        for line, values in enumerate(rows, start=2):
+            values = [cell_text(value) for value in values]
+            if any(values):
+                yield line, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def _choices(values):
+    """Valor canónico por su forma exacta o normalizada: 'electrico' -> 'Electrico'"""
+    choices = {busqueda.normalize_text(str(value)): str(value) for value in values}
+    choices.update((str(value), str(value)) for value in values)
+    return choices
+
+
+def _pick(row, column, choices, required=True):
+    value = row.get(column, '')
+    if not value:
+        if required:
+            raise ValueError(f"Falta {column}")
+        return None
+    canonical = choices.get(value) or choices.get(busqueda.normalize_text(value))
+    if canonical is None:
+        raise ValueError(f"{column} no válido: '{value}'")
+    return canonical
+
+
+def _require(row, columns):
+    missing = [column for column in columns if not row.get(column)]
+    if missing:
+        raise ValueError(f"Falta {', '.join(missing)}")
+
+
+def validate_part(row, choices, vehicle_ids):
+    """Dict listo para insertar (sin id) o ValueError con el motivo"""
+    for column, default in PART_DEFAULTS.items():
+        row.setdefault(column, default)
+        row[column] = row[column] or default
+    _require(row, ('nombre', 'marca', 'modelo', 'anio'))
+
+    precio = row.get('precio', '').replace('$', '').replace(',', '')
+    try:
+        precio = float(precio) if precio else 0.0
+    except ValueError:
+        raise ValueError(f"precio no válido: '{row['precio']}'") from None
+
+    vehiculo_id = row.get('vehiculo_id') or None
+    if vehiculo_id and vehiculo_id not in vehicle_ids:
+        raise ValueError(f"vehiculo_id no existe: '{vehiculo_id}'")
+
+    estante = _pick(row, 'estante', choices['estante'])
+    nivel = _pick(row, 'nivel', choices['nivel'])
+    return {
+        'stock_number': row.get('stock_number') or None,
+        'nombre': row['nombre'],
+        'marca': row['marca'],
+        'modelo': row['modelo'],
+        'anio': row['anio'],
+        'numero_parte': row.get('numero_parte') or None,
+        'categoria': _pick(row, 'categoria', choices['categoria']),
+        'fabricante': row.get('fabricante') or None,
+        'condicion': _pick(row, 'condicion', choices['condicion']),
+        'precio': precio,
+        'estante': estante,
+        'nivel': int(nivel),
+        'ubicacion': f"{estante}-{nivel}",
+        'vehiculo_id': vehiculo_id,
+        'notas': row.get('notas') or None,
+    }
+
+
+def validate_vehicle(row):
+    _require(row, ('marca', 'modelo', 'anio', 'vin'))
+    return {column: row.get(column) or None
+            for column in ('marca', 'modelo', 'anio', 'vin', 'color', 'motor', 'notas')}
+
+
+def insert_batch(batch, insert_bulk, insert_one, errors):
+    """
+    Inserta [(línea, fila)] con insert_bulk. Si el lote viola una restricción
+    (p. ej. un stock number que ya existe) la transacción se deshace y cada
+    fila se intenta sola con insert_one; las que fallan van a errors.
+    Devuelve cuántas filas se insertaron.
+    """
+    try:
+        insert_bulk([row for _, row in batch])
+        return len(batch)
+    except sqlite3.IntegrityError:
+        pass
+    inserted = 0
+    for line, row in batch:
+        try:
+            insert_one(row)
+            inserted += 1
+        except sqlite3.IntegrityError as e:
+            errors.append(RowError(line, f"No se pudo insertar: {e}"))
+    return inserted
+
+
+def import_parts(repo, path, batch_size=BATCH_SIZE, dry_run=False, on_progress=None):
+    """
+    Importa piezas desde path. Con dry_run solo valida. on_progress(filas)
+    se llama después de cada lote. Devuelve ImportResult.
+    """
+    choices = {
+        'categoria': _choices(app_config.CATEGORIES),
+        'condicion': _choices(app_config.CONDITIONS),
+        'estante': _choices(app_config.SHELVES),
+        'nivel': _choices(app_config.LEVELS),
+    }
+    vehicle_ids = repo.vehicle_ids()
+    seen_stock = set()
+
+    def validate(line, row):
+        part = validate_part(row, choices, vehicle_ids)
+        stock_number = part['stock_number']
+        if stock_number:
+            if stock_number in seen_stock:
+                raise ValueError(f"stock_number repetido en el archivo: '{stock_number}'")
+            seen_stock.add(stock_number)
+        return part
+
+    def flush(batch, errors):
+        # Los stock numbers que trae el archivo no deben existir ya en la base
+        existing = repo.existing_stock_numbers(
+            part['stock_number'] for _, part in batch if part['stock_number'])
+        parts = []
+        for line, part in batch:
+            if part['stock_number'] in existing:
+                errors.append(RowError(line, f"stock_number ya existe: '{part['stock_number']}'"))
+            else:
+                parts.append((line, part))
+        if dry_run:
+            return len(parts)
+
+        # Primero las filas con stock number propio: al insertarse suben el
+        # contador de secuencias y los números reservados después no chocan
+        given = [(line, part) for line, part in parts if part['stock_number']]
+        missing = [(line, part) for line, part in parts if not part['stock_number']]
+        fecha_ingreso = datetime.now().isoformat()
+        for _, part in parts:
+            part['fecha_ingreso'] = fecha_ingreso
+
+        inserted = 0
+        if given:
+            for _, part in given:
+                part['id'] = part['stock_number']
+            inserted += insert_batch(given, repo.insert_parts_bulk, repo.insert_part, errors)
+        if missing:
+            for (_, part), stock_number in zip(missing, repo.reserve_ids(PART_ID_PREFIX, len(missing))):
+                part['id'] = part['stock_number'] = stock_number
+            inserted += insert_batch(missing, repo.insert_parts_bulk, repo.insert_part, errors)
+        return inserted
+
+    return _run_import(path, validate, flush, batch_size, on_progress)
+
+
+def import_vehicles(repo, path, batch_size=BATCH_SIZE, dry_run=False, on_progress=None):
+    """Importa vehículos donadores desde path. Devuelve ImportResult."""
+    def validate(line, row):
+        return validate_vehicle(row)
+
+    def flush(batch, errors):
+        if dry_run:
+            return len(batch)
+        fecha_ingreso = datetime.now().isoformat()
+        for (_, vehicle), vehicle_id in zip(batch, repo.reserve_ids(VEHICLE_ID_PREFIX, len(batch))):
+            vehicle['id'] = vehicle_id
+            vehicle['fecha_ingreso'] = fecha_ingreso
+        return insert_batch(batch, repo.insert_vehicles_bulk, repo.insert_vehicle, errors)
+
+    return _run_import(path, validate, flush, batch_size, on_progress)
+
+
+def _run_import(path, validate, flush, batch_size, on_progress):
+    rows = inserted = 0
+    errors = []
+    batch = []
+    for line, row in read_rows(path):
+        rows += 1
+        try:
+            batch.append((line, validate(line, row)))
+        except ValueError as e:
+            errors.append(RowError(line, str(e)))
+            continue
+        if len(batch) >= batch_size:
+            inserted += flush(batch, errors)
+            batch = []
+            if on_progress:
+                on_progress(rows)
+    if batch:
+        inserted += flush(batch, errors)
+    if on_progress:
+        on_progress(rows)
+    # Los duplicados contra la base se detectan al vaciar el lote: ordenar por línea
+    errors.sort()
+    return ImportResult(rows, inserted, errors)
+
+
+def format_summary(result, max_errors=20):
+    """Resumen legible del resultado para consola o messagebox"""
+    lines = [f"Filas leídas: {result.rows}",
+             f"Insertadas: {result.inserted}",
+             f"Con errores: {len(result.errors)}"]
+    for error in result.errors[:max_errors]:
+        lines.append(f"   línea {error.line}: {error.message}")
+    if len(result.errors) > max_errors:
+        lines.append(f"   ... y {len(result.errors) - max_errors} más")
+    return '\n'.join(lines)
+
+
+def write_errors(result, path):
+    """Guarda todos los errores en un CSV (linea, error)"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['linea', 'error'])
+        writer.writerows(result.errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa piezas o vehículos desde CSV o XLSX")
+    parser.add_argument('tabla', choices=('piezas', 'vehiculos'))
+    parser.add_argument('archivo')
+    parser.add_argument('--db', help="Ruta de la base de datos (por defecto data/autopartes_inventario.db)")
+    parser.add_argument('--validar', action='store_true', help="Solo validar, sin insertar")
+    parser.add_argument('--errores', help="Guardar los errores en este CSV")
+    args = parser.parse_args(argv)
+
+    repo = InventoryRepository(args.db)
+    try:
+        repo.init_schema()
+        importer = import_parts if args.tabla == 'piezas' else import_vehicles
+        start = time.perf_counter()
+        result = importer(repo, args.archivo, dry_run=args.validar,
+                          on_progress=lambda rows: print(f"   {rows} filas procesadas...", end='\r'))
+        elapsed = time.perf_counter() - start
+    finally:
+        repo.close()
+
+    print()
+    print(format_summary(result))
+    print(f"Tiempo: {elapsed:.1f} s ({result.rows / max(elapsed, 1e-9):.0f} filas/s)")
+    if args.errores and result.errors:
+        write_errors(result, args.errores)
+        print(f"Errores guardados en {args.errores}")
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
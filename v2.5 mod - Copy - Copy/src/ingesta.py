@@ -0,0 +1,113 @@
+"""
+Ingesta de fotos de piezas en segundo plano
+
+Las fotos de teléfono (4-12 MB) se decodifican, se enderezan según su
+orientación EXIF, se reducen a MAX_EDGE px en el lado largo y se vuelven a
+codificar como JPEG en hilos de trabajo. Pillow libera el GIL al decodificar
+y codificar, así que un pool de hilos aprovecha varios núcleos sin el costo
+de copiar las imágenes entre procesos.
+
+La ventana de Tkinter solo recibe avisos de progreso mediante after().
+"""
+
+import hashlib
+import io
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+from miniaturas import make_thumbnail
+
+# Lado largo máximo de la foto guardada (px)
+MAX_EDGE = 1600
+
+# Calidad JPEG de la foto guardada
+JPEG_QUALITY = 82
+
+# Hilos de trabajo para procesar fotos
+INGEST_WORKERS = min(4, os.cpu_count() or 1)
+
+# Cada cuánto revisa el hilo de Tk el avance (ms)
+POLL_INTERVAL_MS = 50
+
+IngestedImage = namedtuple('IngestedImage', 'source sha256 data thumbnail')
+
+
+def process_image(path, max_edge=MAX_EDGE, quality=JPEG_QUALITY):
+    """Decodifica, orienta, reduce y recodifica una foto. Devuelve IngestedImage."""
+    with Image.open(path) as img:
+        # En JPEG decodifica ya reducido a la escala más cercana sin bajar de max_edge
+        img.draft('RGB', (max_edge, max_edge))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')  # JPEG no admite transparencia
+        output = io.BytesIO()
+        img.save(output, 'JPEG', quality=quality, optimize=True, progressive=True)
+    data = output.getvalue()
+    return IngestedImage(path, hashlib.sha256(data).hexdigest(), data, make_thumbnail(data))
+
+
+class ImageIngestor:
+    """
+    Procesa lotes de fotos en un pool de hilos.
+
+    on_progress(terminadas, total) y on_done(imagenes, errores) se llaman en
+    el hilo de Tk. imagenes es una lista de IngestedImage en el orden en que
+    se eligieron; errores es una lista de (ruta, excepción).
+    """
+
+    def __init__(self, widget, on_progress, on_done, max_edge=MAX_EDGE, quality=JPEG_QUALITY,
+                 max_workers=INGEST_WORKERS, poll_ms=POLL_INTERVAL_MS):
+        self.widget = widget
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.max_edge = max_edge
+        self.quality = quality
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ingesta')
+        self._batches = []
+        self._closed = False
+
+    @property
+    def busy(self):
+        """True mientras queda algún lote sin terminar"""
+        return bool(self._batches)
+
+    def submit(self, paths):
+        """Encola un lote de fotos; no bloquea"""
+        if not paths:
+            return
+        futures = [self._executor.submit(process_image, path, self.max_edge, self.quality)
+                   for path in paths]
+        self._batches.append(futures)
+        self._poll(list(paths), futures, -1)
+
+    def _poll(self, paths, futures, reported):
+        if self._closed:
+            return
+        finished = sum(future.done() for future in futures)
+        if finished != reported:
+            self.on_progress(finished, len(futures))
+        if finished < len(futures):
+            self.widget.after(self.poll_ms, self._poll, paths, futures, finished)
+            return
+
+        self._batches.remove(futures)
+        images, errors = [], []
+        for path, future in zip(paths, futures):
+            try:
+                images.append(future.result())
+            except Exception as e:
+                errors.append((path, e))
+        self.on_done(images, errors)
+
+    def shutdown(self):
+        """Descarta los lotes pendientes (ej. al cerrar la ventana)"""
+        self._closed = True
+        for futures in self._batches:
+            for future in futures:
+                future.cancel()
+        self._executor.shutdown(wait=False)
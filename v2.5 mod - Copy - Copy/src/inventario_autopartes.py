@@ -10,12 +10,21 @@ pip install pillow qrcode
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from tkinter import font as tkfont
-import sqlite3
 from datetime import datetime
 from PIL import Image, ImageTk
 import qrcode
-import io
-import base64
+import shutil
+import threading
+
+from base_datos import InventoryRepository
+from tareas import DebouncedSearch, run_in_background
+from vista_paginada import PagedTreeview
+from miniaturas import PhotoCache, backfill_thumbnails, ensure_thumbnail
+from ingesta import ImageIngestor
+from visor_zoom import TiledImageView
+from autocompletado import AutocompleteIndex
+import importador
+import exportador
 
 class AutoPartsInventory:
     def __init__(self, root):
@@ -29,6 +38,8 @@ class AutoPartsInventory:
         
         # Variables
         self.current_images = []
+        self.current_thumbnails = []
+        self.thumbnail_cache = PhotoCache()
         self.categories = ['Motor', 'Suspension', 'Transmision', 'Electrico', 'Carroceria', 
                           'Interior', 'Frenos', 'Direccion', 'Escape', 'Refrigeracion', 'Otro']
         self.conditions = ['Nueva', 'Usada - Excelente', 'Usada - Buena', 'Usada - Regular', 'Refaccionada']
@@ -59,72 +70,35 @@ class AutoPartsInventory:
                                     'Beck Arnley', 'Gates', 'Dayco', 'Continental', 'TRW', 'Monroe',
                                     'KYB', 'Bilstein', 'Brembo', 'Akebono', 'Wagner', 'Raybestos']
         
+        # Índice de autocompletado compartido: se construye una vez en segundo plano
+        self.autocomplete = AutocompleteIndex(self.db, {
+            'nombre': self.common_part_names,
+            'marca': self.common_brands,
+            'modelo': (),
+            'anio': self.common_years,
+            'numero_parte': (),
+            'fabricante': self.common_manufacturers,
+        }, descending=('anio',))
+        threading.Thread(target=self.autocomplete.build, daemon=True).start()
+        
         # Crear interfaz
         self.create_widgets()
         self.load_dashboard()
     
     def init_database(self):
         """Inicializa la base de datos SQLite"""
-        import os
-        # Obtener el directorio base del proyecto (dos niveles arriba de src/)
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        data_dir = os.path.join(base_dir, 'data')
-        os.makedirs(data_dir, exist_ok=True)
-        db_path = os.path.join(data_dir, 'autopartes_inventario.db')
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
-        
-        # Tabla de vehiculos
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS vehiculos (
-                id TEXT PRIMARY KEY,
-                marca TEXT NOT NULL,
-                modelo TEXT NOT NULL,
-                anio TEXT NOT NULL,
-                vin TEXT NOT NULL,
-                color TEXT,
-                motor TEXT,
-                notas TEXT,
-                fecha_ingreso TEXT
-            )
-        ''')
-        
-        # Tabla de piezas
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS piezas (
-                id TEXT PRIMARY KEY,
-                stock_number TEXT UNIQUE NOT NULL,
-                nombre TEXT NOT NULL,
-                marca TEXT NOT NULL,
-                modelo TEXT NOT NULL,
-                anio TEXT NOT NULL,
-                numero_parte TEXT,
-                categoria TEXT NOT NULL,
-                fabricante TEXT,
-                condicion TEXT NOT NULL,
-                precio REAL,
-                estante TEXT NOT NULL,
-                nivel INTEGER NOT NULL,
-                ubicacion TEXT NOT NULL,
-                vehiculo_id TEXT,
-                notas TEXT,
-                fecha_ingreso TEXT,
-                FOREIGN KEY (vehiculo_id) REFERENCES vehiculos (id)
-            )
-        ''')
-        
-        # Tabla de imagenes
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS imagenes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                pieza_id TEXT NOT NULL,
-                imagen_data TEXT NOT NULL,
-                orden INTEGER,
-                FOREIGN KEY (pieza_id) REFERENCES piezas (id)
-            )
-        ''')
-        
-        self.conn.commit()
+        # La ruta por defecto es data/autopartes_inventario.db en la raíz del proyecto
+        self.db = InventoryRepository()
+        
+        # Aplicar migraciones pendientes (bases de datos existentes se actualizan aquí)
+        applied, report = self.db.init_schema()
+        if applied:
+            print(f"Esquema de base de datos actualizado (migraciones: {', '.join(map(str, applied))})")
+            if report:
+                print(report)
+        
+        # Completar en segundo plano las miniaturas de fotos que no la tengan
+        threading.Thread(target=backfill_thumbnails, args=(self.db,), daemon=True).start()
     
     def setup_theme(self):
         """Configura el tema oscuro de la aplicacion"""
@@ -232,24 +206,15 @@ class AutoPartsInventory:
         self.create_inventory_tab()
         self.create_vehicles_tab()
     
-    def get_unique_values_from_db(self, column, table='piezas'):
-        """Obtiene valores únicos de una columna en la base de datos"""
-        try:
-            self.cursor.execute(f'SELECT DISTINCT {column} FROM {table} WHERE {column} IS NOT NULL AND {column} != "" ORDER BY {column}')
-            return [row[0] for row in self.cursor.fetchall()]
-        except:
-            return []
-    
-    def create_autocomplete_combobox(self, parent, textvariable, values, width=28):
-        """Crea un Combobox con autocompletado que permite escribir"""
-        # Asegurar que values sea una lista válida
-        if not values:
-            original_values = []
-        else:
-            original_values = [str(v) for v in values if v is not None]
+    def create_autocomplete_combobox(self, parent, textvariable, suggest, width=28):
+        """
+        Crea un Combobox con autocompletado que permite escribir.
+        suggest(texto) devuelve las opciones que empiezan con texto.
+        """
+        def all_values():
+            return suggest('') or ['']
         
-        if not original_values:
-            original_values = ['']
+        original_values = all_values()
         
         combo = ttk.Combobox(parent, textvariable=textvariable, values=original_values, width=width,
                              style='DarkCombobox.TCombobox')
@@ -267,15 +232,12 @@ class AutoPartsInventory:
                     try:
                         current_value = textvariable.get()
                         if current_value:
-                            # Filtrar valores que empiecen con lo que el usuario escribió
-                            filtered = [v for v in original_values if str(v).lower().startswith(current_value.lower())]
-                            if filtered:
-                                combo['values'] = filtered
-                            else:
-                                combo['values'] = original_values
+                            # Valores que empiecen con lo que el usuario escribió
+                            filtered = suggest(current_value)
+                            combo['values'] = filtered or all_values()
                         else:
                             # Si está vacío, mostrar todos los valores
-                            combo['values'] = original_values
+                            combo['values'] = all_values()
                     except:
                         try:
                             combo['values'] = original_values
@@ -290,14 +252,14 @@ class AutoPartsInventory:
         def on_focus_in(event):
             """Restaurar todas las opciones cuando el campo recibe foco"""
             try:
-                combo['values'] = original_values
+                combo['values'] = all_values()
             except:
                 pass
         
         def on_focus_out(event):
             """Asegurar que los valores estén restaurados al perder foco"""
             try:
-                combo['values'] = original_values
+                combo['values'] = all_values()
             except:
                 pass
         
@@ -314,34 +276,23 @@ class AutoPartsInventory:
         stats_frame = tk.Frame(self.dashboard_frame, bg=self.theme['surface'])
         stats_frame.pack(fill='x', padx=20, pady=20)
         
-        # Obtener estadisticas
-        self.cursor.execute('SELECT COUNT(*) FROM piezas')
-        total_piezas = self.cursor.fetchone()[0]
-        
-        self.cursor.execute('SELECT COUNT(DISTINCT categoria) FROM piezas')
-        total_categorias = self.cursor.fetchone()[0]
-        
-        self.cursor.execute('SELECT COUNT(*) FROM vehiculos')
-        total_vehiculos = self.cursor.fetchone()[0]
-        
-        self.cursor.execute('SELECT SUM(precio) FROM piezas')
-        valor_total = self.cursor.fetchone()[0] or 0
-        
-        # Mostrar estadisticas
+        # Tarjetas de estadisticas; load_dashboard() solo actualiza sus valores
         stats = [
-            ("Total Piezas", total_piezas, '#3b82f6'),
-            ("Categorias", total_categorias, '#10b981'),
-            ("Vehiculos", total_vehiculos, '#8b5cf6'),
-            ("Valor Total", f"${valor_total:,.2f} MXN", '#f59e0b')
+            ("Total Piezas", 'total_piezas', '#3b82f6'),
+            ("Categorias", 'total_categorias', '#10b981'),
+            ("Vehiculos", 'total_vehiculos', '#8b5cf6'),
+            ("Valor Total", 'valor_total', '#f59e0b')
         ]
         
-        for i, (label, value, color) in enumerate(stats):
+        self.stat_labels = {}
+        for i, (label, key, color) in enumerate(stats):
             card = tk.Frame(stats_frame, bg=color, relief='raised', borderwidth=0, highlightthickness=0)
             card.grid(row=0, column=i, padx=10, pady=10, sticky='nsew')
             stats_frame.columnconfigure(i, weight=1)
             
             tk.Label(card, text=label, font=('Arial', 12), bg=color, fg='white').pack(pady=(10,0))
-            tk.Label(card, text=str(value), font=('Arial', 24, 'bold'), bg=color, fg='white').pack(pady=(0,10))
+            self.stat_labels[key] = tk.Label(card, text='', font=('Arial', 24, 'bold'), bg=color, fg='white')
+            self.stat_labels[key].pack(pady=(0,10))
         
         # Botones de acciones rapidas
         actions_frame = tk.LabelFrame(self.dashboard_frame, text="Acciones Rapidas", font=('Arial', 14, 'bold'),
@@ -369,7 +320,7 @@ class AutoPartsInventory:
         tk.Label(search_frame, text="Buscar:", font=('Arial', 12), bg=self.theme['surface'],
                  fg=self.theme['text']).pack(side='left', padx=5)
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', lambda *args: self.filter_inventory())
+        self.search_var.trace('w', lambda *args: self.filter_inventory(debounce=True))
         search_entry = tk.Entry(search_frame, textvariable=self.search_var, font=('Arial', 12), width=40,
                                 bg=self.theme['input_bg'], fg=self.theme['text'],
                                 insertbackground=self.theme['text'], relief='flat',
@@ -390,6 +341,10 @@ class AutoPartsInventory:
                            activebackground=self.theme['accent_hover'], activeforeground=self.theme['text'],
                            relief='flat', bd=0)
         btn_add.pack(side='right', padx=5)
+        tk.Button(search_frame, text="Importar CSV/XLSX", bg=self.theme['surface_alt'], fg=self.theme['text'],
+                 font=('Arial', 11), command=lambda: self.import_file('piezas'),
+                 activebackground=self.theme['border'], activeforeground=self.theme['text'],
+                 relief='flat', bd=0).pack(side='right', padx=5)
         
         # Treeview para mostrar piezas
         tree_frame = tk.Frame(self.inventory_frame, bg=self.theme['surface'])
@@ -419,6 +374,15 @@ class AutoPartsInventory:
         self.parts_tree.pack(fill='both', expand=True)
         self.parts_tree.bind('<Double-1>', lambda e: self.view_part_details())
         
+        # Las piezas se cargan por páginas a medida que se hace scroll
+        self.parts_view = PagedTreeview(self.parts_tree, vsb, self.db.list_parts_page)
+        
+        # La búsqueda corre en un hilo de trabajo; escribir rápido solo lanza la última consulta
+        self.inventory_search = DebouncedSearch(self.root, self.parts_view.fetch_first,
+                                                self.parts_view.show_first,
+                                                on_error=lambda e: messagebox.showerror(
+                                                    "Error", f"Error al buscar: {str(e)}"))
+        
         # Botones de accion
         btn_frame = tk.Frame(self.inventory_frame, bg=self.theme['surface'])
         btn_frame.pack(fill='x', padx=10, pady=10)
@@ -435,6 +399,10 @@ class AutoPartsInventory:
                  bg=self.theme['purple'], fg=self.theme['text'], font=('Arial', 11),
                  activebackground='#7c3aed', activeforeground=self.theme['text'],
                  relief='flat', bd=0).pack(side='left', padx=5)
+        tk.Button(btn_frame, text="Exportar", command=self.export_inventory,
+                 bg=self.theme['surface_alt'], fg=self.theme['text'], font=('Arial', 11),
+                 activebackground=self.theme['border'], activeforeground=self.theme['text'],
+                 relief='flat', bd=0).pack(side='right', padx=5)
         
         self.load_inventory()
     
@@ -450,6 +418,10 @@ class AutoPartsInventory:
                  font=('Arial', 11), command=self.add_vehicle_window,
                  activebackground=self.theme['accent_alt_hover'], activeforeground=self.theme['text'],
                  relief='flat', bd=0).pack(side='right')
+        tk.Button(top_frame, text="Importar CSV/XLSX", bg=self.theme['surface_alt'], fg=self.theme['text'],
+                 font=('Arial', 11), command=lambda: self.import_file('vehiculos'),
+                 activebackground=self.theme['border'], activeforeground=self.theme['text'],
+                 relief='flat', bd=0).pack(side='right', padx=5)
         
         # Treeview para vehiculos
         tree_frame = tk.Frame(self.vehicles_frame, bg=self.theme['surface'])
@@ -470,6 +442,10 @@ class AutoPartsInventory:
         
         self.vehicles_tree.pack(fill='both', expand=True)
         
+        # Una consulta por página (vehículo + conteo de piezas), cargada al hacer scroll
+        self.vehicles_view = PagedTreeview(self.vehicles_tree, vsb, self.db.list_vehicles_page,
+                                           make_item=lambda row: {'values': row[1:], 'tags': (row[0],)})
+        
         # Botones
         btn_frame = tk.Frame(self.vehicles_frame, bg=self.theme['surface'])
         btn_frame.pack(fill='x', padx=10, pady=10)
@@ -524,50 +500,10 @@ class AutoPartsInventory:
         }
         
         self.current_images = []
+        self.current_thumbnails = []
         
-        # Obtener valores únicos de la base de datos para autocompletado
-        db_nombres = self.get_unique_values_from_db('nombre')
-        db_marcas = self.get_unique_values_from_db('marca')
-        db_modelos = self.get_unique_values_from_db('modelo')
-        db_anios = self.get_unique_values_from_db('anio')
-        db_fabricantes = self.get_unique_values_from_db('fabricante')
-        db_numero_parte = self.get_unique_values_from_db('numero_parte')
-        
-        # Combinar valores de BD con listas predefinidas (BD primero, luego comunes)
-        # Filtrar valores None y vacíos, y convertir a string
-        def clean_values(values):
-            unique_by_case = {}
-            for value in values:
-                if value is None:
-                    continue
-                value_str = str(value).strip()
-                if not value_str:
-                    continue
-                key = value_str.lower()
-                if key not in unique_by_case:
-                    unique_by_case[key] = value_str
-            return sorted(unique_by_case.values(), key=lambda x: x.lower())
-        
-        nombres_values = clean_values(db_nombres + self.common_part_names)
-        marcas_values = clean_values(db_marcas + self.common_brands)
-        modelos_values = clean_values(db_modelos) if db_modelos else []
-        anios_values = sorted(set([str(v) for v in (db_anios + self.common_years) if v is not None and str(v).strip()]), reverse=True)
-        fabricantes_values = clean_values(db_fabricantes + self.common_manufacturers)
-        numero_parte_values = clean_values(db_numero_parte) if db_numero_parte else []
-        
-        # Asegurar que todas las listas tengan al menos un valor vacío si están vacías
-        if not nombres_values:
-            nombres_values = ['']
-        if not marcas_values:
-            marcas_values = ['']
-        if not modelos_values:
-            modelos_values = ['']
-        if not anios_values:
-            anios_values = ['']
-        if not fabricantes_values:
-            fabricantes_values = ['']
-        if not numero_parte_values:
-            numero_parte_values = ['']
+        # Sugerencias desde el índice compartido (sin consultar la base de datos)
+        suggest = self.autocomplete.suggester
         
         # Precios comunes para menú desplegable
         precios_comunes = ['100', '150', '200', '250', '300', '350', '400', '450', '500', 
@@ -575,18 +511,21 @@ class AutoPartsInventory:
                           '2500', '3000', '3500', '4000', '5000', '6000', '7000', '8000', 
                           '10000', '12000', '15000', '20000']
         
+        def suggest_precio(text):
+            return [p for p in precios_comunes if p.startswith(text)]
+        
         # Formulario
         row = 0
         fields = [
-            ('Nombre de la Pieza:', 'nombre', 'autocomplete', nombres_values),
+            ('Nombre de la Pieza:', 'nombre', 'autocomplete', suggest('nombre')),
             ('Categoria:', 'categoria', 'combo', self.categories),
-            ('Marca del Auto:', 'marca', 'autocomplete', marcas_values),
-            ('Modelo:', 'modelo', 'autocomplete', modelos_values),
-            ('Año:', 'anio', 'autocomplete', anios_values),
-            ('Numero de Parte:', 'numero_parte', 'autocomplete', numero_parte_values),
-            ('Fabricante:', 'fabricante', 'autocomplete', fabricantes_values),
+            ('Marca del Auto:', 'marca', 'autocomplete', suggest('marca')),
+            ('Modelo:', 'modelo', 'autocomplete', suggest('modelo')),
+            ('Año:', 'anio', 'autocomplete', suggest('anio')),
+            ('Numero de Parte:', 'numero_parte', 'autocomplete', suggest('numero_parte')),
+            ('Fabricante:', 'fabricante', 'autocomplete', suggest('fabricante')),
             ('Condicion:', 'condicion', 'combo', self.conditions),
-            ('Precio (MXN):', 'precio', 'autocomplete', precios_comunes),
+            ('Precio (MXN):', 'precio', 'autocomplete', suggest_precio),
             ('Estante:', 'estante', 'combo', self.shelves),
             ('Nivel:', 'nivel', 'combo', ['1', '2', '3']),
         ]
@@ -616,8 +555,7 @@ class AutoPartsInventory:
                  bg=self.theme['surface'], fg=self.theme['text']).grid(
             row=row, column=0, sticky='w', padx=10, pady=5)
         
-        self.cursor.execute('SELECT id, marca, modelo, anio, vin FROM vehiculos')
-        vehicles = self.cursor.fetchall()
+        vehicles = self.db.list_vehicles()
         vehicle_options = ['Sin asignar'] + [f"{v[1]} {v[2]} {v[3]} - {v[4]}" for v in vehicles]
         vehicle_ids = [''] + [v[0] for v in vehicles]
         
@@ -663,25 +601,40 @@ class AutoPartsInventory:
         images_frame = tk.Frame(scrollable_frame, bg=self.theme['surface'])
         images_frame.grid(row=row, column=1, padx=10, pady=5, sticky='ew')
         
+        images_status = tk.Label(images_frame, text="", bg=self.theme['surface'], fg=self.theme['text'])
+        selected_hashes = set()
+        
+        def on_images_progress(done, total):
+            images_status.config(text=f"Procesando imagenes... {done}/{total}")
+        
+        def on_images_done(images, errors):
+            # Fotos ya reducidas y recodificadas en segundo plano
+            for image in images:
+                if image.sha256 in selected_hashes:
+                    continue
+                selected_hashes.add(image.sha256)
+                self.current_images.append(image.data)
+                self.current_thumbnails.append(image.thumbnail)
+            images_status.config(text=f"{len(self.current_images)} imagen(es) seleccionada(s)")
+            if errors:
+                names = '\n'.join(path for path, _ in errors)
+                messagebox.showwarning("Advertencia", f"No se pudieron leer estas imagenes:\n{names}",
+                                       parent=window)
+        
+        ingestor = ImageIngestor(window, on_images_progress, on_images_done)
+        window.bind('<Destroy>', lambda e: ingestor.shutdown() if e.widget is window else None)
+        
         def select_images():
             files = filedialog.askopenfilenames(
                 title="Seleccionar imagenes",
                 filetypes=[("Imagenes", "*.jpg *.jpeg *.png *.gif *.bmp")]
             )
-            for file in files:
-                with open(file, 'rb') as f:
-                    img_data = base64.b64encode(f.read()).decode()
-                    self.current_images.append(img_data)
-            
-            for widget in images_frame.winfo_children():
-                widget.destroy()
-            
-            tk.Label(images_frame, text=f"{len(self.current_images)} imagen(es) seleccionada(s)",
-                     bg=self.theme['surface'], fg=self.theme['text']).pack()
+            ingestor.submit(files)
         
         tk.Button(images_frame, text="Seleccionar Imagenes", command=select_images,
                  bg=self.theme['accent'], fg=self.theme['text'], relief='flat', bd=0,
                  activebackground=self.theme['accent_hover'], activeforeground=self.theme['text']).pack()
+        images_status.pack()
         row += 1
         
         # Botones
@@ -702,8 +655,11 @@ class AutoPartsInventory:
                 messagebox.showerror("Error", "El precio debe ser un número válido")
                 return
             
-            # Generar stock number
-            stock_number = f"AP-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            if ingestor.busy:
+                messagebox.showwarning("Advertencia", "Espera a que terminen de procesarse las imagenes",
+                                       parent=window)
+                return
+            
             ubicacion = f"{vars_dict['estante'].get()}-{vars_dict['nivel'].get()}"
             
             # Convertir nivel a int para la base de datos
@@ -714,24 +670,30 @@ class AutoPartsInventory:
             
             # Insertar pieza
             try:
-                self.cursor.execute('''
-                    INSERT INTO piezas VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    stock_number, stock_number, vars_dict['nombre'].get(), vars_dict['marca'].get(),
-                    vars_dict['modelo'].get(), vars_dict['anio'].get(), vars_dict['numero_parte'].get() or None,
-                    vars_dict['categoria'].get(), vars_dict['fabricante'].get() or None, vars_dict['condicion'].get(),
-                    precio, vars_dict['estante'].get(), nivel_int,
-                    ubicacion, vars_dict['vehiculo_id'].get() or None, notes_text.get('1.0', 'end').strip() or None,
-                    datetime.now().isoformat()
-                ))
+                # Stock number único aunque se guarden varias piezas en el mismo segundo
+                stock_number = self.db.next_stock_number()
+                part = {
+                    'id': stock_number,
+                    'stock_number': stock_number,
+                    'nombre': vars_dict['nombre'].get(),
+                    'marca': vars_dict['marca'].get(),
+                    'modelo': vars_dict['modelo'].get(),
+                    'anio': vars_dict['anio'].get(),
+                    'numero_parte': vars_dict['numero_parte'].get() or None,
+                    'categoria': vars_dict['categoria'].get(),
+                    'fabricante': vars_dict['fabricante'].get() or None,
+                    'condicion': vars_dict['condicion'].get(),
+                    'precio': precio,
+                    'estante': vars_dict['estante'].get(),
+                    'nivel': nivel_int,
+                    'ubicacion': ubicacion,
+                    'vehiculo_id': vars_dict['vehiculo_id'].get() or None,
+                    'notas': notes_text.get('1.0', 'end').strip() or None,
+                    'fecha_ingreso': datetime.now().isoformat()
+                }
+                self.db.insert_part(part, images=self.current_images, thumbnails=self.current_thumbnails)
+                self.autocomplete.add_part(part)
                 
-                # Insertar imagenes
-                for i, img_data in enumerate(self.current_images):
-                    self.cursor.execute('''
-                        INSERT INTO imagenes (pieza_id, imagen_data, orden) VALUES (?, ?, ?)
-                    ''', (stock_number, img_data, i))
-                
-                self.conn.commit()
                 messagebox.showinfo("Exito", f"Pieza agregada con stock: {stock_number}")
                 window.destroy()
                 self.load_inventory()
@@ -751,6 +713,57 @@ class AutoPartsInventory:
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
     
+    def import_file(self, table):
+        """Importación masiva de piezas o vehículos desde una hoja de cálculo"""
+        path = filedialog.askopenfilename(
+            title="Importar " + table,
+            filetypes=[("Hojas de calculo", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel", "*.xlsx")]
+        )
+        if not path:
+            return
+        
+        window = tk.Toplevel(self.root)
+        window.title("Importando...")
+        window.geometry("400x100")
+        window.configure(bg=self.theme['surface'])
+        window.grab_set()
+        status = tk.Label(window, text="Leyendo archivo...", font=('Arial', 11),
+                          bg=self.theme['surface'], fg=self.theme['text'])
+        status.pack(expand=True)
+        
+        # El avance llega desde el hilo de trabajo: se muestra con after()
+        progress = [0]
+        
+        def on_progress(rows):
+            progress[0] = rows
+        
+        def show_progress():
+            if window.winfo_exists():
+                status.config(text=f"{progress[0]} filas procesadas...")
+                window.after(200, show_progress)
+        
+        def on_done(result):
+            window.destroy()
+            if table == 'piezas':
+                self.load_inventory()
+                # El lote llega sin pasar por save_part: reconstruir el índice
+                if result.inserted:
+                    threading.Thread(target=self.autocomplete.build, daemon=True).start()
+            else:
+                self.load_vehicles()
+            self.load_dashboard()
+            show = messagebox.showwarning if result.errors else messagebox.showinfo
+            show("Importacion terminada", importador.format_summary(result))
+        
+        def on_error(e):
+            window.destroy()
+            messagebox.showerror("Error", f"Error al importar: {str(e)}")
+        
+        importer = importador.import_parts if table == 'piezas' else importador.import_vehicles
+        run_in_background(self.root, lambda: importer(self.db, path, on_progress=on_progress),
+                          on_done, on_error)
+        show_progress()
+    
     def add_vehicle_window(self):
         """Ventana para agregar vehiculo"""
         window = tk.Toplevel(self.root)
@@ -809,19 +822,20 @@ class AutoPartsInventory:
                 messagebox.showerror("Error", "Por favor completa todos los campos obligatorios")
                 return
             
-            vehicle_id = f"VEH-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-            
             try:
-                self.cursor.execute('''
-                    INSERT INTO vehiculos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    vehicle_id, vars_dict['marca'].get(), vars_dict['modelo'].get(),
-                    vars_dict['anio'].get(), vars_dict['vin'].get(), vars_dict['color'].get() or None,
-                    vars_dict['motor'].get() or None, notes_text.get('1.0', 'end').strip() or None,
-                    datetime.now().isoformat()
-                ))
+                vehicle_id = self.db.next_vehicle_id()
+                self.db.insert_vehicle({
+                    'id': vehicle_id,
+                    'marca': vars_dict['marca'].get(),
+                    'modelo': vars_dict['modelo'].get(),
+                    'anio': vars_dict['anio'].get(),
+                    'vin': vars_dict['vin'].get(),
+                    'color': vars_dict['color'].get() or None,
+                    'motor': vars_dict['motor'].get() or None,
+                    'notas': notes_text.get('1.0', 'end').strip() or None,
+                    'fecha_ingreso': datetime.now().isoformat()
+                })
                 
-                self.conn.commit()
                 messagebox.showinfo("Exito", "Vehiculo registrado correctamente")
                 window.destroy()
                 self.load_vehicles()
@@ -839,67 +853,52 @@ class AutoPartsInventory:
                  relief='flat', bd=0).pack(side='left', padx=5)
     
     def load_inventory(self):
-        """Carga el inventario en el treeview"""
-        for item in self.parts_tree.get_children():
-            self.parts_tree.delete(item)
-        
-        self.cursor.execute('''
-            SELECT stock_number, nombre, marca, modelo, anio, categoria, ubicacion, precio 
-            FROM piezas ORDER BY fecha_ingreso DESC
-        ''')
-        
-        for row in self.cursor.fetchall():
-            self.parts_tree.insert('', 'end', values=row)
+        """Carga la primera página del inventario en el treeview"""
+        self.parts_view.reload('', None)
     
-    def filter_inventory(self):
-        """Filtra el inventario"""
-        for item in self.parts_tree.get_children():
-            self.parts_tree.delete(item)
-        
-        search = self.search_var.get().lower()
+    def filter_inventory(self, debounce=False):
+        """Filtra el inventario (la consulta corre en segundo plano)"""
+        search = self.search_var.get()
         category = self.filter_category.get()
+        category = None if category == 'Todas' else category
         
-        query = '''
-            SELECT stock_number, nombre, marca, modelo, anio, categoria, ubicacion, precio 
-            FROM piezas WHERE 1=1
-        '''
-        params = []
-        
-        if search:
-            query += ''' AND (LOWER(nombre) LIKE ? OR LOWER(marca) LIKE ? OR LOWER(modelo) LIKE ? 
-                        OR LOWER(anio) LIKE ? OR LOWER(stock_number) LIKE ? OR LOWER(ubicacion) LIKE ?)'''
-            params.extend([f'%{search}%'] * 6)
-        
-        if category != 'Todas':
-            query += ' AND categoria = ?'
-            params.append(category)
-        
-        query += ' ORDER BY fecha_ingreso DESC'
+        if debounce:
+            self.inventory_search.request(search, category)
+        else:
+            self.inventory_search.run_now(search, category)
+    
+    def export_inventory(self):
+        """Exporta las piezas que muestra el filtro actual (búsqueda y categoría)"""
+        path = filedialog.asksaveasfilename(
+            title="Exportar inventario",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet")]
+        )
+        if not path:
+            return
         
-        self.cursor.execute(query, params)
-        for row in self.cursor.fetchall():
-            self.parts_tree.insert('', 'end', values=row)
+        search = self.search_var.get()
+        category = self.filter_category.get()
+        category = None if category == 'Todas' else category
+        include_images = messagebox.askyesno("Exportar", "¿Incluir referencias a las fotos?")
+        
+        run_in_background(
+            self.root,
+            lambda: exportador.export_parts(self.db, path, search, category, include_images),
+            lambda written: messagebox.showinfo("Exito", f"{written} pieza(s) exportada(s) a:\n{path}"),
+            lambda e: messagebox.showerror("Error", f"Error al exportar: {str(e)}"))
     
     def load_vehicles(self):
         """Carga los vehiculos"""
-        for item in self.vehicles_tree.get_children():
-            self.vehicles_tree.delete(item)
-        
-        self.cursor.execute('SELECT id, marca, modelo, anio, vin, color, motor FROM vehiculos')
-        
-        for row in self.cursor.fetchall():
-            vehicle_id = row[0]
-            self.cursor.execute('SELECT COUNT(*) FROM piezas WHERE vehiculo_id = ?', (vehicle_id,))
-            parts_count = self.cursor.fetchone()[0]
-            
-            self.vehicles_tree.insert('', 'end', values=row[1:] + (parts_count,), tags=(vehicle_id,))
+        self.vehicles_view.reload()
     
     def load_dashboard(self):
-        """Recarga el dashboard"""
-        # Recrear el dashboard
-        for widget in self.dashboard_frame.winfo_children():
-            widget.destroy()
-        self.create_dashboard_tab()
+        """Actualiza los valores del dashboard"""
+        # Los totales vienen de las tablas de estadisticas: no recorre piezas
+        totals = self.db.dashboard_stats()
+        for key, label in self.stat_labels.items():
+            value = totals[key]
+            label.config(text=f"${value:,.2f} MXN" if key == 'valor_total' else str(value))
     
     def view_part_details(self):
         """Ver detalles de una pieza"""
@@ -911,8 +910,7 @@ class AutoPartsInventory:
         stock_number = self.parts_tree.item(selection[0])['values'][0]
         
         # Obtener datos de la pieza
-        self.cursor.execute('SELECT * FROM piezas WHERE stock_number = ?', (stock_number,))
-        part = self.cursor.fetchone()
+        part = self.db.get_part(stock_number)
         
         if not part:
             return
@@ -970,8 +968,7 @@ class AutoPartsInventory:
         
         # Vehiculo donador
         if part[14]:
-            self.cursor.execute('SELECT marca, modelo, anio, vin FROM vehiculos WHERE id = ?', (part[14],))
-            vehicle = self.cursor.fetchone()
+            vehicle = self.db.get_vehicle(part[14])
             if vehicle:
                 vehicle_frame = tk.LabelFrame(left_frame, text="Vehiculo Donador", font=('Arial', 12, 'bold'),
                                               bg=self.theme['surface'], fg=self.theme['text'])
@@ -1031,8 +1028,7 @@ class AutoPartsInventory:
                                      bg=self.theme['surface'], fg=self.theme['text'])
         images_frame.pack(fill='both', expand=True, pady=10)
         
-        self.cursor.execute('SELECT imagen_data FROM imagenes WHERE pieza_id = ? ORDER BY orden', (part[0],))
-        images = self.cursor.fetchall()
+        images = self.db.get_part_images(part[0])
         
         if images:
             canvas = tk.Canvas(images_frame, height=250, bg=self.theme['surface'], highlightthickness=0)
@@ -1042,18 +1038,16 @@ class AutoPartsInventory:
             canvas.create_window((0, 0), window=img_container, anchor="nw")
             canvas.configure(xscrollcommand=scrollbar.set)
             
-            for i, (img_data,) in enumerate(images):
+            for i, sha256 in enumerate(images):
                 try:
-                    img_bytes = base64.b64decode(img_data)
-                    img = Image.open(io.BytesIO(img_bytes))
-                    img.thumbnail((180, 180))
-                    photo = ImageTk.PhotoImage(img)
+                    # Miniatura precalculada; las más usadas ya están en memoria
+                    photo = self.thumbnail_cache.get(sha256, lambda sha: ensure_thumbnail(self.db, sha))
                     
                     img_label = tk.Label(img_container, image=photo, cursor="hand2",
                                          bg=self.theme['surface'])
                     img_label.image = photo
                     img_label.pack(side='left', padx=5)
-                    img_label.bind('<Button-1>', lambda e, data=img_data: self.show_full_image(data))
+                    img_label.bind('<Button-1>', lambda e, sha=sha256: self.show_full_image(sha))
                 except:
                     pass
             
@@ -1083,21 +1077,17 @@ class AutoPartsInventory:
             qr_img.save(filename)
             messagebox.showinfo("Exito", "Codigo QR guardado correctamente")
     
-    def show_full_image(self, img_data):
+    def show_full_image(self, sha256):
         """Mostrar imagen en tamaño completo con zoom"""
         window = tk.Toplevel(self.root)
         window.title("Visor de Imagen")
         window.geometry("1000x700")
         window.configure(bg=self.theme['bg'])
         
-        # Variables para zoom
-        self.zoom_level = 1.0
-        self.pan_start_x = 0
-        self.pan_start_y = 0
-        
-        # Cargar imagen original
-        img_bytes = base64.b64decode(img_data)
-        self.original_image = Image.open(io.BytesIO(img_bytes))
+        # Cargar imagen original desde el almacén
+        img_path = self.db.images.path(sha256)
+        with Image.open(img_path) as img:
+            original_image = img.copy()  # Cierra el archivo en cuanto se decodifica
         
         # Frame superior con controles
         controls_frame = tk.Frame(window, bg=self.theme['surface'], height=50)
@@ -1111,33 +1101,6 @@ class AutoPartsInventory:
         # Scrollbars
         h_scroll = ttk.Scrollbar(window, orient='horizontal', command=canvas.xview)
         v_scroll = ttk.Scrollbar(window, orient='vertical', command=canvas.yview)
-        canvas.configure(xscrollcommand=h_scroll.set, yscrollcommand=v_scroll.set)
-        
-        self.image_canvas = canvas
-        
-        def display_image():
-            new_width = int(self.original_image.width * self.zoom_level)
-            new_height = int(self.original_image.height * self.zoom_level)
-            resized = self.original_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            self.photo = ImageTk.PhotoImage(resized)
-            canvas.delete('all')
-            canvas.create_image(0, 0, anchor='nw', image=self.photo)
-            canvas.configure(scrollregion=(0, 0, new_width, new_height))
-            zoom_label.config(text=f"Zoom: {int(self.zoom_level * 100)}%")
-        
-        def zoom_in():
-            if self.zoom_level < 5.0:
-                self.zoom_level *= 1.2
-                display_image()
-        
-        def zoom_out():
-            if self.zoom_level > 0.1:
-                self.zoom_level *= 0.8
-                display_image()
-        
-        def reset_zoom():
-            self.zoom_level = 1.0
-            display_image()
         
         def save_image():
             filename = filedialog.asksaveasfilename(
@@ -1145,20 +1108,19 @@ class AutoPartsInventory:
                 filetypes=[("JPEG", "*.jpg"), ("PNG", "*.png"), ("All Files", "*.*")]
             )
             if filename:
-                with open(filename, 'wb') as f:
-                    f.write(img_bytes)
+                shutil.copyfile(img_path, filename)
                 messagebox.showinfo("Exito", "Imagen guardada correctamente")
         
         # Botones de zoom
-        tk.Button(controls_frame, text="Zoom +", command=zoom_in,
+        tk.Button(controls_frame, text="Zoom +", command=lambda: view.zoom_in(),
                  bg=self.theme['accent'], fg=self.theme['text'], font=('Arial', 11), padx=10,
                  activebackground=self.theme['accent_hover'], activeforeground=self.theme['text'],
                  relief='flat', bd=0).pack(side='left', padx=5, pady=10)
-        tk.Button(controls_frame, text="Zoom -", command=zoom_out,
+        tk.Button(controls_frame, text="Zoom -", command=lambda: view.zoom_out(),
                  bg=self.theme['accent'], fg=self.theme['text'], font=('Arial', 11), padx=10,
                  activebackground=self.theme['accent_hover'], activeforeground=self.theme['text'],
                  relief='flat', bd=0).pack(side='left', padx=5, pady=10)
-        tk.Button(controls_frame, text="Restablecer", command=reset_zoom,
+        tk.Button(controls_frame, text="Restablecer", command=lambda: view.set_zoom(1.0),
                  bg=self.theme['surface_alt'], fg=self.theme['text'], font=('Arial', 11), padx=10,
                  activebackground=self.theme['border'], activeforeground=self.theme['text'],
                  relief='flat', bd=0).pack(side='left', padx=5, pady=10)
@@ -1178,19 +1140,10 @@ class AutoPartsInventory:
         tk.Label(controls_frame, text="Usa scroll del mouse para zoom", 
                 bg=self.theme['surface'], fg=self.theme['text_muted'], font=('Arial', 9)).pack(side='right', padx=10)
         
-        # Mostrar imagen inicial
-        display_image()
-        
-        # Bindings para zoom con rueda del mouse
-        def mouse_wheel(event):
-            if event.delta > 0 or event.num == 4:
-                zoom_in()
-            else:
-                zoom_out()
-        
-        canvas.bind('<MouseWheel>', mouse_wheel)
-        canvas.bind('<Button-4>', mouse_wheel)
-        canvas.bind('<Button-5>', mouse_wheel)
+        # Mostrar imagen inicial: solo se dibujan los mosaicos visibles.
+        # La rueda del mouse hace zoom y arrastrar desplaza la imagen.
+        view = TiledImageView(canvas, h_scroll, v_scroll, original_image,
+                              on_zoom=lambda zoom: zoom_label.config(text=f"Zoom: {int(zoom * 100)}%"))
     
     def generate_qr(self):
         """Generar y mostrar QR de pieza seleccionada"""
@@ -1201,9 +1154,8 @@ class AutoPartsInventory:
         
         stock_number = self.parts_tree.item(selection[0])['values'][0]
         
-        self.cursor.execute('SELECT stock_number, nombre, ubicacion FROM piezas WHERE stock_number = ?', 
-                          (stock_number,))
-        part = self.cursor.fetchone()
+        part = self.db.fetchone('SELECT stock_number, nombre, ubicacion FROM piezas WHERE stock_number = ?', 
+                                (stock_number,))
         
         if not part:
             return
@@ -1256,9 +1208,7 @@ class AutoPartsInventory:
         
         if messagebox.askyesno("Confirmar", "Estas seguro de eliminar esta pieza?"):
             try:
-                self.cursor.execute('DELETE FROM imagenes WHERE pieza_id = ?', (stock_number,))
-                self.cursor.execute('DELETE FROM piezas WHERE stock_number = ?', (stock_number,))
-                self.conn.commit()
+                self.db.delete_part(stock_number)
                 messagebox.showinfo("Exito", "Pieza eliminada correctamente")
                 self.load_inventory()
                 self.load_dashboard()
@@ -1274,8 +1224,7 @@ class AutoPartsInventory:
         
         vehicle_id = self.vehicles_tree.item(selection[0])['tags'][0]
         
-        self.cursor.execute('SELECT marca, modelo, anio FROM vehiculos WHERE id = ?', (vehicle_id,))
-        vehicle = self.cursor.fetchone()
+        vehicle = self.db.get_vehicle(vehicle_id)
         
         window = tk.Toplevel(self.root)
         window.title(f"Piezas de {vehicle[0]} {vehicle[1]} {vehicle[2]}")
@@ -1303,12 +1252,7 @@ class AutoPartsInventory:
         
         tree.pack(fill='both', expand=True)
         
-        self.cursor.execute('''
-            SELECT stock_number, nombre, categoria, ubicacion, precio 
-            FROM piezas WHERE vehiculo_id = ?
-        ''', (vehicle_id,))
-        
-        for row in self.cursor.fetchall():
+        for row in self.db.list_vehicle_parts(vehicle_id):
             tree.insert('', 'end', values=row)
         
         tk.Button(window, text="Cerrar", command=window.destroy,
@@ -1326,8 +1270,7 @@ class AutoPartsInventory:
         vehicle_id = self.vehicles_tree.item(selection[0])['tags'][0]
         
         # Verificar si hay piezas asociadas
-        self.cursor.execute('SELECT COUNT(*) FROM piezas WHERE vehiculo_id = ?', (vehicle_id,))
-        parts_count = self.cursor.fetchone()[0]
+        parts_count = self.db.count_vehicle_parts(vehicle_id)
         
         if parts_count > 0:
             if not messagebox.askyesno("Advertencia", 
@@ -1338,10 +1281,7 @@ class AutoPartsInventory:
         
         if messagebox.askyesno("Confirmar", "Estas seguro de eliminar este vehiculo?"):
             try:
-                self.cursor.execute('UPDATE piezas SET vehiculo_id = NULL WHERE vehiculo_id = ?', 
-                                  (vehicle_id,))
-                self.cursor.execute('DELETE FROM vehiculos WHERE id = ?', (vehicle_id,))
-                self.conn.commit()
+                self.db.delete_vehicle(vehicle_id)
                 messagebox.showinfo("Exito", "Vehiculo eliminado correctamente")
                 self.load_vehicles()
                 self.load_dashboard()
@@ -1350,8 +1290,10 @@ class AutoPartsInventory:
     
     def __del__(self):
         """Cerrar conexion a la base de datos"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
+        if hasattr(self, 'inventory_search'):
+            self.inventory_search.shutdown()
+        if hasattr(self, 'db'):
+            self.db.close()
 
 if __name__ == "__main__":
     root = tk.Tk()
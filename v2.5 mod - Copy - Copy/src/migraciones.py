@@ -0,0 +1,584 @@
+"""
+Migraciones de esquema de la base de datos de inventario
+
+La versión del esquema se guarda en PRAGMA user_version. Cada migración se
+aplica una sola vez, dentro de su propia transacción, de modo que las bases
+de datos existentes (data/autopartes_inventario.db) se actualizan al iniciar.
+
+Ejecuta: python src/migraciones.py [ruta_db]
+para migrar manualmente y ver el reporte de planes de consulta.
+"""
+
+import base64
+import os
+import sqlite3
+import sys
+
+import busqueda
+from almacen_imagenes import ImageStore, store_dir_for
+
+# Consultas frecuentes cuyo plan se compara antes y después de migrar
+REPORT_QUERIES = [
+    ('Imágenes de una pieza',
+     'SELECT orden FROM imagenes WHERE pieza_id = ? ORDER BY orden', ('',)),
+    ('Piezas por vehículo',
+     'SELECT COUNT(*) FROM piezas WHERE vehiculo_id = ?', ('',)),
+    ('Inventario reciente',
+     "SELECT stock_number FROM piezas ORDER BY COALESCE(fecha_ingreso, '') DESC", ()),
+    ('Filtro por categoría',
+     "SELECT stock_number FROM piezas WHERE categoria = ? ORDER BY COALESCE(fecha_ingreso, '') DESC", ('',)),
+    ('Búsqueda de texto',
+     'SELECT p.stock_number FROM piezas_fts f CROSS JOIN piezas p ON p.rowid = f.rowid '
+     'WHERE piezas_fts MATCH ? ORDER BY f.rank', ('"x"*',)),
+    ('Aplicaciones por modelo y año (alertas)',
+     'SELECT pieza_id FROM aplicaciones WHERE modelo_id IN (?) AND anio_desde <= ? AND anio_hasta >= ?',
+     (0, 0, 0)),
+    ('Filtro por año (buscador)',
+     'SELECT stock_number FROM piezas p WHERE EXISTS (SELECT 1 FROM aplicaciones a '
+     'WHERE a.pieza_id = p.id AND (a.anio_desde IS NULL OR a.anio_desde <= ? AND a.anio_hasta >= ?)) '
+     'OR p.rowid IN (SELECT rowid FROM piezas_fts WHERE piezas_fts MATCH ?) ORDER BY fecha_ingreso DESC',
+     (0, 0, '{anio} : "x"*')),
+]
+
+# anio con forma '2012' o '2010-2015' (espacios ignorados)
+ANIO_SIMPLE = "replace(anio, ' ', '') GLOB '[12][0-9][0-9][0-9]*'"
+ANIO_RANGO = "replace(anio, ' ', '') GLOB '[12][0-9][0-9][0-9]-[12][0-9][0-9][0-9]*'"
+
+
+def year_expr(start):
+    """Los 4 dígitos de anio (sin espacios) que empiezan en start, como entero"""
+    return f"CAST(substr(replace(anio, ' ', ''), {start}, 4) AS INTEGER)"
+
+
+# Clave canónica de la marca de una pieza: los alias ('vw') se guardan como su
+# marca ('volkswagen'), ver busqueda.BRAND_ALIASES y la migración 10
+BRAND_KEY = "COALESCE((SELECT clave FROM marcas_alias WHERE alias = {0}), {0})"
+
+
+def fitment_catchup(brand_key):
+    """
+    Marca, modelo y aplicación de las piezas p con rowid > ? (todas con 0),
+    con brand_key como clave de marca. Las usan las migraciones y
+    insert_parts_bulk; el plegado y los años vienen de las columnas
+    generadas de la migración 8.
+    """
+    return (
+        f'''
+        INSERT OR IGNORE INTO marcas (clave, nombre)
+        SELECT {brand_key}, trim(p.marca) FROM piezas p WHERE p.rowid > ? AND p.marca_norm != ''
+        ''',
+        f'''
+        INSERT OR IGNORE INTO modelos (marca_id, clave, nombre)
+        SELECT m.id, p.modelo_norm, trim(p.modelo)
+        FROM piezas p JOIN marcas m ON m.clave = {brand_key}
+        WHERE p.rowid > ? AND p.modelo_norm != ''
+        ''',
+        f'''
+        INSERT INTO aplicaciones (pieza_id, marca_id, modelo_id, anio_desde, anio_hasta)
+        SELECT p.id, m.id, mo.id, p.anio_desde, p.anio_hasta
+        FROM piezas p JOIN marcas m ON m.clave = {brand_key}
+        LEFT JOIN modelos mo ON mo.marca_id = m.id AND mo.clave = p.modelo_norm
+        WHERE p.rowid > ?
+        ''',
+    )
+
+
+def fitment_row(brand_key):
+    """Las mismas sentencias para la fila new dentro de un trigger"""
+    return f'''
+    INSERT OR IGNORE INTO marcas (clave, nombre)
+    SELECT {brand_key}, trim(new.marca) WHERE new.marca_norm != '';
+    INSERT OR IGNORE INTO modelos (marca_id, clave, nombre)
+    SELECT id, new.modelo_norm, trim(new.modelo) FROM marcas
+    WHERE clave = {brand_key} AND new.modelo_norm != '';
+    INSERT INTO aplicaciones (pieza_id, marca_id, modelo_id, anio_desde, anio_hasta)
+    SELECT new.id, m.id, mo.id, new.anio_desde, new.anio_hasta
+    FROM marcas m LEFT JOIN modelos mo ON mo.marca_id = m.id AND mo.clave = new.modelo_norm
+    WHERE m.clave = {brand_key};
+'''
+
+
+# Versión actual (con alias): trigger de inserción y su equivalente por lote
+FITMENT_CATCHUP = fitment_catchup(BRAND_KEY.format('p.marca_norm'))
+FITMENT_ROW = fitment_row(BRAND_KEY.format('new.marca_norm'))
+
+
+def backfill_fitments(conn, statements=FITMENT_CATCHUP):
+    """Aplicaciones de las piezas que ya existían"""
+    for statement in statements:
+        conn.execute(statement, (0,))
+
+
+def fill_brand_aliases(conn):
+    """Copia busqueda.BRAND_ALIASES a marcas_alias"""
+    conn.executemany('INSERT OR REPLACE INTO marcas_alias (alias, clave) VALUES (?, ?)',
+                     busqueda.BRAND_CANONICAL.items())
+
+
+def keep_upright_thumbnails(conn):
+    """
+    Vuelve a marcar como generadas las miniaturas que la migración 13 dejó
+    pendientes sin necesidad. Solo pueden estar giradas las de originales
+    con orientación EXIF distinta de 1: las fotos que pasaron por la
+    ingesta se guardan ya enderezadas y sin EXIF. Leer la cabecera de cada
+    original cuesta mucho menos que regenerar su miniatura.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        # Sin Pillow tampoco hay backfill: quedan pendientes y se regeneran
+        # todas cuando esté instalado, con el mismo resultado
+        return
+    store = ImageStore(store_dir_for(database_file(conn)))
+    upright = []
+    for (sha256,) in conn.execute('SELECT DISTINCT sha256 FROM imagenes WHERE miniatura = 0').fetchall():
+        if not os.path.exists(store.thumbnail_path(sha256)):
+            continue  # Nunca se generó: la crea el backfill
+        try:
+            with Image.open(store.path(sha256)) as img:
+                if img.getexif().get(0x0112, 1) != 1:
+                    continue
+        except OSError:
+            continue  # Original dañado: que el backfill lo marque como imposible
+        upright.append((sha256,))
+    conn.executemany('UPDATE imagenes SET miniatura = 1 WHERE sha256 = ? AND miniatura = 0', upright)
+
+
+def advance_sequence_sql(prefix, digits):
+    """
+    Sube secuencias.ultimo hasta el mayor stock number PREFIJO-AAAAMMDD-NNNNNN
+    de cada día entre las piezas con rowid > ? (nunca lo baja)
+    """
+    return f'''
+        INSERT INTO secuencias (prefijo, fecha, ultimo)
+        SELECT '{prefix}', substr(stock_number, {len(prefix) + 2}, 8),
+               MAX(CAST(substr(stock_number, {len(prefix) + 11}) AS INTEGER))
+        FROM piezas
+        WHERE rowid > ? AND stock_number GLOB '{prefix}-{'[0-9]' * 8}-{'[0-9]' * digits}'
+        GROUP BY 2
+        ON CONFLICT (prefijo, fecha) DO UPDATE SET ultimo = MAX(ultimo, excluded.ultimo)
+    '''
+
+
+def database_file(conn):
+    """Ruta del archivo de la base de datos principal de la conexión"""
+    for _, name, path in conn.execute('PRAGMA database_list'):
+        if name == 'main':
+            return path
+    return ''
+
+
+def move_images_to_store(conn):
+    """Pasa las imágenes base64 de la tabla imagenes a archivos por SHA-256"""
+    store = ImageStore(store_dir_for(database_file(conn)))
+    conn.execute('''
+        CREATE TABLE imagenes_nueva (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pieza_id TEXT NOT NULL,
+            sha256 TEXT NOT NULL,
+            orden INTEGER,
+            FOREIGN KEY (pieza_id) REFERENCES piezas (id)
+        )
+    ''')
+    # Se recorre fila por fila para no cargar todas las imágenes en memoria
+    rows = conn.execute('SELECT id, pieza_id, imagen_data, orden FROM imagenes ORDER BY id')
+    insert = 'INSERT INTO imagenes_nueva (id, pieza_id, sha256, orden) VALUES (?, ?, ?, ?)'
+    for image_id, pieza_id, imagen_data, orden in rows:
+        sha256 = store.put(base64.b64decode(imagen_data))
+        conn.execute(insert, (image_id, pieza_id, sha256, orden))
+    conn.execute('DROP TABLE imagenes')
+    conn.execute('ALTER TABLE imagenes_nueva RENAME TO imagenes')
+
+
+# (versión, descripción, pasos). Cada paso es una sentencia SQL o una
+# función que recibe la conexión. Nunca modificar una migración publicada:
+# agregar una nueva al final.
+MIGRATIONS = [
+    (1, 'Esquema inicial: vehiculos, piezas e imagenes', [
+        '''
+        CREATE TABLE IF NOT EXISTS vehiculos (
+            id TEXT PRIMARY KEY,
+            marca TEXT NOT NULL,
+            modelo TEXT NOT NULL,
+            anio TEXT NOT NULL,
+            vin TEXT NOT NULL,
+            color TEXT,
+            motor TEXT,
+            notas TEXT,
+            fecha_ingreso TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS piezas (
+            id TEXT PRIMARY KEY,
+            stock_number TEXT UNIQUE NOT NULL,
+            nombre TEXT NOT NULL,
+            marca TEXT NOT NULL,
+            modelo TEXT NOT NULL,
+            anio TEXT NOT NULL,
+            numero_parte TEXT,
+            categoria TEXT NOT NULL,
+            fabricante TEXT,
+            condicion TEXT NOT NULL,
+            precio REAL,
+            estante TEXT NOT NULL,
+            nivel INTEGER NOT NULL,
+            ubicacion TEXT NOT NULL,
+            vehiculo_id TEXT,
+            notas TEXT,
+            fecha_ingreso TEXT,
+            FOREIGN KEY (vehiculo_id) REFERENCES vehiculos (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS imagenes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pieza_id TEXT NOT NULL,
+            imagen_data TEXT NOT NULL,
+            orden INTEGER,
+            FOREIGN KEY (pieza_id) REFERENCES piezas (id)
+        )
+        ''',
+    ]),
+    (2, 'Índices para imágenes por pieza, piezas por vehículo, orden y categoría', [
+        # Las imágenes se leen siempre por pieza y en orden
+        'CREATE INDEX IF NOT EXISTS idx_imagenes_pieza_orden ON imagenes (pieza_id, orden)',
+        # El conteo por vehículo se resuelve solo con el índice
+        'CREATE INDEX IF NOT EXISTS idx_piezas_vehiculo ON piezas (vehiculo_id)',
+        # Listado de inventario (más recientes primero) sin ordenar en memoria
+        'CREATE INDEX IF NOT EXISTS idx_piezas_fecha ON piezas (fecha_ingreso)',
+        # Filtro por categoría que ya sale ordenado por fecha
+        'CREATE INDEX IF NOT EXISTS idx_piezas_categoria_fecha ON piezas (categoria, fecha_ingreso)',
+        'ANALYZE',
+    ]),
+    (3, 'Índice de texto completo (FTS5) sobre piezas', [
+        # Tabla de contenido externo: el texto vive en piezas, FTS solo guarda el índice.
+        # remove_diacritics 2: 'bateria' == 'batería'. prefix: acelera búsquedas "bat*".
+        '''
+        CREATE VIRTUAL TABLE IF NOT EXISTS piezas_fts USING fts5(
+            nombre, marca, modelo, anio, stock_number, ubicacion,
+            content='piezas', content_rowid='rowid',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='1 2 3'
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS piezas_fts_insert AFTER INSERT ON piezas BEGIN
+            INSERT INTO piezas_fts (rowid, nombre, marca, modelo, anio, stock_number, ubicacion)
+            VALUES (new.rowid, new.nombre, new.marca, new.modelo, new.anio, new.stock_number, new.ubicacion);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS piezas_fts_delete AFTER DELETE ON piezas BEGIN
+            INSERT INTO piezas_fts (piezas_fts, rowid, nombre, marca, modelo, anio, stock_number, ubicacion)
+            VALUES ('delete', old.rowid, old.nombre, old.marca, old.modelo, old.anio, old.stock_number, old.ubicacion);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS piezas_fts_update AFTER UPDATE OF
+            nombre, marca, modelo, anio, stock_number, ubicacion ON piezas BEGIN
+            INSERT INTO piezas_fts (piezas_fts, rowid, nombre, marca, modelo, anio, stock_number, ubicacion)
+            VALUES ('delete', old.rowid, old.nombre, old.marca, old.modelo, old.anio, old.stock_number, old.ubicacion);
+            INSERT INTO piezas_fts (rowid, nombre, marca, modelo, anio, stock_number, ubicacion)
+            VALUES (new.rowid, new.nombre, new.marca, new.modelo, new.anio, new.stock_number, new.ubicacion);
+        END
+        ''',
+        # Indexar las piezas que ya existían
+        "INSERT INTO piezas_fts (piezas_fts) VALUES ('rebuild')",
+    ]),
+    (4, 'Imágenes fuera de la base de datos, en un almacén por SHA-256', [
+        move_images_to_store,
+        # Cubre la lectura de imágenes por pieza sin tocar la tabla
+        'CREATE INDEX IF NOT EXISTS idx_imagenes_pieza_orden ON imagenes (pieza_id, orden, sha256)',
+        # Para saber si un archivo sigue referenciado antes de borrarlo
+        'CREATE INDEX IF NOT EXISTS idx_imagenes_sha256 ON imagenes (sha256)',
+    ]),
+    (5, 'Marca de miniatura generada por imagen', [
+        'ALTER TABLE imagenes ADD COLUMN miniatura INTEGER NOT NULL DEFAULT 0',
+        # Índice parcial: solo contiene las imágenes pendientes de miniatura
+        'CREATE INDEX IF NOT EXISTS idx_imagenes_sin_miniatura ON imagenes (sha256) WHERE miniatura = 0',
+    ]),
+    (6, 'Secuencias diarias para números de stock e IDs de vehículo', [
+        '''
+        CREATE TABLE IF NOT EXISTS secuencias (
+            prefijo TEXT NOT NULL,
+            fecha TEXT NOT NULL,
+            ultimo INTEGER NOT NULL,
+            PRIMARY KEY (prefijo, fecha)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    (7, 'Totales del dashboard mantenidos por triggers', [
+        # Piezas y valor por categoría: los totales se suman sobre unas pocas filas
+        '''
+        CREATE TABLE IF NOT EXISTS estadisticas_categoria (
+            categoria TEXT PRIMARY KEY,
+            piezas INTEGER NOT NULL,
+            valor REAL NOT NULL
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS contadores (
+            nombre TEXT PRIMARY KEY,
+            valor INTEGER NOT NULL
+        ) WITHOUT ROWID
+        ''',
+        '''
+        INSERT INTO estadisticas_categoria (categoria, piezas, valor)
+        SELECT categoria, COUNT(*), COALESCE(SUM(precio), 0) FROM piezas GROUP BY categoria
+        ''',
+        "INSERT INTO contadores (nombre, valor) SELECT 'vehiculos', COUNT(*) FROM vehiculos",
+        '''
+        CREATE TRIGGER IF NOT EXISTS estadisticas_piezas_insert AFTER INSERT ON piezas BEGIN
+            INSERT INTO estadisticas_categoria (categoria, piezas, valor)
+            VALUES (new.categoria, 1, COALESCE(new.precio, 0))
+            ON CONFLICT (categoria) DO UPDATE SET piezas = piezas + 1, valor = valor + excluded.valor;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS estadisticas_piezas_delete AFTER DELETE ON piezas BEGIN
+            UPDATE estadisticas_categoria SET piezas = piezas - 1, valor = valor - COALESCE(old.precio, 0)
+            WHERE categoria = old.categoria;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS estadisticas_piezas_update AFTER UPDATE OF categoria, precio ON piezas BEGIN
+            UPDATE estadisticas_categoria SET piezas = piezas - 1, valor = valor - COALESCE(old.precio, 0)
+            WHERE categoria = old.categoria;
+            INSERT INTO estadisticas_categoria (categoria, piezas, valor)
+            VALUES (new.categoria, 1, COALESCE(new.precio, 0))
+            ON CONFLICT (categoria) DO UPDATE SET piezas = piezas + 1, valor = valor + excluded.valor;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS estadisticas_vehiculos_insert AFTER INSERT ON vehiculos BEGIN
+            UPDATE contadores SET valor = valor + 1 WHERE nombre = 'vehiculos';
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS estadisticas_vehiculos_delete AFTER DELETE ON vehiculos BEGIN
+            UPDATE contadores SET valor = valor - 1 WHERE nombre = 'vehiculos';
+        END
+        ''',
+    ]),
+    (8, 'Marca, modelo y años normalizados para las alertas del monitor', [
+        # Columnas generadas (VIRTUAL: no ocupan espacio en la tabla, solo en el
+        # índice) con el mismo plegado que busqueda.fold_key()
+        f'ALTER TABLE piezas ADD COLUMN marca_norm TEXT '
+        f'GENERATED ALWAYS AS ({busqueda.sql_fold("marca")}) VIRTUAL',
+        f'ALTER TABLE piezas ADD COLUMN modelo_norm TEXT '
+        f'GENERATED ALWAYS AS ({busqueda.sql_fold("modelo")}) VIRTUAL',
+        f'ALTER TABLE piezas ADD COLUMN anio_desde INTEGER '
+        f'GENERATED ALWAYS AS (CASE WHEN {ANIO_SIMPLE} THEN {year_expr(1)} END) VIRTUAL',
+        f'ALTER TABLE piezas ADD COLUMN anio_hasta INTEGER '
+        f'GENERATED ALWAYS AS (CASE WHEN {ANIO_RANGO} THEN {year_expr(6)} '
+        f'WHEN {ANIO_SIMPLE} THEN {year_expr(1)} END) VIRTUAL',
+        # Candidatos por marca y prefijo de modelo en una búsqueda por rango; los
+        # años van en el índice para puntuar sin calcular columnas por fila
+        'CREATE INDEX IF NOT EXISTS idx_piezas_marca_modelo ON piezas '
+        '(marca_norm, modelo_norm, anio_desde, anio_hasta)',
+    ]),
+    (9, 'Aplicaciones de piezas: marcas, modelos y rangos de años normalizados', [
+        # Diccionarios canónicos: una fila por marca y por modelo de cada marca
+        # (clave = texto plegado, nombre = como se escribió la primera vez)
+        '''
+        CREATE TABLE IF NOT EXISTS marcas (
+            id INTEGER PRIMARY KEY,
+            clave TEXT NOT NULL UNIQUE,
+            nombre TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS modelos (
+            id INTEGER PRIMARY KEY,
+            marca_id INTEGER NOT NULL REFERENCES marcas (id),
+            clave TEXT NOT NULL,
+            nombre TEXT NOT NULL,
+            UNIQUE (marca_id, clave)
+        )
+        ''',
+        # Pieza -> marca, modelo (NULL si no se indicó) y años en los que sirve
+        '''
+        CREATE TABLE IF NOT EXISTS aplicaciones (
+            pieza_id TEXT NOT NULL REFERENCES piezas (id),
+            marca_id INTEGER NOT NULL REFERENCES marcas (id),
+            modelo_id INTEGER REFERENCES modelos (id),
+            anio_desde INTEGER,
+            anio_hasta INTEGER
+        )
+        ''',
+        # Búsquedas por rango de años dentro de un modelo o una marca (cubrientes)
+        'CREATE INDEX IF NOT EXISTS idx_aplicaciones_modelo_anio ON aplicaciones '
+        '(modelo_id, anio_desde, anio_hasta, pieza_id)',
+        'CREATE INDEX IF NOT EXISTS idx_aplicaciones_marca_anio ON aplicaciones '
+        '(marca_id, anio_desde, anio_hasta, pieza_id)',
+        # Años de una pieza (filtro del buscador) y mantenimiento por triggers
+        'CREATE INDEX IF NOT EXISTS idx_aplicaciones_pieza ON aplicaciones (pieza_id, anio_desde, anio_hasta)',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS aplicaciones_piezas_insert AFTER INSERT ON piezas BEGIN
+            {fitment_row('new.marca_norm')}
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS aplicaciones_piezas_delete AFTER DELETE ON piezas BEGIN
+            DELETE FROM aplicaciones WHERE pieza_id = old.id;
+        END
+        ''',
+        f'''
+        CREATE TRIGGER IF NOT EXISTS aplicaciones_piezas_update AFTER UPDATE OF id, marca, modelo, anio ON piezas BEGIN
+            DELETE FROM aplicaciones WHERE pieza_id = old.id;
+            {fitment_row('new.marca_norm')}
+        END
+        ''',
+        lambda conn: backfill_fitments(conn, fitment_catchup('p.marca_norm')),
+        # Las alertas ahora buscan en aplicaciones: el índice de la migración 8
+        # ya no lo usa ninguna consulta y solo encarece cada escritura en piezas.
+        # Se borra aquí en lugar de quitarlo de la migración 8 porque las bases
+        # que ya están en la versión 8 nunca volverían a aplicarla.
+        'DROP INDEX IF EXISTS idx_piezas_marca_modelo',
+    ]),
+    (10, 'Marcas canónicas: los alias (VW, Chevy) se guardan como su marca', [
+        'CREATE TABLE IF NOT EXISTS marcas_alias (alias TEXT PRIMARY KEY, clave TEXT NOT NULL) WITHOUT ROWID',
+        fill_brand_aliases,
+        'DROP TRIGGER IF EXISTS aplicaciones_piezas_insert',
+        'DROP TRIGGER IF EXISTS aplicaciones_piezas_update',
+        f'''
+        CREATE TRIGGER aplicaciones_piezas_insert AFTER INSERT ON piezas BEGIN
+            {FITMENT_ROW}
+        END
+        ''',
+        f'''
+        CREATE TRIGGER aplicaciones_piezas_update AFTER UPDATE OF id, marca, modelo, anio ON piezas BEGIN
+            DELETE FROM aplicaciones WHERE pieza_id = old.id;
+            {FITMENT_ROW}
+        END
+        ''',
+        # Se reconstruyen los diccionarios para unir 'VW' con 'Volkswagen'
+        'DELETE FROM aplicaciones',
+        'DELETE FROM modelos',
+        'DELETE FROM marcas',
+        backfill_fitments,
+    ]),
+    (11, 'Sin estadísticas de ANALYZE: el planificador usa sus valores por defecto', [
+        # La migración 2 ejecutaba ANALYZE. En una base casi vacía esas
+        # estadísticas hacen que el planificador recorra piezas dentro de la
+        # búsqueda FTS. Borrar la tabla cambia el esquema, así que todas las
+        # conexiones dejan de usarlas.
+        'DROP TABLE IF EXISTS sqlite_stat1',
+    ]),
+    (12, 'Orden por fecha que incluye las piezas sin fecha_ingreso', [
+        # El cursor del inventario compara COALESCE(fecha_ingreso, ''): con la
+        # columna sola, las filas NULL nunca aparecían en las páginas
+        "CREATE INDEX IF NOT EXISTS idx_piezas_fecha_orden ON piezas (COALESCE(fecha_ingreso, ''))",
+        'CREATE INDEX IF NOT EXISTS idx_piezas_categoria_fecha_orden ON piezas '
+        "(categoria, COALESCE(fecha_ingreso, ''))",
+        'DROP INDEX IF EXISTS idx_piezas_fecha',
+        'DROP INDEX IF EXISTS idx_piezas_categoria_fecha',
+    ]),
+    (13, 'Regenerar miniaturas con la orientación EXIF aplicada', [
+        # Las generadas por backfill_thumbnails() antes de aplicar exif_transpose
+        # pueden estar giradas; el backfill en segundo plano las vuelve a crear
+        'UPDATE imagenes SET miniatura = 0 WHERE miniatura = 1',
+    ]),
+    (14, 'Contador de stock numbers al día con los importados', [
+        # Los números escritos en archivos importados no subían secuencias
+        lambda conn: conn.execute(advance_sequence_sql('AP', 6), (0,)),
+    ]),
+    (15, 'Regenerar solo las miniaturas de fotos con orientación EXIF', [
+        keep_upright_thumbnails,
+    ]),
+]
+
+# Migraciones que liberan mucho espacio: se compacta el archivo al terminar
+VACUUM_AFTER = {4}
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn):
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def query_plans(conn):
+    """Plan de ejecución (EXPLAIN QUERY PLAN) de cada consulta del reporte"""
+    plans = {}
+    for name, query, params in REPORT_QUERIES:
+        try:
+            rows = conn.execute(f'EXPLAIN QUERY PLAN {query}', params).fetchall()
+            plans[name] = [row[-1] for row in rows]
+        except sqlite3.OperationalError as e:
+            # La tabla todavía no existe (base de datos nueva)
+            plans[name] = [f'(no disponible: {e})']
+    return plans
+
+
+def format_plan_report(before, after):
+    """Reporte legible de los planes que cambiaron"""
+    lines = []
+    for name in after:
+        if before.get(name) == after[name]:
+            continue
+        lines.append(f'{name}:')
+        lines.extend(f'   antes:   {step}' for step in before.get(name, []))
+        lines.extend(f'   después: {step}' for step in after[name])
+    return '\n'.join(lines)
+
+
+def migrate(conn, target=SCHEMA_VERSION):
+    """
+    Aplica las migraciones pendientes hasta la versión indicada.
+    Devuelve la lista de versiones aplicadas.
+    """
+    applied = []
+    for version, description, steps in MIGRATIONS:
+        if version > target:
+            break
+        # BEGIN IMMEDIATE serializa a procesos que arrancan al mismo tiempo
+        # (aplicación y monitor); la versión se vuelve a leer ya con el candado
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if get_version(conn) >= version:
+                conn.rollback()
+                continue
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(version)
+
+    # VACUUM no puede correr dentro de una transacción
+    if VACUUM_AFTER.intersection(applied):
+        conn.execute('VACUUM')
+    return applied
+
+
+def migrate_with_report(conn, target=SCHEMA_VERSION):
+    """Migra y devuelve (versiones aplicadas, reporte de cambios en planes)"""
+    before = query_plans(conn)
+    applied = migrate(conn, target)
+    report = format_plan_report(before, query_plans(conn)) if applied else ''
+    return applied, report
+
+
+if __name__ == "__main__":
+    from base_datos import DEFAULT_DB_PATH, ConnectionPool
+
+    db_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_DB_PATH
+    pool = ConnectionPool(db_path, size=1)
+    with pool.connection() as conn:
+        print(f"Base de datos: {db_path}")
+        print(f"Versión actual del esquema: {get_version(conn)}")
+        applied, report = migrate_with_report(conn)
+        if applied:
+            print(f"Migraciones aplicadas: {', '.join(map(str, applied))}")
+            print("\nCambios en planes de consulta:")
+            print(report or "   (sin cambios)")
+        else:
+            print("El esquema ya está actualizado")
+    pool.close()
@@ -0,0 +1,88 @@
+"""
+Miniaturas precalculadas de las fotos de piezas
+
+Las miniaturas (JPEG de 180 px) se generan al guardar la pieza y se
+persisten junto al original en el almacén de imágenes. Las imágenes que ya
+existían se completan en segundo plano con backfill_thumbnails(). La
+ventana de detalles solo abre la miniatura y mantiene las PhotoImage más
+usadas en memoria.
+"""
+
+import io
+from collections import OrderedDict
+
+from PIL import Image, ImageOps, ImageTk
+
+THUMBNAIL_SIZE = (180, 180)
+THUMBNAIL_QUALITY = 85
+
+# PhotoImage que se conservan en memoria entre ventanas de detalles
+PHOTO_CACHE_SIZE = 200
+
+
+def make_thumbnail(source):
+    """Bytes JPEG de la miniatura; source puede ser bytes o una ruta"""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    with Image.open(source) as img:
+        # En JPEG decodifica directamente a escala reducida (mucho más rápido)
+        img.draft('RGB', THUMBNAIL_SIZE)
+        # Las fotos anteriores a la ingesta con orientación EXIF (backfill) aún la traen sin aplicar
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(THUMBNAIL_SIZE)
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')  # JPEG no admite transparencia
+        output = io.BytesIO()
+        img.save(output, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def ensure_thumbnail(repo, sha256):
+    """Genera y persiste la miniatura si falta; devuelve su ruta"""
+    path = repo.images.thumbnail_path(sha256)
+    try:
+        with open(path, 'rb'):
+            return path
+    except FileNotFoundError:
+        pass
+    repo.images.put_thumbnail(sha256, make_thumbnail(repo.images.path(sha256)))
+    repo.mark_thumbnail(sha256)
+    return path
+
+
+def backfill_thumbnails(repo, batch_size=100):
+    """Genera las miniaturas pendientes. Devuelve cuántas se generaron."""
+    generated = 0
+    while True:
+        pending = repo.images_without_thumbnail(batch_size)
+        if not pending:
+            return generated
+        for sha256 in pending:
+            try:
+                repo.images.put_thumbnail(sha256, make_thumbnail(repo.images.path(sha256)))
+                repo.mark_thumbnail(sha256)
+                generated += 1
+            except (OSError, ValueError):
+                # Original faltante o dañado: no volver a intentarlo en cada inicio
+                repo.mark_thumbnail(sha256, status=-1)
+
+
+class PhotoCache:
+    """LRU de ImageTk.PhotoImage por SHA-256 (usar solo desde el hilo de Tk)"""
+
+    def __init__(self, maxsize=PHOTO_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._photos = OrderedDict()
+
+    def get(self, sha256, load_path):
+        """PhotoImage de la miniatura; load_path(sha256) da la ruta si no está en caché"""
+        photo = self._photos.get(sha256)
+        if photo is not None:
+            self._photos.move_to_end(sha256)
+            return photo
+        with Image.open(load_path(sha256)) as img:
+            photo = ImageTk.PhotoImage(img)
+        self._photos[sha256] = photo
+        if len(self._photos) > self.maxsize:
+            self._photos.popitem(last=False)
+        return photo
@@ -0,0 +1,120 @@
+"""
+Ejecución de consultas en segundo plano para la interfaz Tkinter
+
+Tkinter no es seguro entre hilos: el hilo de trabajo solo ejecuta la
+consulta y el resultado se recoge desde el hilo principal con after().
+"""
+
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Espera desde la última tecla antes de lanzar la búsqueda (ms)
+SEARCH_DEBOUNCE_MS = 250
+
+# Cada cuánto revisa el hilo principal si la consulta ya terminó (ms)
+POLL_INTERVAL_MS = 15
+
+
+class DebouncedSearch:
+    """
+    Búsqueda con debounce y cancelación.
+
+    search_fn(*args, cancel=threading.Event) se ejecuta en un hilo de trabajo;
+    on_result(resultado) se llama en el hilo de Tk solo con la respuesta a la
+    petición más reciente. Cuando llega texto nuevo, la consulta en curso se
+    cancela (cancel.set()) y su resultado se descarta.
+    """
+
+    def __init__(self, widget, search_fn, on_result, on_error=None,
+                 delay_ms=SEARCH_DEBOUNCE_MS, poll_ms=POLL_INTERVAL_MS):
+        self.widget = widget
+        self.search_fn = search_fn
+        self.on_result = on_result
+        self.on_error = on_error
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='busqueda')
+        self._generation = 0
+        self._scheduled = None
+        self._cancel = None
+        self._future = None
+
+    def request(self, *args):
+        """Programa una búsqueda; las peticiones anteriores quedan obsoletas"""
+        self._invalidate()
+        self._scheduled = self.widget.after(self.delay_ms, self._start, self._generation, args)
+
+    def run_now(self, *args):
+        """Lanza la búsqueda sin esperar el debounce (ej. al cambiar un filtro)"""
+        self._invalidate()
+        self._start(self._generation, args)
+
+    def _invalidate(self):
+        self._generation += 1
+        if self._scheduled is not None:
+            self.widget.after_cancel(self._scheduled)
+            self._scheduled = None
+        if self._cancel is not None:
+            self._cancel.set()
+        if self._future is not None:
+            self._future.cancel()  # Solo tiene efecto si todavía no empezó
+
+    def _start(self, generation, args):
+        self._scheduled = None
+        if generation != self._generation:
+            return
+        self._cancel = threading.Event()
+        self._future = self._executor.submit(self.search_fn, *args, cancel=self._cancel)
+        self._poll(generation, self._future, self._cancel)
+
+    def _poll(self, generation, future, cancel):
+        if not future.done():
+            self.widget.after(self.poll_ms, self._poll, generation, future, cancel)
+            return
+        if generation != self._generation or future.cancelled():
+            return  # Respuesta a una petición vieja
+        try:
+            result = future.result()
+        except sqlite3.OperationalError:
+            if cancel.is_set():
+                return
+            if self.on_error:
+                self.on_error(future.exception())
+            return
+        except Exception as e:
+            if self.on_error:
+                self.on_error(e)
+            return
+        self.on_result(result)
+
+    def shutdown(self):
+        self._invalidate()
+        self._executor.shutdown(wait=False)
+
+
+def run_in_background(widget, fn, on_done, on_error=None, poll_ms=POLL_INTERVAL_MS):
+    """
+    Ejecuta fn() en un hilo aparte (importaciones, exportaciones) y llama a
+    on_done(resultado) u on_error(excepción) desde el hilo de Tk.
+    """
+    future = Future()
+
+    def work():
+        try:
+            future.set_result(fn())
+        except Exception as e:
+            future.set_exception(e)
+
+    def poll():
+        if not future.done():
+            widget.after(poll_ms, poll)
+        elif future.exception() is not None:
+            if on_error:
+                on_error(future.exception())
+        else:
+            on_done(future.result())
+
+    threading.Thread(target=work, daemon=True).start()
+    poll()
+    return future
@@ -0,0 +1,179 @@
+"""
+Visor con zoom por mosaicos sobre una pirámide de resoluciones
+
+En lugar de redimensionar la foto completa en cada paso de zoom, se
+precalculan versiones a 1/2, 1/4, ... de la original (la pirámide) y solo se
+dibujan los mosaicos de TILE_SIZE px que caen dentro de la parte visible del
+Canvas. Cada mosaico se obtiene del nivel más pequeño que todavía tiene
+resolución suficiente, así que el costo de hacer zoom o desplazarse depende
+del tamaño de la ventana y no del de la imagen.
+"""
+
+import math
+
+from PIL import Image, ImageTk
+
+# Lado de cada mosaico en pantalla (px)
+TILE_SIZE = 256
+
+# Los niveles de la pirámide se detienen al llegar a este lado máximo (px)
+MIN_LEVEL_SIZE = 256
+
+ZOOM_MIN = 0.1
+ZOOM_MAX = 5.0
+ZOOM_STEP = 1.2
+
+# Tiempo que se acumulan los eventos de la rueda antes de redibujar (ms)
+WHEEL_COALESCE_MS = 40
+
+
+class ImagePyramid:
+    """Niveles de una imagen, cada uno a la mitad de resolución del anterior"""
+
+    def __init__(self, image):
+        if image.mode not in ('RGB', 'RGBA', 'L'):
+            image = image.convert('RGB')
+        self.width, self.height = image.size
+        self.levels = [image]
+        while max(self.levels[-1].size) > MIN_LEVEL_SIZE:
+            self.levels.append(self.levels[-1].reduce(2))
+
+    def size_at(self, zoom):
+        return max(1, round(self.width * zoom)), max(1, round(self.height * zoom))
+
+    def level_for(self, zoom):
+        """Índice del nivel más pequeño cuya escala sigue siendo >= zoom"""
+        if zoom >= 1:
+            return 0
+        return min(int(math.log2(1 / zoom)), len(self.levels) - 1)
+
+    def render(self, zoom, box):
+        """
+        Región box = (x0, y0, x1, y1), en coordenadas de la imagen ya escalada
+        por zoom, como imagen PIL de tamaño (x1 - x0, y1 - y0).
+        """
+        x0, y0, x1, y1 = box
+        index = self.level_for(zoom)
+        level = self.levels[index]
+        # Escala del nivel respecto a la imagen con zoom
+        sx = level.width / (self.width * zoom)
+        sy = level.height / (self.height * zoom)
+        # Por redondeo el borde puede pasarse una fracción de px del nivel
+        source = (x0 * sx, y0 * sy, min(x1 * sx, level.width), min(y1 * sy, level.height))
+        resample = Image.LANCZOS if zoom < 1 else Image.BILINEAR
+        return level.resize((x1 - x0, y1 - y0), resample, box=source)
+
+
+def visible_tiles(image_size, viewport, tile_size=TILE_SIZE):
+    """Cajas (x0, y0, x1, y1) de los mosaicos que tocan viewport"""
+    width, height = image_size
+    vx0, vy0, vx1, vy1 = viewport
+    first_col, first_row = max(0, int(vx0 // tile_size)), max(0, int(vy0 // tile_size))
+    last_col = min(math.ceil(width / tile_size), math.ceil(vx1 / tile_size))
+    last_row = min(math.ceil(height / tile_size), math.ceil(vy1 / tile_size))
+    return [
+        (col * tile_size, row * tile_size,
+         min((col + 1) * tile_size, width), min((row + 1) * tile_size, height))
+        for row in range(first_row, last_row)
+        for col in range(first_col, last_col)
+    ]
+
+
+class TiledImageView:
+    """
+    Dibuja una imagen con zoom en un tk.Canvas creando solo los mosaicos
+    visibles. on_zoom(nivel) se llama cada vez que cambia el zoom.
+    """
+
+    def __init__(self, canvas, h_scroll, v_scroll, image, on_zoom=None):
+        self.canvas = canvas
+        self.h_scroll = h_scroll
+        self.v_scroll = v_scroll
+        self.pyramid = ImagePyramid(image)
+        self.on_zoom = on_zoom
+        self.zoom = 1.0
+        self._tiles = {}  # caja -> (id en el canvas, PhotoImage)
+        self._pending_factor = 1.0
+        self._pending_anchor = None
+        self._wheel_job = None
+        self._redraw_job = None
+        canvas.configure(xscrollcommand=self._on_xscroll, yscrollcommand=self._on_yscroll)
+        canvas.bind('<Configure>', lambda e: self.schedule_redraw())
+        canvas.bind('<MouseWheel>', self._on_wheel)
+        canvas.bind('<Button-4>', self._on_wheel)
+        canvas.bind('<Button-5>', self._on_wheel)
+        canvas.bind('<ButtonPress-1>', lambda e: canvas.scan_mark(e.x, e.y))
+        canvas.bind('<B1-Motion>', lambda e: canvas.scan_dragto(e.x, e.y, gain=1))
+        self.set_zoom(1.0)
+
+    def zoom_in(self):
+        self.set_zoom(self.zoom * ZOOM_STEP)
+
+    def zoom_out(self):
+        self.set_zoom(self.zoom / ZOOM_STEP)
+
+    def set_zoom(self, zoom, anchor=None):
+        """Cambia el zoom manteniendo fijo el punto anchor=(x, y) de la ventana"""
+        zoom = min(max(zoom, ZOOM_MIN), ZOOM_MAX)
+        canvas = self.canvas
+        if anchor is None:
+            anchor = (canvas.winfo_width() / 2, canvas.winfo_height() / 2)
+        # Punto de la imagen original bajo el ancla, antes del cambio
+        image_x = canvas.canvasx(anchor[0]) / self.zoom
+        image_y = canvas.canvasy(anchor[1]) / self.zoom
+
+        self.zoom = zoom
+        for item, _ in self._tiles.values():
+            canvas.delete(item)
+        self._tiles.clear()
+        width, height = self.pyramid.size_at(zoom)
+        canvas.configure(scrollregion=(0, 0, width, height))
+        canvas.xview_moveto(max(0.0, (image_x * zoom - anchor[0]) / width))
+        canvas.yview_moveto(max(0.0, (image_y * zoom - anchor[1]) / height))
+        if self.on_zoom:
+            self.on_zoom(zoom)
+        self.schedule_redraw()
+
+    def schedule_redraw(self):
+        if self._redraw_job is None:
+            self._redraw_job = self.canvas.after_idle(self.redraw)
+
+    def redraw(self):
+        """Crea los mosaicos visibles que faltan y borra los que salieron de vista"""
+        self._redraw_job = None
+        canvas = self.canvas
+        viewport = (canvas.canvasx(0), canvas.canvasy(0),
+                    canvas.canvasx(canvas.winfo_width()), canvas.canvasy(canvas.winfo_height()))
+        visible = visible_tiles(self.pyramid.size_at(self.zoom), viewport)
+
+        for box in set(self._tiles) - set(visible):
+            canvas.delete(self._tiles.pop(box)[0])
+        for box in visible:
+            if box in self._tiles:
+                continue
+            photo = ImageTk.PhotoImage(self.pyramid.render(self.zoom, box))
+            item = canvas.create_image(box[0], box[1], anchor='nw', image=photo)
+            self._tiles[box] = (item, photo)
+
+    def _on_xscroll(self, first, last):
+        self.h_scroll.set(first, last)
+        self.schedule_redraw()
+
+    def _on_yscroll(self, first, last):
+        self.v_scroll.set(first, last)
+        self.schedule_redraw()
+
+    def _on_wheel(self, event):
+        # Se acumulan los pasos de la rueda y se aplica un solo zoom
+        if event.delta > 0 or event.num == 4:
+            self._pending_factor *= ZOOM_STEP
+        else:
+            self._pending_factor /= ZOOM_STEP
+        self._pending_anchor = (event.x, event.y)
+        if self._wheel_job is None:
+            self._wheel_job = self.canvas.after(WHEEL_COALESCE_MS, self._apply_wheel)
+
+    def _apply_wheel(self):
+        self._wheel_job = None
+        factor, self._pending_factor = self._pending_factor, 1.0
+        self.set_zoom(self.zoom * factor, self._pending_anchor)
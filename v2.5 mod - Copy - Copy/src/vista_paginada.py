@@ -0,0 +1,72 @@
+"""
+Treeview paginado: carga filas a medida que el usuario hace scroll
+
+Al abrir o filtrar solo se consulta la primera página; las siguientes se
+piden cuando la parte visible se acerca al final de lo ya cargado. Así el
+costo de abrir la pestaña no depende del tamaño del inventario.
+"""
+
+from base_datos import PAGE_SIZE
+
+# Cargar la siguiente página cuando lo visible pasa de esta fracción de lo cargado
+PREFETCH_FRACTION = 0.8
+
+
+class PagedTreeview:
+    """
+    Controla un ttk.Treeview alimentado por fetch_page.
+
+    fetch_page(*args, after=cursor, limit=n, cancel=None) debe devolver
+    (filas, cursor_siguiente), con cursor_siguiente None al final.
+    make_item(fila), si se pasa, devuelve los argumentos de tree.insert()
+    (por omisión la fila completa va en values).
+    """
+
+    def __init__(self, tree, scrollbar, fetch_page, page_size=PAGE_SIZE, make_item=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self.make_item = make_item or (lambda row: {'values': row})
+        self.args = ()
+        self.cursor = None
+        self._load_scheduled = False
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+    def fetch_first(self, *args, cancel=None):
+        """
+        Consulta la primera página. No toca el Treeview, así que puede
+        ejecutarse en un hilo de trabajo; el resultado se pasa a show_first().
+        """
+        rows, cursor = self.fetch_page(*args, after=None, limit=self.page_size, cancel=cancel)
+        return args, rows, cursor
+
+    def show_first(self, result):
+        """Reemplaza el contenido del Treeview con la primera página"""
+        self.args, rows, self.cursor = result
+        self.tree.delete(*self.tree.get_children())
+        self._insert(rows)
+        self.tree.yview_moveto(0)
+
+    def reload(self, *args):
+        """Recarga la primera página en el hilo actual"""
+        self.show_first(self.fetch_first(*args))
+
+    def load_more(self):
+        """Agrega la siguiente página al final"""
+        self._load_scheduled = False
+        if self.cursor is None:
+            return
+        rows, self.cursor = self.fetch_page(*self.args, after=self.cursor, limit=self.page_size)
+        self._insert(rows)
+
+    def _insert(self, rows):
+        for row in rows:
+            self.tree.insert('', 'end', **self.make_item(row))
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.cursor is not None and not self._load_scheduled and float(last) >= PREFETCH_FRACTION:
+            # after_idle: no insertar filas dentro del propio callback de scroll
+            self._load_scheduled = True
+            self.tree.after_idle(self.load_more)
@@ -0,0 +1,56 @@
+"""
+Tests para el análisis de mensajes del monitor de WhatsApp
+"""
+
+import unittest
+import os
+import sys
+
+# Agregar los directorios monitor y config al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'monitor'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'config'))
+
+import whatsapp_config as config
+from analizador import AnalizadorMensajes, Coincidencia, MARCA, PARTE, CLAVE, ANIO
+
+
+class TestAnalizadorMensajes(unittest.TestCase):
+    """Tests para AnalizadorMensajes"""
+
+    def setUp(self):
+        self.analizador = AnalizadorMensajes(
+            ['toyota', 'nissan', 'alfa romeo'] + config.MARCAS_ADICIONALES,
+            ['motor', 'faro'] + config.PARTES_COMUNES,
+            config.PALABRAS_CLAVE_BUSQUEDA)
+
+    def test_all_matches_with_positions(self):
+        """Test: Una pasada devuelve todas las coincidencias y sus posiciones"""
+        mensaje = 'Busco BOMBA DE AGUA y faros para Nissan Tsuru 2012'
+        self.assertEqual(self.analizador.coincidencias(mensaje), [
+            Coincidencia(CLAVE, 'busco', 0, 5),
+            Coincidencia(PARTE, 'bomba de agua', 6, 19),
+            Coincidencia(PARTE, 'faro', 22, 27),
+            Coincidencia(MARCA, 'nissan', 33, 39),
+            Coincidencia(ANIO, '2012', 46, 50),
+        ])
+
+    def test_analizar(self):
+        """Test: Marca, modelo, año y partes como en extraer_info_auto"""
+        info = self.analizador.analizar('¿Alguien tiene motor de arranque y batería de Alfa Romeo Giulia 2017?')
+        self.assertEqual(info['marca'], 'alfa romeo')
+        self.assertEqual(info['modelo'], 'Giulia')
+        self.assertEqual(info['año'], '2017')
+        self.assertEqual(info['nombre_parte'], 'motor de arranque')
+        self.assertEqual(info['partes'], ['motor de arranque', 'bateria'])
+        self.assertTrue(info['es_busqueda'])
+
+    def test_without_brand(self):
+        """Test: Sin marca no hay alerta; sin palabra clave no es búsqueda"""
+        self.assertIsNone(self.analizador.analizar('Busco radiador 2012'))
+        info = self.analizador.analizar('Ya llegó el Toyota')
+        self.assertFalse(info['es_busqueda'])
+        self.assertIsNone(info['modelo'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Tests para los índices de autocompletado
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from autocompletado import AutocompleteIndex, PrefixIndex
+from base_datos import InventoryRepository
+from tests.test_database import sample_part
+
+
+class TestPrefixIndex(unittest.TestCase):
+    """Tests para PrefixIndex"""
+
+    def test_complete_ignores_case_and_keeps_first_spelling(self):
+        """Test: Prefijos sin distinguir mayúsculas; duplicados por mayúsculas se descartan"""
+        index = PrefixIndex(['Tsuru', 'tiida', ' TSURU ', None, '', 'Sentra', 'Titan'])
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.complete('t'), ['tiida', 'Titan', 'Tsuru'])
+        self.assertEqual(index.complete('TI', limit=1), ['tiida'])
+        self.assertEqual(index.complete('x'), [])
+        self.assertEqual(index.complete(''), ['Sentra', 'tiida', 'Titan', 'Tsuru'])
+
+    def test_add_keeps_order(self):
+        """Test: add() inserta en su lugar y rechaza repetidos"""
+        index = PrefixIndex(['Jetta', 'Golf'])
+        self.assertTrue(index.add('Gol'))
+        self.assertFalse(index.add('golf'))
+        self.assertEqual(index.complete('gol'), ['Gol', 'Golf'])
+
+    def test_descending(self):
+        """Test: En orden inverso el límite conserva los más recientes"""
+        index = PrefixIndex([str(year) for year in range(1990, 2025)], descending=True)
+        self.assertEqual(index.complete('20', limit=3), ['2024', '2023', '2022'])
+        self.assertEqual(index.complete('199', limit=2), ['1999', '1998'])
+
+
+class TestAutocompleteIndex(unittest.TestCase):
+    """Tests para AutocompleteIndex sobre la base de datos"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo = InventoryRepository(os.path.join(self.tmp_dir, 'inventario.db'))
+        self.repo.init_schema()
+        self.repo.insert_part(sample_part('AP-1', modelo='Tsuru'))
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_build_and_add_part(self):
+        """Test: build() combina BD y predefinidos; add_part() actualiza sin consultar"""
+        index = AutocompleteIndex(self.repo, {'marca': ['Nissan', 'Ford'], 'modelo': ()})
+        self.assertEqual(index.complete('modelo'), [])
+        index.build()
+        self.assertEqual(index.complete('marca'), ['Ford', 'Nissan'])
+        self.assertEqual(index.complete('modelo', 'ts'), ['Tsuru'])
+        index.add_part({'marca': 'Fiat', 'modelo': 'Uno'})
+        self.assertEqual(index.suggester('marca')('f'), ['Fiat', 'Ford'])
+        self.assertEqual(index.complete('modelo', 'u'), ['Uno'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+"""
+Tests para la búsqueda de texto completo (FTS5)
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import busqueda
+from base_datos import InventoryRepository
+from tests.test_database import sample_part
+
+
+class TestMatchQueries(unittest.TestCase):
+    """Tests para la construcción de consultas MATCH"""
+
+    def test_normalize_text(self):
+        self.assertEqual(busqueda.normalize_text('Batería ÁRBOL'), 'bateria arbol')
+
+    def test_build_match_query(self):
+        self.assertEqual(busqueda.build_match_query('AP-2025 "x'), '"ap"* "2025"* "x"*')
+        self.assertIsNone(busqueda.build_match_query('  -- '))
+
+    def test_build_any_query_with_columns(self):
+        query = busqueda.build_any_query(['Ford', None, 'ford'], columns=('marca',))
+        self.assertEqual(query, '{marca} : ("ford"*)')
+
+
+class TestFullTextSearch(unittest.TestCase):
+    """Tests para la búsqueda del inventario sobre piezas_fts"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo = InventoryRepository(os.path.join(self.tmp_dir, 'inventario.db'))
+        self.repo.init_schema()
+        self.repo.insert_part(sample_part('AP-1', nombre='Batería', marca='Ford', modelo='Focus',
+                                          categoria='Electrico'))
+        self.repo.insert_part(sample_part('AP-2', nombre='Radiador', marca='Ford', modelo='Fiesta',
+                                          anio='2015', categoria='Refrigeracion'))
+        self.repo.insert_part(sample_part('AP-3', nombre='Faro', marca='Nissan', modelo='Sentra',
+                                          categoria='Electrico'))
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def stocks(self, rows):
+        return [row[0] for row in rows]
+
+    def test_accent_folding_and_prefix(self):
+        """Test: 'bateria' encuentra 'Batería' y las palabras a medio escribir coinciden"""
+        self.assertEqual(self.stocks(self.repo.list_parts('bateria')), ['AP-1'])
+        self.assertEqual(self.stocks(self.repo.list_parts('BATER')), ['AP-1'])
+        self.assertEqual(sorted(self.stocks(self.repo.list_parts('ford fi'))), ['AP-2'])
+
+    def test_search_with_category(self):
+        """Test: La búsqueda respeta el filtro de categoría"""
+        self.assertEqual(self.stocks(self.repo.list_parts('ford', 'Refrigeracion')), ['AP-2'])
+
+    def test_triggers_keep_index_in_sync(self):
+        """Test: Actualizar o eliminar piezas actualiza el índice"""
+        self.repo.execute("UPDATE piezas SET nombre = 'Alternador' WHERE id = 'AP-3'")
+        self.assertEqual(self.stocks(self.repo.list_parts('faro')), [])
+        self.assertEqual(self.stocks(self.repo.list_parts('alternador')), ['AP-3'])
+
+        self.repo.delete_part('AP-3')
+        self.assertEqual(self.stocks(self.repo.list_parts('alternador')), [])
+
+    def test_alert_search_ranks_best_match_first(self):
+        """Test: La pieza que coincide en más criterios aparece primero"""
+        self.repo.insert_part(sample_part('AP-4', nombre='Radiador', marca='Ford', modelo='Focus',
+                                          anio='2015'))
+        rows = self.repo.search_parts_for_alert('ford', 'fiesta', '2015', 'radiador')
+        self.assertEqual(self.stocks(rows), ['AP-2', 'AP-4'])
+        # marca + modelo + año + parte; marca + año + parte
+        self.assertEqual([row[-1] for row in rows], [8, 5])
+        self.assertEqual(self.stocks(self.repo.search_parts_by_brand('nissan')), ['AP-3'])
+
+
+class TestAlertScoring(unittest.TestCase):
+    """Tests para la puntuación de piezas en las alertas del monitor"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo = InventoryRepository(os.path.join(self.tmp_dir, 'inventario.db'))
+        self.repo.init_schema()
+        self.repo.insert_part(sample_part('AP-1', nombre='Faro delantero', marca='Nissan',
+                                          modelo='Tsuru III', anio='1992-2017'))
+        self.repo.insert_part(sample_part('AP-2', nombre='Radiador', marca='Nissan', modelo='Tsuru',
+                                          anio='2012'))
+        self.repo.insert_part(sample_part('AP-3', nombre='Farol', marca='Nissan', modelo='Sentra',
+                                          anio='2015'))
+        self.repo.insert_part(sample_part('AP-4', nombre='Faro', marca='Ford', modelo='Focus'))
+        self.repo.insert_part(sample_part('AP-5', nombre='Capó', marca='VOLKSWAGEN', modelo='Jetta A4',
+                                          anio='2005'))
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def search(self, *args, **kwargs):
+        return [(row[0], row[-1]) for row in self.repo.search_parts_for_alert(*args, **kwargs)]
+
+    def test_normalized_columns(self):
+        """Test: Las columnas generadas pliegan mayúsculas, acentos y rangos de años"""
+        rows = self.repo.fetchall('SELECT stock_number, marca_norm, modelo_norm, anio_desde, anio_hasta '
+                                  'FROM piezas ORDER BY stock_number')
+        self.assertEqual(rows[0], ('AP-1', 'nissan', 'tsuru iii', 1992, 2017))
+        self.assertEqual(rows[4], ('AP-5', 'volkswagen', 'jetta a4', 2005, 2005))
+        self.assertEqual(busqueda.fold_key(' CITROËN Cámara'), 'citroen camara')
+        self.assertEqual(self.repo.fetchone(f"SELECT {busqueda.sql_fold('?')}", (' CITROËN Cámara',))[0],
+                         'citroen camara')
+
+    def test_score_by_model_year_and_part(self):
+        """Test: Modelo por prefijo, año dentro del rango y parte suman puntos"""
+        self.assertEqual(self.search('nissan', 'Tsuru 2010', '2010', 'faro'),
+                         [('AP-1', 8), ('AP-3', 4), ('AP-2', 4)])
+
+    def test_other_brands_never_match(self):
+        """Test: Una pieza con el mismo nombre de otra marca no es candidata"""
+        self.assertNotIn('AP-4', [stock for stock, _ in self.search('nissan', None, None, 'faro')])
+
+    def test_brand_aliases_and_synonyms(self):
+        """Test: 'vw' encuentra Volkswagen y 'cofre' encuentra 'Capó'"""
+        self.assertEqual(self.search('vw', None, None, 'cofre'), [('AP-5', 4)])
+
+    def test_min_score_skips_brand_only_matches(self):
+        """Test: Con puntaje mínimo, mencionar solo la marca no devuelve piezas"""
+        self.assertEqual(len(self.search('nissan')), 3)
+        self.assertEqual(self.search('nissan', min_score=4), [])
+        self.assertEqual(self.search('nissan', 'March', None, None, min_score=4), [])
+
+
+
+class TestFitments(unittest.TestCase):
+    """Tests para las tablas marcas, modelos y aplicaciones"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo = InventoryRepository(os.path.join(self.tmp_dir, 'inventario.db'))
+        self.repo.init_schema()
+        self.repo.insert_part(sample_part('AP-1', nombre='Faro', marca='Ford', modelo='Focus',
+                                          anio='2012-2017'))
+        self.repo.insert_parts_bulk([
+            sample_part('AP-2', marca='NISSAN', modelo='tsuru', anio='2010'),
+            sample_part('AP-3', marca='Nissan', modelo='Sentra', anio='Varios'),
+        ])
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def fitments(self):
+        return self.repo.fetchall(
+            'SELECT a.pieza_id, m.clave, mo.clave, a.anio_desde, a.anio_hasta FROM aplicaciones a '
+            'JOIN marcas m ON m.id = a.marca_id LEFT JOIN modelos mo ON mo.id = a.modelo_id '
+            'ORDER BY a.pieza_id')
+
+    def test_insert_and_import_fill_fitments(self):
+        """Test: Guardar e importar piezas llenan aplicaciones con marca y modelo canónicos"""
+        self.assertEqual(self.fitments(), [('AP-1', 'ford', 'focus', 2012, 2017),
+                                           ('AP-2', 'nissan', 'tsuru', 2010, 2010),
+                                           ('AP-3', 'nissan', 'sentra', None, None)])
+        self.assertEqual(self.repo.fetchall('SELECT clave FROM marcas ORDER BY clave'),
+                         [('ford',), ('nissan',)])
+
+    def test_update_and_delete_keep_fitments_in_sync(self):
+        """Test: Editar o borrar la pieza actualiza sus aplicaciones"""
+        with self.repo.transaction() as conn:
+            conn.execute("UPDATE piezas SET modelo = 'Fiesta', anio = '2015' WHERE id = 'AP-1'")
+        self.assertEqual(self.fitments()[0], ('AP-1', 'ford', 'fiesta', 2015, 2015))
+
+        self.repo.delete_part('AP-2')
+        self.assertEqual([row[0] for row in self.fitments()], ['AP-1', 'AP-3'])
+
+    def test_brand_aliases_share_canonical_brand(self):
+        """Test: 'VW' y 'Volkswagen' son la misma marca, y la alerta la encuentra con cualquiera"""
+        self.repo.insert_part(sample_part('AP-4', nombre='Faro', marca='VW', modelo='Jetta', anio='2015'))
+        self.repo.insert_parts_bulk([
+            sample_part('AP-5', nombre='Faro', marca='Volkswagen', modelo='JETTA', anio='2016'),
+            sample_part('AP-6', nombre='Capó', marca='Chevy', modelo='Aveo', anio='2010'),
+        ])
+        self.assertEqual(self.repo.fetchall("SELECT clave FROM marcas WHERE clave IN ('vw', 'volkswagen')"),
+                         [('volkswagen',)])
+        self.assertEqual(self.repo.fetchone("SELECT COUNT(*) FROM modelos WHERE clave = 'jetta'")[0], 1)
+
+        found = [row[0] for row in self.repo.search_parts_for_alert('volkswagen', 'jetta', '2015', 'faro')]
+        self.assertEqual(found, ['AP-4', 'AP-5'])
+        self.assertEqual([row[0] for row in self.repo.search_parts_for_alert('chevrolet', None, None, 'cofre')],
+                         ['AP-6'])
+
+    def test_failed_bulk_insert_keeps_fitment_trigger(self):
+        """Test: Después de un lote fallido, las piezas nuevas siguen llegando a aplicaciones"""
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.repo.insert_parts_bulk([sample_part('AP-9'), sample_part('AP-9')])
+        self.repo.insert_part(sample_part('AP-9', marca='Ford', modelo='Ka', anio='2005'))
+        self.assertEqual(self.fitments()[-1], ('AP-9', 'ford', 'ka', 2005, 2005))
+
+    def test_search_year_inside_range(self):
+        """Test: 'ford 2015' en el buscador encuentra una pieza para 2012-2017"""
+        self.assertEqual(busqueda.split_years('Ford 2015 faro'), ('ford faro', [2015]))
+        self.assertEqual([row[0] for row in self.repo.list_parts('ford 2015')], ['AP-1'])
+        self.assertEqual(self.repo.list_parts('ford 2019'), [])
+        # 'Varios' no es un rango: la pieza sirve para cualquier año
+        self.assertEqual([row[0] for row in self.repo.list_parts_page('2010')[0]], ['AP-3', 'AP-2'])
+        self.assertEqual([row[0] for row in self.repo.list_parts('nissan 2016')], ['AP-3'])
+        self.assertEqual(len(list(self.repo.iter_parts_export('ford 2016'))), 1)
+
+        # La fecha del stock number no cuenta como año del vehículo
+        self.repo.insert_part(sample_part('AP-20150101-000001', marca='Ford', anio='2020'))
+        self.assertEqual([row[0] for row in self.repo.list_parts('ford 2015')], ['AP-1'])
+        self.assertEqual([row[0] for row in self.repo.list_parts_page('2015')[0]], ['AP-3', 'AP-1'])
+
+        # Sin marca no hay aplicación: el año se busca como texto en anio
+        self.repo.insert_part(sample_part('AP-7', marca='', anio='2015'))
+        self.assertIn('AP-7', [row[0] for row in self.repo.list_parts('2015')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Tests para la captura de mensajes con MutationObserver
+"""
+
+import unittest
+import os
+import sys
+
+# Agregar el directorio monitor al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'monitor'))
+
+import captura
+from captura import CapturaMensajes
+
+
+class FakeDriver:
+    """Sustituto del WebDriver: simula la cola y el estado de la página"""
+
+    def __init__(self):
+        self.instalado = False
+        self.cola = []
+        self.visibles = []
+        self.llamadas = []
+
+    def execute_script(self, script, *args):
+        self.llamadas.append((script, args))
+        if script == captura.JS_INSTALAR:
+            nuevo = not self.instalado
+            self.instalado = True
+            return nuevo
+        if script == captura.JS_LEER_MENSAJES:
+            selectores, limite = args
+            return self.visibles[-limite:]
+        if script == captura.JS_VACIAR:
+            if not self.instalado:
+                return None
+            cola, self.cola = self.cola, []
+            return cola
+        raise AssertionError("Script inesperado")
+
+
+class TestCapturaMensajes(unittest.TestCase):
+    """Tests para CapturaMensajes"""
+
+    def test_drain_in_one_call(self):
+        """Test: La cola completa se obtiene con una sola llamada"""
+        driver = FakeDriver()
+        captura_mensajes = CapturaMensajes(driver)
+        captura_mensajes.instalar()
+        captura_mensajes.instalar()
+        self.assertEqual(captura_mensajes.instalaciones, 1)
+        self.assertEqual(driver.llamadas[0][1], (captura.SELECTOR_MENSAJE, captura.SELECTOR_TITULO_CHAT,
+                                                 captura.SELECTOR_LISTA_CHATS))
+
+        eventos = [{'tipo': 'mensaje', 'chat': 'Prueba partes', 'texto': 'Busco faro Jetta'},
+                   {'tipo': 'chat', 'chat': 'Otro', 'texto': None}]
+        driver.cola = list(eventos)
+        driver.llamadas.clear()
+        self.assertEqual(captura_mensajes.vaciar(), eventos)
+        self.assertEqual(captura_mensajes.vaciar(), [])
+        self.assertEqual(len(driver.llamadas), 2)
+
+    def test_reinstall_after_reload(self):
+        """Test: Si la página se recargó, el observador se vuelve a instalar"""
+        driver = FakeDriver()
+        captura_mensajes = CapturaMensajes(driver)
+        self.assertEqual(captura_mensajes.vaciar(), [])
+        self.assertTrue(driver.instalado)
+        self.assertEqual(captura_mensajes.instalaciones, 1)
+
+    def test_leer_mensajes_in_one_call(self):
+        """Test: Los mensajes visibles se leen con una sola llamada"""
+        driver = FakeDriver()
+        driver.visibles = [{'id': f'false_1@g.us_{i}', 'autor': 'Juan', 'hora': '10:32, 18/10/2026',
+                            'texto': f'mensaje {i}'} for i in range(40)]
+        mensajes = captura.leer_mensajes(driver, limite=30)
+        self.assertEqual((len(mensajes), mensajes[0]['id']), (30, 'false_1@g.us_10'))
+        self.assertEqual(len(driver.llamadas), 1)
+        self.assertEqual(driver.llamadas[0][1][0], [captura.SELECTOR_MENSAJE,
+                                                    captura.SELECTOR_MENSAJE_ALTERNATIVO])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,10 +7,36 @@ import unittest
 import sqlite3
 import os
 import sys
+import shutil
+import tempfile
+import threading
 
 # Agregar el directorio src al path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+from base_datos import InventoryRepository
+
+
+def sample_part(stock_number, **overrides):
+    """Pieza de ejemplo con todos los campos obligatorios"""
+    part = {
+        'id': stock_number,
+        'stock_number': stock_number,
+        'nombre': 'Radiador',
+        'marca': 'Nissan',
+        'modelo': 'Tsuru',
+        'anio': '2012',
+        'categoria': 'Refrigeracion',
+        'condicion': 'Usada - Buena',
+        'precio': 800.0,
+        'estante': 'A',
+        'nivel': 1,
+        'ubicacion': 'A-1',
+        'fecha_ingreso': '2025-11-13T00:00:00',
+    }
+    part.update(overrides)
+    return part
+
 
 class TestDatabase(unittest.TestCase):
     """Tests para la base de datos"""
@@ -43,11 +69,203 @@ class TestDatabase(unittest.TestCase):
         
         self.assertTrue(os.path.exists(self.test_db))
     
-    # TODO: Agregar más tests
-    # - Test de inserción de piezas
-    # - Test de inserción de vehículos
-    # - Test de consultas
-    # - Test de eliminación
+
+
+class TestInventoryRepository(unittest.TestCase):
+    """Tests para la capa de acceso a datos"""
+    
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo = InventoryRepository(os.path.join(self.tmp_dir, 'inventario.db'))
+        self.repo.init_schema()
+    
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+    
+    def test_wal_mode_and_pragmas(self):
+        """Test: Las conexiones del pool usan WAL y los pragmas de rendimiento"""
+        with self.repo.pool.connection() as conn:
+            self.assertEqual(conn.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+            self.assertEqual(conn.execute('PRAGMA synchronous').fetchone()[0], 1)  # NORMAL
+            self.assertEqual(conn.execute('PRAGMA temp_store').fetchone()[0], 2)   # MEMORY
+    
+    def test_insert_and_delete_part(self):
+        """Test: Inserción de piezas con imágenes y eliminación"""
+        self.repo.insert_part(sample_part('AP-1'), images=[b'aaa', b'bbb'])
+        self.assertEqual(self.repo.get_part('AP-1')[2], 'Radiador')
+        hashes = self.repo.get_part_images('AP-1')
+        self.assertEqual([self.repo.images.read(h) for h in hashes], [b'aaa', b'bbb'])
+        
+        self.repo.delete_part('AP-1')
+        self.assertIsNone(self.repo.get_part('AP-1'))
+        self.assertEqual(self.repo.get_part_images('AP-1'), [])
+        self.assertFalse(any(self.repo.images.exists(h) for h in hashes))
+    
+    def test_shared_image_survives_delete(self):
+        """Test: Una foto repetida se guarda una vez y no se borra mientras otra pieza la use"""
+        self.repo.insert_part(sample_part('AP-1'), images=[b'foto'])
+        self.repo.insert_part(sample_part('AP-2'), images=[b'foto'])
+        sha256 = self.repo.get_part_images('AP-1')[0]
+        self.assertEqual(self.repo.get_part_images('AP-2'), [sha256])
+        
+        self.repo.delete_part('AP-1')
+        self.assertTrue(self.repo.images.exists(sha256))
+        self.repo.delete_part('AP-2')
+        self.assertFalse(self.repo.images.exists(sha256))
+    
+    def test_thumbnails_stored_and_tracked(self):
+        """Test: Las miniaturas se guardan con la pieza y las faltantes quedan pendientes"""
+        self.repo.insert_part(sample_part('AP-1'), images=[b'aaa', b'bbb'], thumbnails=[b'mini-a'])
+        sha_a, sha_b = self.repo.get_part_images('AP-1')
+        with open(self.repo.images.thumbnail_path(sha_a), 'rb') as f:
+            self.assertEqual(f.read(), b'mini-a')
+        self.assertEqual(self.repo.images_without_thumbnail(), [sha_b])
+
+        self.repo.mark_thumbnail(sha_b, status=-1)
+        self.assertEqual(self.repo.images_without_thumbnail(), [])
+
+        self.repo.delete_part('AP-1')
+        self.assertFalse(os.path.exists(self.repo.images.thumbnail_path(sha_a)))
+
+    def test_failed_insert_rolls_back(self):
+        """Test: Un error dentro de la transacción no deja datos a medias"""
+        self.repo.insert_part(sample_part('AP-1'))
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.repo.insert_part(sample_part('AP-1'), images=[b'aaa'])
+        self.assertEqual(self.repo.get_part_images('AP-1'), [])
+    
+    def test_vehicle_parts(self):
+        """Test: Vehículos, conteo de piezas y eliminación sin borrar piezas"""
+        self.repo.insert_vehicle({'id': 'VEH-1', 'marca': 'Nissan', 'modelo': 'Tsuru',
+                                  'anio': '2012', 'vin': 'X'})
+        self.repo.insert_part(sample_part('AP-1', vehiculo_id='VEH-1'))
+        self.assertEqual(self.repo.count_vehicle_parts('VEH-1'), 1)
+        
+        self.repo.delete_vehicle('VEH-1')
+        self.assertEqual(self.repo.list_vehicles(), [])
+        self.assertIsNone(self.repo.get_part('AP-1')[14])
+    
+    def test_list_vehicles_page_counts_parts(self):
+        """Test: Cada página trae los vehículos con su conteo de piezas"""
+        for i in range(5):
+            self.repo.insert_vehicle({'id': f'VEH-{i}', 'marca': 'Nissan', 'modelo': 'Tsuru',
+                                      'anio': '2012', 'vin': f'V{i}'})
+        self.repo.insert_part(sample_part('AP-1', vehiculo_id='VEH-1'))
+        self.repo.insert_part(sample_part('AP-2', vehiculo_id='VEH-1'))
+        self.repo.insert_part(sample_part('AP-3', vehiculo_id='VEH-3'))
+        
+        rows, cursor = self.repo.list_vehicles_page(limit=2)
+        pages = [rows]
+        while cursor is not None:
+            rows, cursor = self.repo.list_vehicles_page(after=cursor, limit=2)
+            pages.append(rows)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        counts = {row[0]: row[-1] for page in pages for row in page}
+        self.assertEqual(counts, {'VEH-0': 0, 'VEH-1': 2, 'VEH-2': 0, 'VEH-3': 1, 'VEH-4': 0})
+    
+    def test_list_parts_filters(self):
+        """Test: Búsqueda y filtro por categoría"""
+        self.repo.insert_part(sample_part('AP-1'))
+        self.repo.insert_part(sample_part('AP-2', nombre='Alternador', categoria='Electrico'))
+        self.assertEqual([r[0] for r in self.repo.list_parts('alter')], ['AP-2'])
+        self.assertEqual([r[0] for r in self.repo.list_parts(category='Refrigeracion')], ['AP-1'])
+    
+    def test_list_parts_page_keyset(self):
+        """Test: La paginación por llave recorre todo sin repetir, aun con fechas iguales"""
+        for i in range(7):
+            self.repo.insert_part(sample_part(f'AP-{i}', fecha_ingreso=f'2025-11-1{i // 3}',
+                                              categoria='Motor' if i % 2 else 'Frenos'))
+        seen, cursor = [], None
+        while True:
+            rows, cursor = self.repo.list_parts_page(after=cursor, limit=2)
+            seen.extend(row[0] for row in rows)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [row[0] for row in self.repo.list_parts()])
+        self.assertEqual(len(set(seen)), 7)
+        
+        rows, cursor = self.repo.list_parts_page(category='Motor', limit=10)
+        self.assertEqual(sorted(row[0] for row in rows), ['AP-1', 'AP-3', 'AP-5'])
+        self.assertIsNone(cursor)
+        
+        rows, cursor = self.repo.list_parts_page('radiador', limit=5)
+        self.assertEqual((len(rows), cursor), (5, 5))
+        rows, cursor = self.repo.list_parts_page('radiador', after=cursor, limit=5)
+        self.assertEqual((len(rows), cursor), (2, None))
+
+        # Las piezas sin fecha de ingreso también aparecen, al final
+        for i in range(7, 10):
+            self.repo.insert_part(sample_part(f'AP-{i}', fecha_ingreso=None))
+        seen, cursor = [], None
+        while True:
+            rows, cursor = self.repo.list_parts_page(after=cursor, limit=2)
+            seen.extend(row[0] for row in rows)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [row[0] for row in self.repo.list_parts()])
+        self.assertEqual(seen[-3:], ['AP-9', 'AP-8', 'AP-7'])
+    
+    def test_readers_do_not_block_on_writer(self):
+        """Test: Con WAL se puede leer mientras otra conexión tiene una escritura abierta"""
+        self.repo.insert_part(sample_part('AP-1'))
+        with self.repo.transaction() as conn:
+            conn.execute('UPDATE piezas SET precio = 1 WHERE id = ?', ('AP-1',))
+            result = []
+            reader = threading.Thread(target=lambda: result.append(self.repo.get_part('AP-1')))
+            reader.start()
+            reader.join(timeout=2)
+            self.assertEqual(result[0][10], 800.0)
+
+    def test_dashboard_stats_follow_writes(self):
+        """Test: Los totales del dashboard se actualizan con cada inserción, cambio y borrado"""
+        self.repo.insert_part(sample_part('AP-1', precio=100.0))
+        self.repo.insert_part(sample_part('AP-2', precio=50.5, categoria='Motor'))
+        self.repo.insert_vehicle({'id': 'VEH-1', 'marca': 'Ford', 'modelo': 'Focus', 'anio': '2010', 'vin': 'V'})
+        self.assertEqual(self.repo.dashboard_stats(), {
+            'total_piezas': 2, 'total_categorias': 2, 'total_vehiculos': 1, 'valor_total': 150.5})
+
+        self.repo.execute("UPDATE piezas SET categoria = 'Motor', precio = 10 WHERE id = 'AP-1'")
+        stats = self.repo.dashboard_stats()
+        self.assertEqual((stats['total_categorias'], stats['valor_total']), (1, 60.5))
+
+        self.repo.delete_part('AP-1')
+        self.repo.delete_part('AP-2')
+        self.repo.delete_vehicle('VEH-1')
+        self.assertEqual(self.repo.dashboard_stats(), {
+            'total_piezas': 0, 'total_categorias': 0, 'total_vehiculos': 0, 'valor_total': 0})
+
+    def test_dashboard_stats_after_failed_bulk_insert(self):
+        """Test: Un lote masivo fallido no deja los totales sin triggers"""
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.repo.insert_parts_bulk([sample_part('AP-1'), sample_part('AP-1')])
+        self.assertEqual(self.repo.dashboard_stats()['total_piezas'], 0)
+
+        self.repo.insert_part(sample_part('AP-1', precio=100.0))
+        self.repo.insert_parts_bulk([sample_part('AP-2', precio=50.0)])
+        stats = self.repo.dashboard_stats()
+        self.assertEqual((stats['total_piezas'], stats['valor_total']), (2, 150.0))
+
+    def test_reserve_ids_unique_and_sortable(self):
+        """Test: Los IDs son consecutivos por día y no se repiten entre hilos ni repositorios"""
+        block = self.repo.reserve_ids('AP', 3, day='20251113')
+        self.assertEqual(block, ['AP-20251113-000001', 'AP-20251113-000002', 'AP-20251113-000003'])
+        self.assertEqual(self.repo.reserve_ids('AP', day='20251114'), ['AP-20251114-000001'])
+
+        # Otro proceso (otro repositorio sobre el mismo archivo) comparte la secuencia
+        other = InventoryRepository(self.repo.db_path)
+        ids = []
+        workers = [threading.Thread(target=lambda r=repo: ids.extend(
+                       r.reserve_ids('AP', 50, day='20251113')))
+                   for repo in (self.repo, other) * 4]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        other.close()
+        self.assertEqual(len(set(ids)), 400)
+        self.assertEqual(max(ids), 'AP-20251113-000403')
+        self.assertTrue(self.repo.next_vehicle_id().startswith('VEH-'))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,49 @@
+"""
+Tests para las esperas explícitas del monitor
+"""
+
+import unittest
+import os
+import sys
+
+# Agregar el directorio monitor al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'monitor'))
+
+try:
+    import esperas
+    from selenium.common.exceptions import TimeoutException
+except ImportError:
+    esperas = None  # Requiere selenium
+
+
+@unittest.skipIf(esperas is None, "Requiere selenium")
+class TestEsperas(unittest.TestCase):
+    """Tests para Esperas y MetricasPasos"""
+
+    def test_wait_returns_as_soon_as_ready(self):
+        """Test: hasta() devuelve en cuanto la condición se cumple y mide el paso"""
+        llamadas = []
+
+        def lista(driver):
+            llamadas.append(driver)
+            return 'elemento' if len(llamadas) == 3 else False
+
+        espera = esperas.Esperas(object(), timeout=5, intervalo=0.01)
+        self.assertEqual(espera.hasta('buscador', lista), 'elemento')
+        self.assertEqual(len(llamadas), 3)
+        datos = espera.metricas.pasos['buscador']
+        self.assertEqual((datos['veces'], datos['timeouts']), (1, 0))
+        self.assertLess(datos['maximo'], 1)
+
+    def test_timeout_is_counted(self):
+        """Test: Un timeout se registra; intentar() devuelve None"""
+        espera = esperas.Esperas(object(), timeout=0.05, intervalo=0.01)
+        with self.assertRaises(TimeoutException):
+            espera.hasta('envio', lambda driver: False)
+        self.assertIsNone(espera.intentar('envio', lambda driver: False))
+        self.assertEqual(espera.metricas.pasos['envio']['timeouts'], 2)
+        self.assertIn('2 timeout(s)', espera.metricas.resumen()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
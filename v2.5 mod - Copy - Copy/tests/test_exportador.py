@@ -0,0 +1,79 @@
+"""
+Tests para la exportación del inventario
+"""
+
+import unittest
+import csv
+import json
+import os
+import sys
+import shutil
+import tempfile
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import exportador
+from base_datos import InventoryRepository
+from tests.test_database import sample_part
+
+
+class TestExportador(unittest.TestCase):
+    """Tests para export_parts"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo = InventoryRepository(os.path.join(self.tmp_dir, 'inventario.db'))
+        self.repo.init_schema()
+        self.repo.insert_vehicle({'id': 'VEH-1', 'marca': 'Nissan', 'modelo': 'Tsuru',
+                                  'anio': '2012', 'vin': 'VIN1'})
+        self.repo.insert_part(sample_part('AP-1', vehiculo_id='VEH-1'), images=[b'a', b'b'])
+        self.repo.insert_part(sample_part('AP-2', nombre='Alternador', categoria='Electrico',
+                                          fecha_ingreso='2025-11-14T00:00:00'))
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_csv_export_in_chunks(self):
+        """Test: CSV con datos del vehículo, en bloques pequeños, más recientes primero"""
+        path = os.path.join(self.tmp_dir, 'inventario.csv')
+        progress = []
+        written = exportador.export_parts(self.repo, path, chunk_size=1, on_progress=progress.append)
+        self.assertEqual((written, progress), (2, [1, 2]))
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([row['stock_number'] for row in rows], ['AP-2', 'AP-1'])
+        self.assertEqual(rows[1]['vehiculo_vin'], 'VIN1')
+        self.assertNotIn('imagenes', rows[0])
+        # La conexión volvió al pool
+        self.assertEqual(self.repo.pool._idle.qsize(), self.repo.pool._created)
+
+    def test_jsonl_export_with_filters_and_images(self):
+        """Test: JSON Lines respeta búsqueda y categoría e incluye las fotos"""
+        path = os.path.join(self.tmp_dir, 'inventario.jsonl')
+        written = exportador.export_parts(self.repo, path, search='radi', category='Refrigeracion',
+                                          include_images=True)
+        self.assertEqual(written, 1)
+        with open(path, encoding='utf-8') as f:
+            record = json.loads(f.readline())
+        self.assertEqual(record['stock_number'], 'AP-1')
+        self.assertEqual(record['imagenes'], self.repo.get_part_images('AP-1'))
+
+    @unittest.skipIf(exportador.pa is None, "Requiere pyarrow")
+    def test_parquet_export(self):
+        """Test: Parquet con un row group por bloque y tipos numéricos"""
+        path = os.path.join(self.tmp_dir, 'inventario.parquet')
+        exportador.export_parts(self.repo, path, chunk_size=1)
+        parquet = exportador.pq.ParquetFile(path)
+        self.assertEqual(parquet.num_row_groups, 2)
+        self.assertEqual(parquet.read().column('precio').to_pylist(), [800.0, 800.0])
+
+    def test_unknown_extension(self):
+        """Test: Una extensión desconocida se rechaza antes de consultar"""
+        with self.assertRaises(ValueError):
+            exportador.export_parts(self.repo, os.path.join(self.tmp_dir, 'x.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
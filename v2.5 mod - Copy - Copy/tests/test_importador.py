@@ -0,0 +1,140 @@
+"""
+Tests para la importación masiva desde CSV
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import importador
+from base_datos import BULK_INSERT_CATCHUP, InventoryRepository
+from tests.test_database import sample_part
+
+
+class TestImportador(unittest.TestCase):
+    """Tests para import_parts e import_vehicles"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.repo = InventoryRepository(os.path.join(self.tmp_dir, 'inventario.db'))
+        self.repo.init_schema()
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def write_csv(self, text):
+        path = os.path.join(self.tmp_dir, 'datos.csv')
+        with open(path, 'w', encoding='utf-8-sig') as f:
+            f.write(text)
+        return path
+
+    def test_import_parts_validates_and_reports_rows(self):
+        """Test: Filas válidas se insertan y las inválidas se reportan con su línea"""
+        self.repo.insert_part(sample_part('AP-EXISTE'))
+        path = self.write_csv(
+            'Nombre;Marca;Modelo;Año;Categoría;Condición;Estante;Nivel;Precio;Stock\n'
+            'Radiador;Nissan;Tsuru;2012;refrigeracion;Nueva;b;2;$1,200;\n'
+            'Alternador;Ford;Focus;2010;Motor;;;;;\n'
+            'Faro;VW;Jetta;2015;Luces;Nueva;A;1;;\n'
+            'Puerta;VW;Jetta;2015;Carroceria;Nueva;A;1;abc;\n'
+            'Capo;VW;Jetta;2015;Carroceria;Nueva;A;1;;AP-EXISTE\n'
+            ';;;;;;;;;\n'
+            'Espejo;VW;;2015;Carroceria;Nueva;A;1;;\n'
+        )
+        result = importador.import_parts(self.repo, path, batch_size=2)
+
+        self.assertEqual(result.rows, 6)
+        self.assertEqual(result.inserted, 2)
+        self.assertEqual([error.line for error in result.errors], [4, 5, 6, 8])
+        self.assertIn('categoria', result.errors[0].message)
+        self.assertIn('Falta modelo', result.errors[3].message)
+
+        radiador = self.repo.fetchone(
+            "SELECT stock_number, categoria, estante, nivel, ubicacion, precio FROM piezas "
+            "WHERE nombre = 'Radiador' AND id != 'AP-EXISTE'")
+        self.assertRegex(radiador[0], r'^AP-\d{8}-\d{6}$')
+        self.assertEqual(radiador[1:], ('Refrigeracion', 'B', 2, 'B-2', 1200.0))
+        # Los vacíos toman los valores por defecto de la ventana Agregar Pieza
+        alternador = self.repo.fetchone(
+            "SELECT condicion, ubicacion FROM piezas WHERE nombre = 'Alternador'")
+        self.assertEqual(alternador, ('Usada - Buena', 'A-1'))
+        # Las piezas importadas se indexan para el buscador y el trigger sigue activo
+        self.assertEqual(len(self.repo.list_parts('radiador')), 2)
+        self.repo.insert_part(sample_part('AP-NUEVA', nombre='Radiador'))
+        self.assertEqual(len(self.repo.list_parts('radiador')), 3)
+        # Los totales del dashboard incluyen el lote
+        stats = self.repo.dashboard_stats()
+        self.assertEqual((stats['total_piezas'], stats['valor_total']), (4, 2800.0))
+
+    def test_failed_batch_keeps_triggers_and_reports_rows(self):
+        """Test: Un lote que choca con la base se revisa fila por fila sin perder los triggers"""
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.repo.insert_parts_bulk([sample_part('AP-1'), sample_part('AP-1')])
+        triggers = {row[0] for row in self.repo.fetchall("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+        self.assertTrue(set(BULK_INSERT_CATCHUP) <= triggers)
+        self.assertEqual(self.repo.dashboard_stats()['total_piezas'], 0)
+
+        # Un ID ya usado por otra pieza (otro stock_number) solo se detecta al insertar
+        self.repo.insert_part(sample_part('AP-OTRO', id='AP-OCUPADO'))
+        path = self.write_csv('nombre,marca,modelo,anio,categoria,stock_number\n'
+                              'Radiador,Nissan,Tsuru,2012,Motor,AP-OCUPADO\n'
+                              'Faro,Ford,Focus,2015,Electrico,AP-LIBRE\n')
+        result = importador.import_parts(self.repo, path)
+        self.assertEqual(result.inserted, 1)
+        self.assertEqual([error.line for error in result.errors], [2])
+        self.assertEqual(len(self.repo.list_parts('faro')), 1)
+        self.assertEqual(self.repo.dashboard_stats()['total_piezas'], 2)
+
+    def test_file_stock_numbers_advance_sequence(self):
+        """Test: Los stock numbers con formato generado que trae el archivo no se vuelven a reservar"""
+        day = '20251113'
+        path = self.write_csv('nombre,marca,modelo,anio,categoria,stock_number\n'
+                              f'Radiador,Nissan,Tsuru,2012,Motor,AP-{day}-000001\n'
+                              f'Faro,Ford,Focus,2015,Electrico,AP-{day}-000002\n')
+        self.assertEqual(importador.import_parts(self.repo, path).inserted, 2)
+        self.assertEqual(self.repo.reserve_ids('AP', 2, day=day), [f'AP-{day}-000003', f'AP-{day}-000004'])
+
+        # Números del día de hoy mezclados con filas sin número en el mismo lote
+        today = importador.datetime.now().strftime('%Y%m%d')
+        path = self.write_csv('nombre,marca,modelo,anio,categoria,stock_number\n'
+                              'Radiador,Nissan,Tsuru,2012,Motor,\n'
+                              f'Faro,Ford,Focus,2015,Electrico,AP-{today}-000001\n')
+        result = importador.import_parts(self.repo, path)
+        self.assertEqual((result.inserted, result.errors), (2, []))
+        self.assertEqual(self.repo.next_stock_number(), f'AP-{today}-000003')
+
+        # También una pieza guardada con un número escrito a mano
+        self.repo.insert_part(sample_part(f'AP-{day}-000010'))
+        self.assertEqual(self.repo.reserve_ids('AP', day=day), [f'AP-{day}-000011'])
+        # Un número menor no hace retroceder el contador
+        self.repo.insert_part(sample_part(f'AP-{day}-000005'))
+        self.assertEqual(self.repo.reserve_ids('AP', day=day), [f'AP-{day}-000012'])
+
+    def test_dry_run_does_not_insert(self):
+        """Test: --validar revisa el archivo sin tocar la base de datos"""
+        path = self.write_csv('nombre,marca,modelo,anio,categoria\nRadiador,Nissan,Tsuru,2012,Motor\n')
+        result = importador.import_parts(self.repo, path, dry_run=True)
+        self.assertEqual((result.inserted, result.errors), (1, []))
+        self.assertEqual(self.repo.dashboard_stats()['total_piezas'], 0)
+
+    def test_import_vehicles(self):
+        """Test: Vehículos con ID asignado y errores por fila"""
+        path = self.write_csv('marca,modelo,anio,vin,color\n'
+                              'Nissan,Tsuru,2012,VIN1,Rojo\n'
+                              'Ford,Focus,2010,,Azul\n')
+        result = importador.import_vehicles(self.repo, path)
+        self.assertEqual(result.inserted, 1)
+        self.assertEqual(result.errors[0].line, 3)
+        vehicles = self.repo.list_vehicles()
+        self.assertTrue(vehicles[0][0].startswith('VEH-'))
+
+
+if __name__ == '__main__':
+    unittest.main()
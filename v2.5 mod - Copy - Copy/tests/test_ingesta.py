@@ -0,0 +1,79 @@
+"""
+Tests para la ingesta de fotos en segundo plano
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+try:
+    from PIL import Image
+    import ingesta
+except ImportError:  # Pillow no instalado
+    ingesta = None
+
+from tests.test_tareas import ManualScheduler
+
+
+@unittest.skipIf(ingesta is None, "Requiere Pillow")
+class TestIngesta(unittest.TestCase):
+    """Tests para process_image e ImageIngestor"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_photo(self, name, size, orientation=None):
+        path = os.path.join(self.tmp_dir, name)
+        exif = Image.Exif()
+        if orientation:
+            exif[0x0112] = orientation
+        Image.new('RGB', size, (200, 30, 30)).save(path, 'JPEG', exif=exif)
+        return path
+
+    def test_downscales_and_applies_exif_orientation(self):
+        """Test: El lado largo se limita y la orientación EXIF se aplica"""
+        # Orientación 6: la foto se tomó girada 90°
+        path = self.make_photo('foto.jpg', (3000, 2000), orientation=6)
+        result = ingesta.process_image(path, max_edge=800)
+        with Image.open(ingesta.io.BytesIO(result.data)) as img:
+            self.assertEqual(img.size, (533, 800))
+        self.assertEqual(len(result.sha256), 64)
+        self.assertTrue(result.thumbnail)
+
+    def test_backfill_thumbnail_applies_exif_orientation(self):
+        """Test: La miniatura de una foto original sin procesar también se endereza"""
+        path = self.make_photo('vieja.jpg', (600, 400), orientation=6)
+        with Image.open(ingesta.io.BytesIO(ingesta.make_thumbnail(path))) as img:
+            self.assertEqual(img.size, (120, 180))
+
+    def test_ingestor_reports_progress_and_errors(self):
+        """Test: El lote termina en el hilo del scheduler con imágenes y errores"""
+        scheduler = ManualScheduler()
+        progress, done = [], []
+        ingestor = ingesta.ImageIngestor(scheduler, lambda d, t: progress.append((d, t)),
+                                         lambda imgs, errs: done.append((imgs, errs)), poll_ms=1)
+        broken = os.path.join(self.tmp_dir, 'rota.jpg')
+        with open(broken, 'wb') as f:
+            f.write(b'no es una imagen')
+        ingestor.submit([self.make_photo('a.jpg', (400, 300)), broken])
+        self.assertTrue(ingestor.busy)
+        scheduler.run_pending(timeout=10)
+
+        self.assertFalse(ingestor.busy)
+        self.assertEqual(progress[-1], (2, 2))
+        images, errors = done[0]
+        self.assertEqual(len(images), 1)
+        self.assertEqual([path for path, _ in errors], [broken])
+        ingestor.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Tests para las migraciones de esquema
+"""
+
+import unittest
+import base64
+import io
+import sqlite3
+import os
+import sys
+import shutil
+import tempfile
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import migraciones
+from base_datos import InventoryRepository
+from tests.test_database import sample_part
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow no instalado
+    Image = None
+
+
+class TestMigraciones(unittest.TestCase):
+    """Tests para el sistema de migraciones versionado"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'inventario.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_new_database_reaches_latest_version(self):
+        """Test: Una base de datos nueva queda en la última versión"""
+        repo = InventoryRepository(self.db_path)
+        applied, _ = repo.init_schema()
+        self.assertEqual(applied[-1], migraciones.SCHEMA_VERSION)
+
+        # Ejecutar de nuevo no aplica nada
+        applied, report = repo.init_schema()
+        self.assertEqual(applied, [])
+        self.assertEqual(report, '')
+        repo.close()
+
+    def test_legacy_database_upgrades_in_place(self):
+        """Test: Una base de datos creada por la versión 2.0 se actualiza conservando datos"""
+        conn = sqlite3.connect(self.db_path)
+        for _, _, steps in migraciones.MIGRATIONS[:1]:
+            for step in steps:
+                conn.execute(step)
+        conn.execute('''INSERT INTO piezas (id, stock_number, nombre, marca, modelo, anio, categoria,
+                        condicion, estante, nivel, ubicacion, fecha_ingreso)
+                        VALUES ('AP-1', 'AP-1', 'Radiador', 'Nissan', 'Tsuru', '2012', 'Motor',
+                        'Nueva', 'A', 1, 'A-1', '2025-11-13')''')
+        conn.execute("INSERT INTO imagenes (pieza_id, imagen_data, orden) VALUES ('AP-1', ?, 0)",
+                     (base64.b64encode(b'foto original').decode(),))
+        conn.commit()
+        conn.close()
+
+        repo = InventoryRepository(self.db_path)
+        applied, report = repo.init_schema()
+        self.assertIn(2, applied)
+        self.assertIn('idx_piezas_vehiculo', report)
+        self.assertEqual(repo.get_part('AP-1')[2], 'Radiador')
+        # Los totales del dashboard parten de los datos existentes
+        self.assertEqual(repo.dashboard_stats()['total_piezas'], 1)
+
+        # Las imágenes base64 pasan al almacén de archivos
+        hashes = repo.get_part_images('AP-1')
+        self.assertEqual(repo.images.read(hashes[0]), b'foto original')
+
+        with repo.pool.connection() as conn:
+            plans = migraciones.query_plans(conn)
+        self.assertTrue(any('idx_imagenes_pieza_orden' in step for step in plans['Imágenes de una pieza']))
+        self.assertTrue(any('idx_piezas_categoria_fecha' in step for step in plans['Filtro por categoría']))
+        self.assertTrue(any('idx_aplicaciones_modelo_anio' in step
+                            for step in plans['Aplicaciones por modelo y año (alertas)']))
+
+        # Sin estadísticas de ANALYZE que desvíen los planes
+        self.assertIsNone(repo.fetchone("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'"))
+
+        # Las piezas existentes reciben su aplicación normalizada
+        self.assertEqual(repo.fetchall('SELECT pieza_id, anio_desde, anio_hasta FROM aplicaciones'),
+                         [('AP-1', 2012, 2012)])
+        repo.close()
+
+    @unittest.skipIf(Image is None, "Requiere Pillow")
+    def test_only_rotated_thumbnails_regenerated(self):
+        """Test: Tras la migración 13 solo quedan pendientes las miniaturas de fotos giradas"""
+        def jpeg(orientation=None):
+            exif = Image.Exif()
+            if orientation:
+                exif[0x0112] = orientation
+            buffer = io.BytesIO()
+            Image.new('RGB', (60, 40), (200, 30, 30)).save(buffer, 'JPEG', exif=exif)
+            return buffer.getvalue()
+
+        repo = InventoryRepository(self.db_path)
+        repo.init_schema()
+        # Original sin procesar (orientación 6) y foto ya enderezada por la ingesta
+        repo.insert_part(sample_part('AP-1'), images=[jpeg(orientation=6), jpeg()],
+                         thumbnails=[b'mini-girada', b'mini-recta'])
+        rotated, upright = repo.get_part_images('AP-1')
+        with repo.pool.connection() as conn:
+            conn.execute('PRAGMA user_version = 12')
+
+        applied, _ = repo.init_schema()
+        self.assertEqual(applied, [13, 14, 15])
+        self.assertEqual(repo.fetchall('SELECT sha256, miniatura FROM imagenes ORDER BY orden'),
+                         [(rotated, 0), (upright, 1)])
+        repo.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
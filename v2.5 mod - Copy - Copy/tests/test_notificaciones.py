@@ -0,0 +1,93 @@
+"""
+Tests para la cola de notificaciones del monitor
+"""
+
+import unittest
+import os
+import sys
+
+# Agregar el directorio monitor al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'monitor'))
+
+from notificaciones import ColaNotificaciones, formatear_resumen
+
+
+def parte(stock, nombre='Radiador'):
+    """Fila como la devuelve search_parts_for_alert"""
+    return (stock, nombre, 'Nissan', 'Tsuru', '2012', 'Refrigeracion', 'A-1', 800.0, 'Usada - Buena')
+
+
+def info(texto, marca='nissan'):
+    return {'marca': marca, 'modelo': 'Tsuru', 'año': '2012', 'nombre_parte': 'radiador',
+            'texto_original': texto}
+
+
+class TestColaNotificaciones(unittest.TestCase):
+    """Tests para ColaNotificaciones"""
+
+    def setUp(self):
+        self.ahora = 0.0
+        self.envios = []
+        self.resultado_envio = True
+        self.cola = ColaNotificaciones(self.enviar, ventana=60, recordar=3600, reloj=lambda: self.ahora)
+
+    def enviar(self, alertas):
+        self.envios.append(alertas)
+        return self.resultado_envio
+
+    def test_batches_and_coalesces(self):
+        """Test: Varias alertas salen en un envío; el mismo conjunto de piezas se combina"""
+        self.assertTrue(self.cola.agregar('Grupo 1', info('busco radiador tsuru'), [parte('AP-1'), parte('AP-2')]))
+        self.assertFalse(self.cola.agregar('Grupo 2', info('radiador tsuru?'), [parte('AP-2'), parte('AP-1')]))
+        self.assertTrue(self.cola.agregar('Grupo 1', info('faro jetta', 'vw'), [parte('AP-3', 'Faro')]))
+        self.assertFalse(self.cola.debe_enviar())
+        self.ahora = 60
+        self.assertTrue(self.cola.debe_enviar())
+
+        self.assertEqual(self.cola.enviar_pendientes(), 2)
+        self.assertEqual(len(self.envios), 1)
+        self.assertEqual(self.envios[0][0].chats, ['Grupo 1', 'Grupo 2'])
+        self.assertEqual(self.envios[0][0].repeticiones, 2)
+        self.assertEqual((len(self.cola), self.cola.debe_enviar()), (0, False))
+
+        # Ya notificado para ese chat: no se repite mientras sea reciente
+        self.assertFalse(self.cola.agregar('Grupo 2', info('radiador'), [parte('AP-1'), parte('AP-2')]))
+        self.ahora += 3600
+        self.assertTrue(self.cola.agregar('Grupo 2', info('radiador'), [parte('AP-1'), parte('AP-2')]))
+        self.assertEqual(self.cola.contadores['recibidas'], 5)
+        self.assertEqual(self.cola.contadores['combinadas'], 1)
+        self.assertEqual(self.cola.contadores['repetidas'], 1)
+
+    def test_other_chat_gets_alert_for_same_parts(self):
+        """Test: Otro chat que pide las mismas piezas dentro de la hora sí genera alerta"""
+        self.cola.agregar('Grupo 1', info('busco radiador'), [parte('AP-1')])
+        self.cola.enviar_pendientes()
+        self.ahora = 10
+        self.assertFalse(self.cola.agregar('Grupo 1', info('radiador?'), [parte('AP-1')]))
+        self.assertTrue(self.cola.agregar('Grupo 2', info('busco radiador'), [parte('AP-1')]))
+        self.assertEqual(self.cola.enviar_pendientes(), 1)
+        self.assertEqual(self.envios[-1][0].chats, ['Grupo 2'])
+
+    def test_failed_send_keeps_queue(self):
+        """Test: Si el envío falla las alertas se conservan para el siguiente intento"""
+        self.cola.agregar('Grupo 1', info('busco radiador'), [parte('AP-1')])
+        self.resultado_envio = False
+        self.assertEqual(self.cola.enviar_pendientes(), 0)
+        self.assertEqual(len(self.cola), 1)
+        self.resultado_envio = True
+        self.assertEqual(self.cola.enviar_pendientes(), 1)
+        self.assertEqual(self.cola.contadores['envios_fallidos'], 1)
+
+    def test_formatear_resumen(self):
+        """Test: El resumen lista cada alerta con sus chats y piezas"""
+        self.cola.agregar('Grupo 1', info('busco radiador'), [parte(f'AP-{i}') for i in range(7)])
+        self.cola.agregar('Grupo 2', info('faro', 'vw'), [parte('AP-9', 'Faro')])
+        texto = formatear_resumen(list(self.cola._pendientes.values()))
+        self.assertIn('2 ALERTA(S)', texto)
+        self.assertIn('NISSAN Tsuru 2012', texto)
+        self.assertIn('...y 2 parte(s) mas', texto)
+        self.assertIn('AP-9 Faro (A-1) $800.00', texto)
+
+
+if __name__ == '__main__':
+    unittest.main()
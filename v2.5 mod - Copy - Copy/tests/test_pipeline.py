@@ -0,0 +1,125 @@
+"""
+Tests para el pipeline de análisis del monitor
+"""
+
+import threading
+import time
+import unittest
+import os
+import sys
+
+# Agregar el directorio monitor al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'monitor'))
+
+from metricas import MetricasPasos
+from pipeline import PipelineMensajes
+
+
+def analizar_nissan(chat, texto):
+    """Analizador mínimo: solo reconoce mensajes con 'nissan'"""
+    if 'nissan' not in texto.lower():
+        return None
+    return {'marca': 'nissan', 'texto_original': texto}, [('P001',)]
+
+
+class TestPipelineMensajes(unittest.TestCase):
+    """Tests para PipelineMensajes"""
+
+    def setUp(self):
+        self.pipeline = None
+
+    def tearDown(self):
+        if self.pipeline is not None:
+            self.pipeline.detener()
+
+    def test_results_from_workers(self):
+        """Test: Solo los mensajes con auto llegan a resultados()"""
+        self.pipeline = PipelineMensajes(analizar_nissan, trabajadores=3)
+        for i in range(20):
+            texto = f'Busco faro Nissan {i}' if i % 2 else 'Buenos días'
+            self.assertTrue(self.pipeline.encolar('Grupo', texto, f'id{i}'))
+
+        self.assertTrue(self.pipeline.esperar(5))
+        resultados = self.pipeline.resultados()
+        self.assertEqual(len(resultados), 10)
+        self.assertEqual({r.mensaje.id_whatsapp for r in resultados}, {f'id{i}' for i in range(1, 20, 2)})
+        self.assertEqual(resultados[0].partes, [('P001',)])
+        self.assertEqual(self.pipeline.contadores['analizados'], 20)
+        self.assertEqual(self.pipeline.resultados(), [])
+
+        pasos = self.pipeline.metricas.pasos
+        self.assertEqual(pasos['analisis']['veces'], 20)
+        self.assertEqual(pasos['captura_a_resultado']['veces'], 10)
+
+    def test_full_queue_blocks_capture(self):
+        """Test: Con la cola llena, encolar() espera a que un trabajador libere lugar"""
+        liberar = threading.Event()
+
+        def lento(chat, texto):
+            liberar.wait(5)
+            return None
+
+        self.pipeline = PipelineMensajes(lento, trabajadores=1, tamano_cola=2)
+        self.pipeline.encolar('Grupo', 'mensaje 0')
+        while len(self.pipeline):  # el trabajador lo toma y se queda esperando
+            time.sleep(0.01)
+        for i in range(1, 3):  # la cola se llena
+            self.pipeline.encolar('Grupo', f'mensaje {i}')
+
+        terminado = threading.Event()
+        hilo = threading.Thread(target=lambda: (self.pipeline.encolar('Grupo', 'otro'), terminado.set()))
+        hilo.start()
+        self.assertFalse(terminado.wait(0.2))  # La captura está frenada
+
+        liberar.set()
+        self.assertTrue(terminado.wait(5))
+        hilo.join()
+        self.assertTrue(self.pipeline.esperar(5))
+        self.assertEqual(self.pipeline.contadores['cola_llena'], 1)
+        self.assertEqual(self.pipeline.contadores['analizados'], 4)
+
+    def test_errors_do_not_stop_workers(self):
+        """Test: Una excepción del análisis se cuenta y el trabajador sigue"""
+        def falla_una_vez(chat, texto):
+            if texto == 'malo':
+                raise ValueError('consulta fallida')
+            return analizar_nissan(chat, texto)
+
+        self.pipeline = PipelineMensajes(falla_una_vez, trabajadores=1)
+        self.pipeline.encolar('Grupo', 'malo')
+        self.pipeline.encolar('Grupo', 'Busco Nissan')
+        self.assertTrue(self.pipeline.esperar(5))
+        self.assertEqual(self.pipeline.contadores['errores'], 1)
+        self.assertEqual(len(self.pipeline.resultados()), 1)
+
+    def test_stop_finishes_queued_work(self):
+        """Test: detener() termina los hilos después de lo ya encolado"""
+        self.pipeline = PipelineMensajes(analizar_nissan, trabajadores=2)
+        for i in range(5):
+            self.pipeline.encolar('Grupo', f'Nissan {i}')
+        hilos = list(self.pipeline._hilos)
+        self.pipeline.detener()
+        self.assertFalse(any(h.is_alive() for h in hilos))
+        self.assertEqual(len(self.pipeline.resultados()), 5)
+
+
+class TestMetricasPasos(unittest.TestCase):
+
+    def test_concurrent_records(self):
+        """Test: registrar() desde varios hilos no pierde registros"""
+        metricas = MetricasPasos()
+
+        def registrar():
+            for _ in range(1000):
+                metricas.registrar('analisis', 0.001)
+
+        hilos = [threading.Thread(target=registrar) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        self.assertEqual(metricas.pasos['analisis']['veces'], 4000)
+
+
+if __name__ == '__main__':
+    unittest.main()
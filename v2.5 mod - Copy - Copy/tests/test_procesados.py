@@ -0,0 +1,87 @@
+"""
+Tests para el registro persistente de mensajes procesados
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+
+# Agregar el directorio monitor al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'monitor'))
+
+import procesados
+from procesados import RegistroProcesados
+
+
+class TestRegistroProcesados(unittest.TestCase):
+    """Tests para RegistroProcesados"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'procesados.db')
+        self.ahora = 1000.0
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def registro(self, **kwargs):
+        return RegistroProcesados(self.db_path, ttl=100, reloj=lambda: self.ahora, **kwargs)
+
+    def test_survives_restart(self):
+        """Test: Una clave registrada no vuelve a procesarse tras reiniciar"""
+        registro = self.registro()
+        self.assertTrue(registro.registrar('chat:a'))
+        self.assertFalse(registro.registrar('chat:a'))
+        registro.cerrar()
+
+        registro = self.registro()
+        self.assertFalse(registro.registrar('chat:a'))
+        self.assertTrue(registro.registrar('chat:b'))
+        registro.cerrar()
+
+    def test_ttl_and_bounded_cache(self):
+        """Test: Las claves vencidas se olvidan y la caché no pasa de su tamaño"""
+        registro = self.registro(tamano_cache=2)
+        for clave in 'abc':
+            registro.registrar(clave)
+        self.assertEqual(list(registro._cache), ['b', 'c'])
+        # 'a' ya no está en memoria pero sigue en SQLite
+        self.assertFalse(registro.registrar('a'))
+
+        self.ahora += 150
+        self.assertTrue(registro.registrar('a'))
+        self.assertEqual(registro.purgar(), 2)
+        self.assertEqual((len(registro), list(registro._cache)), (1, ['a']))
+        registro.cerrar()
+
+    def test_seen_again_renews_ttl(self):
+        """Test: Un mensaje que sigue en pantalla no vence ni se vuelve a procesar"""
+        registro = self.registro(renovar=10)
+        self.assertTrue(registro.registrar('chat:a'))
+        for _ in range(5):  # 200 s en total, el doble del TTL
+            self.ahora += 40
+            self.assertFalse(registro.registrar('chat:a'))
+        self.assertEqual(registro.purgar(), 0)
+        registro.cerrar()
+
+        # La renovación quedó en SQLite, no solo en memoria
+        registro = self.registro()
+        self.ahora += 90
+        self.assertFalse(registro.registrar('chat:a'))
+        registro.cerrar()
+
+    def test_periodic_purge(self):
+        """Test: Cada PURGAR_CADA registros nuevos se borran los vencidos"""
+        registro = self.registro()
+        registro.registrar('viejo')
+        self.ahora += 150
+        for i in range(procesados.PURGAR_CADA):
+            registro.registrar(f'nuevo{i}')
+        self.assertEqual(len(registro), procesados.PURGAR_CADA)
+        registro.cerrar()
+
+
+if __name__ == '__main__':
+    unittest.main()
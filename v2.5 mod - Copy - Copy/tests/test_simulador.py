@@ -0,0 +1,68 @@
+"""
+Tests para el simulador local de WhatsApp Web
+"""
+
+import json
+import unittest
+import os
+import sys
+import urllib.request
+
+# Agregar el directorio monitor al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'monitor'))
+
+from analizador import AnalizadorMensajes
+from simulador import CHATS, MARCAS, PARTES, ServidorSimulador, generar_mensajes, percentil, render_pagina
+
+
+class TestGenerarMensajes(unittest.TestCase):
+    """Tráfico sintético"""
+
+    def test_misma_semilla_mismos_mensajes(self):
+        self.assertEqual(generar_mensajes(50, semilla=7), generar_mensajes(50, semilla=7))
+        self.assertNotEqual(generar_mensajes(50, semilla=7), generar_mensajes(50, semilla=8))
+
+    def test_proporcion_de_autos(self):
+        analizador = AnalizadorMensajes([m.lower() for m in MARCAS], PARTES, ['busco'])
+        mensajes = generar_mensajes(400, proporcion_autos=0.25, semilla=3)
+        con_auto = sum(1 for m in mensajes if analizador.analizar(m['texto']))
+        self.assertTrue(60 <= con_auto <= 140, con_auto)
+        self.assertTrue(all(m['chat'] in CHATS for m in mensajes))
+
+    def test_sin_autos(self):
+        analizador = AnalizadorMensajes([m.lower() for m in MARCAS], PARTES, ['busco'])
+        mensajes = generar_mensajes(100, proporcion_autos=0, semilla=1)
+        self.assertFalse(any(analizador.analizar(m['texto']) for m in mensajes))
+
+
+class TestServidorSimulador(unittest.TestCase):
+    """Página servida en localhost"""
+
+    def test_pagina_con_selectores_del_monitor(self):
+        mensajes = [{'chat': CHATS[0], 'autor': 'Juan', 'texto': 'Busco faro </script> Nissan'}]
+        with ServidorSimulador(render_pagina(mensajes, tasa=5)) as servidor:
+            with urllib.request.urlopen(servidor.url, timeout=5) as respuesta:
+                html = respuesta.read().decode('utf-8')
+
+        for fragmento in ('data-tab="3"', 'data-tab="10"', 'id="pane-side"', "'_akbu'",
+                          'data-pre-plain-text', 'data-id', 'conversation-panel-body'):
+            self.assertIn(fragmento, html)
+        # El texto del mensaje no puede cerrar el <script>
+        self.assertEqual(html.count('</script>'), 1)
+
+        config = json.loads(html.split('var CONFIG = ', 1)[1].split(';\n', 1)[0])
+        self.assertEqual(config['tasa'], 5)
+        self.assertEqual(config['mensajes'], mensajes)
+
+
+class TestPercentil(unittest.TestCase):
+
+    def test_percentiles(self):
+        valores = list(range(1, 101))
+        self.assertEqual(percentil(valores, 50), 51)
+        self.assertEqual(percentil(valores, 95), 95)
+        self.assertEqual(percentil([3], 95), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
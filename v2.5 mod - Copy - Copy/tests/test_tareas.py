@@ -0,0 +1,106 @@
+"""
+Tests para la búsqueda en segundo plano con debounce
+"""
+
+import unittest
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from base_datos import InventoryRepository
+from tareas import DebouncedSearch
+
+
+class ManualScheduler:
+    """Sustituto de un widget de Tk: los callbacks de after() se ejecutan a mano"""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, ms, func, *args):
+        self.next_id += 1
+        self.pending[self.next_id] = (func, args)
+        return self.next_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_pending(self, timeout=2.0):
+        """Ejecuta callbacks hasta que no quede ninguno (como el mainloop)"""
+        deadline = time.time() + timeout
+        while self.pending and time.time() < deadline:
+            after_id = min(self.pending)
+            func, args = self.pending.pop(after_id)
+            func(*args)
+            time.sleep(0.001)
+
+
+class TestDebouncedSearch(unittest.TestCase):
+    """Tests para DebouncedSearch"""
+
+    def setUp(self):
+        self.scheduler = ManualScheduler()
+        self.results = []
+
+    def test_only_latest_request_runs(self):
+        """Test: Las teclas intermedias no lanzan consultas"""
+        calls = []
+
+        def search(text, cancel):
+            calls.append(text)
+            return text.upper()
+
+        runner = DebouncedSearch(self.scheduler, search, self.results.append)
+        for text in ('r', 'ra', 'rad'):
+            runner.request(text)
+        self.scheduler.run_pending()
+        runner.shutdown()
+
+        self.assertEqual(calls, ['rad'])
+        self.assertEqual(self.results, ['RAD'])
+
+    def test_stale_query_is_cancelled_and_discarded(self):
+        """Test: Texto nuevo cancela la consulta en curso y su resultado se descarta"""
+        started = threading.Event()
+
+        def search(text, cancel):
+            if text == 'lenta':
+                started.set()
+                cancel.wait(2)
+                return 'obsoleto'
+            return text
+
+        runner = DebouncedSearch(self.scheduler, search, self.results.append)
+        runner.run_now('lenta')
+        started.wait(1)
+        runner.run_now('rapida')
+        self.scheduler.run_pending()
+        runner.shutdown()
+
+        self.assertEqual(self.results, ['rapida'])
+
+    def test_sqlite_query_is_interrupted(self):
+        """Test: cancel interrumpe una consulta SQLite larga"""
+        tmp_dir = tempfile.mkdtemp()
+        repo = InventoryRepository(os.path.join(tmp_dir, 'inventario.db'))
+        cancel = threading.Event()
+        cancel.set()
+        try:
+            with self.assertRaises(Exception) as ctx:
+                repo.fetchall('WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n) '
+                              'SELECT COUNT(*) FROM n', cancel=cancel)
+            self.assertIn('interrupted', str(ctx.exception))
+        finally:
+            repo.close()
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+Tests para el visor con zoom por mosaicos
+"""
+
+import unittest
+import os
+import sys
+
+# Agregar el directorio src al path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+try:
+    from PIL import Image
+    import visor_zoom
+except ImportError:  # Pillow no instalado
+    visor_zoom = None
+
+
+@unittest.skipIf(visor_zoom is None, "Requiere Pillow")
+class TestVisorZoom(unittest.TestCase):
+    """Tests para ImagePyramid y visible_tiles"""
+
+    def setUp(self):
+        self.pyramid = visor_zoom.ImagePyramid(Image.new('RGB', (4000, 3000), (10, 120, 200)))
+
+    def test_pyramid_levels(self):
+        """Test: Cada nivel es la mitad del anterior hasta el tamaño mínimo"""
+        sizes = [level.size for level in self.pyramid.levels]
+        self.assertEqual(sizes[:3], [(4000, 3000), (2000, 1500), (1000, 750)])
+        self.assertLessEqual(max(sizes[-1]), visor_zoom.MIN_LEVEL_SIZE)
+        self.assertEqual(self.pyramid.level_for(2.0), 0)
+        self.assertEqual(self.pyramid.level_for(0.5), 1)
+        self.assertEqual(self.pyramid.level_for(0.3), 1)
+        self.assertEqual(self.pyramid.level_for(0.2), 2)
+
+    def test_only_visible_tiles_rendered(self):
+        """Test: A 500% solo se generan los mosaicos de la ventana"""
+        size = self.pyramid.size_at(5.0)
+        self.assertEqual(size, (20000, 15000))
+        tiles = visor_zoom.visible_tiles(size, (10000, 5000, 11000, 5700))
+        self.assertEqual(len(tiles), 4 * 4)
+        tile = self.pyramid.render(5.0, tiles[0])
+        self.assertEqual(tile.size, (256, 256))
+        self.assertEqual(tile.getpixel((10, 10)), (10, 120, 200))
+
+    def test_edge_tiles_are_clipped(self):
+        """Test: Los mosaicos del borde no salen de la imagen"""
+        size = self.pyramid.size_at(0.33)
+        tiles = visor_zoom.visible_tiles(size, (0, 0, 5000, 5000))
+        self.assertEqual(tiles[-1][2:], size)
+        self.assertEqual(self.pyramid.render(0.33, tiles[-1]).size,
+                         (tiles[-1][2] - tiles[-1][0], tiles[-1][3] - tiles[-1][1]))
+
+
+if __name__ == '__main__':
+    unittest.main()